@@ -6,11 +6,17 @@
 负责用户数据的存储、管理和操作。
 这个模块展示了如何使用Python的基本数据类型来管理复杂的数据结构。
 
+为了在大量用户下保持查询速度，除了按插入顺序保存的用户字典外还维护：
+- 姓名索引：小写姓名 -> 用户ID，查重和按姓名查找都是 O(1)
+- 分桶索引：字段值 -> 用户ID集合（年龄、城市、是否学生），搜索时先用桶缩小候选范围
+- 统计计数器：各数值字段的累计和、极值和年龄组人数随增删改增量更新，
+  极值被删除时才在下次统计时重新计算
+
 作者: Python教程团队
 创建日期: 2024-12-19
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Set
 from utils import calculate_bmi, get_age_group
 
 
@@ -21,16 +27,25 @@ class UserManager:
     负责管理所有用户信息，包括添加、删除、查询和统计功能。
     """
     
+    # 建立分桶索引的字段：精确匹配直接取桶，年龄范围匹配只需遍历桶的键
+    BUCKET_FIELDS = ('age', 'city', 'is_student')
+    
+    # 支持范围匹配、需要维护统计数据的数值字段
+    NUMERIC_FIELDS = ('age', 'height', 'weight', 'bmi')
+    
     def __init__(self):
         """
         初始化用户管理器
         """
-        # 使用列表存储所有用户信息
-        self._users: List[Dict[str, Any]] = []
+        # 使用字典存储所有用户信息：用户ID -> 用户信息，字典保持插入顺序
+        self._users: Dict[int, Dict[str, Any]] = {}
         
         # 用户计数器
         self._user_count: int = 0
         
+        # 姓名索引、分桶索引和统计计数器
+        self._reset_indexes()
+        
         # 添加一些示例数据（可选）
         self._add_sample_data()
     
@@ -87,89 +102,141 @@ class UserManager:
             if not self._validate_user_info(user_info):
                 return False
             
-            # 添加用户ID和创建时间戳
-            user_info['id'] = self._user_count + 1
-            user_info['created_at'] = self._get_current_timestamp()
-            
-            # 计算衍生信息
-            user_info['bmi'] = calculate_bmi(user_info['weight'], user_info['height'])
-            user_info['age_group'] = get_age_group(user_info['age'])
-            
-            # 添加到用户列表
-            self._users.append(user_info.copy())
-            self._user_count += 1
-            
+            self._insert_user(user_info, self._get_current_timestamp())
             return True
             
         except Exception as e:
             print(f"添加用户失败: {e}")
             return False
     
-    def _validate_user_info(self, user_info: Dict[str, Any]) -> bool:
+    def add_users_bulk(self, users_info: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        批量添加用户
+        
+        每个用户在一次遍历中完成验证和插入，批内的重名同样会被发现。
+        单个用户验证失败不影响其他用户，错误信息收集在返回结果中而不是逐条打印。
+        
+        Args:
+            users_info (Iterable[Dict[str, Any]]): 用户信息字典序列
+            
+        Returns:
+            Dict[str, Any]: {'added': 成功数量, 'failed': [{'index': 序号, 'error': 原因}, ...]}
+        """
+        result = {'added': 0, 'failed': []}
+        # 同一批用户共用一个创建时间
+        created_at = self._get_current_timestamp()
+        
+        for index, user_info in enumerate(users_info):
+            try:
+                error = self._check_user_info(user_info)
+                if error is None:
+                    self._insert_user(user_info, created_at)
+                    result['added'] += 1
+                    continue
+            except Exception as e:
+                error = f"添加用户失败: {e}"
+            result['failed'].append({'index': index, 'error': error})
+        
+        return result
+    
+    def _insert_user(self, user_info: Dict[str, Any], created_at: str):
+        """
+        为已验证的用户分配ID、计算衍生信息并加入存储和索引
+        
+        Args:
+            user_info (Dict[str, Any]): 用户信息字典
+            created_at (str): 创建时间
+        """
+        # 添加用户ID和创建时间戳
+        user_info['id'] = self._user_count + 1
+        user_info['created_at'] = created_at
+        
+        # 计算衍生信息
+        user_info['bmi'] = calculate_bmi(user_info['weight'], user_info['height'])
+        user_info['age_group'] = get_age_group(user_info['age'])
+        
+        # 添加到用户存储
+        user = user_info.copy()
+        self._users[user['id']] = user
+        self._user_count += 1
+        self._index_user(user)
+    
+    def _validate_user_info(self, user_info: Dict[str, Any], exclude_id: Optional[int] = None) -> bool:
         """
         验证用户信息的有效性
         
         Args:
             user_info (Dict[str, Any]): 用户信息字典
+            exclude_id (Optional[int]): 查重时忽略的用户ID（更新用户时为用户自身）
             
         Returns:
             bool: 验证是否通过
         """
+        error = self._check_user_info(user_info, exclude_id)
+        if error is not None:
+            print(error)
+            return False
+        return True
+    
+    def _check_user_info(self, user_info: Dict[str, Any], exclude_id: Optional[int] = None) -> Optional[str]:
+        """
+        检查用户信息，返回第一个错误
+        
+        Args:
+            user_info (Dict[str, Any]): 用户信息字典
+            exclude_id (Optional[int]): 查重时忽略的用户ID
+            
+        Returns:
+            Optional[str]: 错误信息，验证通过时返回None
+        """
         required_fields = ['name', 'age', 'height', 'weight', 'is_student', 'phone', 'email']
         
         # 检查必需字段
         for field in required_fields:
             if field not in user_info:
-                print(f"缺少必需字段: {field}")
-                return False
+                return f"缺少必需字段: {field}"
         
         # 检查数据类型和范围
         if not isinstance(user_info['name'], str) or len(user_info['name'].strip()) == 0:
-            print("姓名必须是非空字符串")
-            return False
+            return "姓名必须是非空字符串"
         
         if not isinstance(user_info['age'], int) or not (0 < user_info['age'] < 150):
-            print("年龄必须是1-149之间的整数")
-            return False
+            return "年龄必须是1-149之间的整数"
         
         if not isinstance(user_info['height'], (int, float)) or not (0.5 < user_info['height'] < 3.0):
-            print("身高必须是0.5-3.0米之间的数字")
-            return False
+            return "身高必须是0.5-3.0米之间的数字"
         
         if not isinstance(user_info['weight'], (int, float)) or not (10 < user_info['weight'] < 500):
-            print("体重必须是10-500公斤之间的数字")
-            return False
+            return "体重必须是10-500公斤之间的数字"
         
         if not isinstance(user_info['is_student'], bool):
-            print("学生状态必须是布尔值")
-            return False
+            return "学生状态必须是布尔值"
         
         if not isinstance(user_info['phone'], str) or len(user_info['phone'].strip()) < 8:
-            print("电话号码必须是至少8位的字符串")
-            return False
+            return "电话号码必须是至少8位的字符串"
         
         if not isinstance(user_info['email'], str) or '@' not in user_info['email']:
-            print("邮箱地址格式不正确")
-            return False
+            return "邮箱地址格式不正确"
         
         # 检查姓名是否重复
-        if self._is_name_exists(user_info['name']):
-            print(f"用户名 '{user_info['name']}' 已存在")
-            return False
+        if self._is_name_exists(user_info['name'], exclude_id):
+            return f"用户名 '{user_info['name']}' 已存在"
         
-        return True
+        return None
     
-    def _is_name_exists(self, name: str) -> bool:
+    def _is_name_exists(self, name: str, exclude_id: Optional[int] = None) -> bool:
         """
-        检查姓名是否已存在
+        检查姓名是否已存在（不区分大小写）
         
         Args:
             name (str): 要检查的姓名
+            exclude_id (Optional[int]): 忽略该ID的用户
             
         Returns:
             bool: 姓名是否已存在
         """
-        return any(user['name'].lower() == name.lower() for user in self._users)
+        owner_id = self._name_index.get(name.lower())
+        return owner_id is not None and owner_id != exclude_id
     
     def _get_current_timestamp(self) -> str:
         """
@@ -188,7 +255,7 @@ class UserManager:
         Returns:
             List[Dict[str, Any]]: 用户信息列表
         """
-        return self._users.copy()
+        return list(self._users.values())
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """
@@ -200,10 +267,8 @@ class UserManager:
         Returns:
             Optional[Dict[str, Any]]: 用户信息，如果不存在则返回None
         """
-        for user in self._users:
-            if user.get('id') == user_id:
-                return user.copy()
-        return None
+        user = self._users.get(user_id)
+        return user.copy() if user is not None else None
     
     def get_user_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """
@@ -215,57 +280,106 @@ class UserManager:
         Returns:
             Optional[Dict[str, Any]]: 用户信息，如果不存在则返回None
         """
-        for user in self._users:
-            if user['name'].lower() == name.lower():
-                return user.copy()
-        return None
+        user_id = self._name_index.get(name.lower())
+        return self._users[user_id].copy() if user_id is not None else None
     
     def search_users(self, **criteria) -> List[Dict[str, Any]]:
         """
         根据条件搜索用户
         
+        有分桶索引的条件（年龄、城市、是否学生）先取出对应的用户ID集合求交，
+        其余条件只在候选用户上逐个检查。
+        
         Args:
             **criteria: 搜索条件
             
         Returns:
             List[Dict[str, Any]]: 匹配的用户列表
         """
-        results = []
+        candidate_sets = []
+        remaining = {}
+        
+        for key, value in criteria.items():
+            ids = self._lookup_bucket(key, value)
+            if ids is None:
+                remaining[key] = value
+            else:
+                candidate_sets.append(ids)
+        
+        if candidate_sets:
+            # 从最小的集合开始求交
+            candidate_sets.sort(key=len)
+            candidates = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+            # 用户ID按添加顺序递增，排序后与原来的列表顺序一致
+            users = (self._users[user_id] for user_id in sorted(candidates))
+        else:
+            users = self._users.values()
+        
+        return [user.copy() for user in users if self._matches(user, remaining)]
+    
+    def _lookup_bucket(self, key: str, value: Any) -> Optional[Set[int]]:
+        """
+        用分桶索引查找满足单个条件的用户ID
         
-        for user in self._users:
-            match = True
+        Args:
+            key (str): 字段名
+            value (Any): 条件值，数值字段可以是 (最小值, 最大值) 元组
             
-            for key, value in criteria.items():
-                if key not in user:
-                    match = False
-                    break
-                
-                if key == 'name':
-                    # 姓名支持部分匹配
-                    if value.lower() not in user[key].lower():
-                        match = False
-                        break
-                elif key in ['age', 'height', 'weight', 'bmi']:
-                    # 数值类型支持范围匹配
-                    if isinstance(value, tuple) and len(value) == 2:
-                        min_val, max_val = value
-                        if not (min_val <= user[key] <= max_val):
-                            match = False
-                            break
-                    else:
-                        if user[key] != value:
-                            match = False
-                            break
-                else:
-                    # 其他字段精确匹配
-                    if user[key] != value:
-                        match = False
-                        break
+        Returns:
+            Optional[Set[int]]: 用户ID集合，字段没有索引时返回None
+        """
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            return None
+        
+        if key in self.NUMERIC_FIELDS and isinstance(value, tuple) and len(value) == 2:
+            # 范围匹配：桶的数量远小于用户数量（年龄最多149个）
+            min_val, max_val = value
+            ids = set()
+            for bucket_value, bucket_ids in buckets.items():
+                if min_val <= bucket_value <= max_val:
+                    ids.update(bucket_ids)
+            return ids
+        
+        try:
+            return buckets.get(value, set())
+        except TypeError:
+            # 不可哈希的条件值只能逐个比较
+            return None
+    
+    @staticmethod
+    def _matches(user: Dict[str, Any], criteria: Dict[str, Any]) -> bool:
+        """
+        检查用户是否满足所有条件
+        
+        Args:
+            user (Dict[str, Any]): 用户信息
+            criteria (Dict[str, Any]): 搜索条件
             
-            if match:
-                results.append(user.copy())
+        Returns:
+            bool: 是否匹配
+        """
+        for key, value in criteria.items():
+            if key not in user:
+                return False
+            
+            if key == 'name':
+                # 姓名支持部分匹配
+                if value.lower() not in user[key].lower():
+                    return False
+            elif key in UserManager.NUMERIC_FIELDS:
+                # 数值类型支持范围匹配
+                if isinstance(value, tuple) and len(value) == 2:
+                    min_val, max_val = value
+                    if not (min_val <= user[key] <= max_val):
+                        return False
+                elif user[key] != value:
+                    return False
+            elif user[key] != value:
+                # 其他字段精确匹配
+                return False
         
-        return results
+        return True
     
     def update_user(self, user_id: int, updates: Dict[str, Any]) -> bool:
         """
@@ -278,32 +392,78 @@ class UserManager:
         Returns:
             bool: 更新是否成功
         """
-        for i, user in enumerate(self._users):
-            if user.get('id') == user_id:
-                # 创建临时用户信息进行验证
-                temp_user = user.copy()
-                temp_user.update(updates)
-                
-                # 验证更新后的信息
-                if self._validate_user_info(temp_user):
-                    # 更新用户信息
-                    self._users[i].update(updates)
-                    
-                    # 重新计算衍生信息
-                    if 'weight' in updates or 'height' in updates:
-                        self._users[i]['bmi'] = calculate_bmi(
-                            self._users[i]['weight'], 
-                            self._users[i]['height']
-                        )
-                    
-                    if 'age' in updates:
-                        self._users[i]['age_group'] = get_age_group(self._users[i]['age'])
-                    
-                    return True
-                else:
-                    return False
+        user = self._users.get(user_id)
+        if user is None:
+            return False
         
-        return False
+        error = self._apply_update(user, updates)
+        if error is not None:
+            print(error)
+            return False
+        return True
+    
+    def update_users_bulk(self, updates: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        批量更新用户信息
+        
+        按顺序逐个验证并更新，前面的更新（例如改名）对后面的验证可见。
+        
+        Args:
+            updates (Dict[int, Dict[str, Any]]): 用户ID -> 要更新的字段
+            
+        Returns:
+            Dict[str, Any]: {'updated': 成功数量, 'failed': [{'id': 用户ID, 'error': 原因}, ...]}
+        """
+        result = {'updated': 0, 'failed': []}
+        
+        for user_id, user_updates in updates.items():
+            user = self._users.get(user_id)
+            if user is None:
+                error = f"用户ID {user_id} 不存在"
+            else:
+                try:
+                    error = self._apply_update(user, user_updates)
+                except Exception as e:
+                    error = f"更新用户失败: {e}"
+            
+            if error is None:
+                result['updated'] += 1
+            else:
+                result['failed'].append({'id': user_id, 'error': error})
+        
+        return result
+    
+    def _apply_update(self, user: Dict[str, Any], updates: Dict[str, Any]) -> Optional[str]:
+        """
+        验证并应用更新，同时维护索引和统计数据
+        
+        Args:
+            user (Dict[str, Any]): 存储中的用户信息
+            updates (Dict[str, Any]): 要更新的字段
+            
+        Returns:
+            Optional[str]: 错误信息，更新成功时返回None
+        """
+        # 创建临时用户信息进行验证（姓名查重时忽略用户自身）
+        temp_user = user.copy()
+        temp_user.update(updates)
+        
+        error = self._check_user_info(temp_user, exclude_id=user['id'])
+        if error is not None:
+            return error
+        
+        # 先在临时信息上重新计算衍生信息，出错时存储保持不变
+        if 'weight' in updates or 'height' in updates:
+            temp_user['bmi'] = calculate_bmi(temp_user['weight'], temp_user['height'])
+        
+        if 'age' in updates:
+            temp_user['age_group'] = get_age_group(temp_user['age'])
+        
+        # 更新用户信息
+        self._unindex_user(user)
+        user.update(temp_user)
+        self._index_user(user)
+        return None
     
     def delete_user(self, user_id: int) -> bool:
         """
@@ -315,11 +475,16 @@ class UserManager:
         Returns:
             bool: 删除是否成功
         """
-        for i, user in enumerate(self._users):
-            if user.get('id') == user_id:
-                del self._users[i]
-                return True
-        return False
+        user = self._users.pop(user_id, None)
+        if user is None:
+            return False
+        
+        if self._users:
+            self._unindex_user(user)
+        else:
+            # 最后一个用户被删除时直接重置，避免浮点累计和残留误差
+            self._reset_indexes()
+        return True
     
     def get_user_count(self) -> int:
         """
@@ -334,6 +499,9 @@ class UserManager:
         """
         获取用户统计信息
         
+        统计数据由增删改时维护的计数器直接得出，
+        只有极值所在的用户被删除或修改后才需要遍历一次重新计算该字段的极值。
+        
         Returns:
             Dict[str, Any]: 统计信息字典
         """
@@ -342,50 +510,45 @@ class UserManager:
         
         # 基本统计
         total_users = len(self._users)
+        self._refresh_extremes()
+        sums = self._sums
+        extremes = self._extremes
         
         # 年龄统计
-        ages = [user['age'] for user in self._users]
         age_stats = {
             'total': total_users,
-            'avg_age': sum(ages) / len(ages),
-            'min_age': min(ages),
-            'max_age': max(ages)
+            'avg_age': sums['age'] / total_users,
+            'min_age': extremes['age'][0],
+            'max_age': extremes['age'][1]
         }
         
         # 身高体重统计
-        heights = [user['height'] for user in self._users]
-        weights = [user['weight'] for user in self._users]
-        
         physical_stats = {
-            'avg_height': sum(heights) / len(heights),
-            'min_height': min(heights),
-            'max_height': max(heights),
-            'avg_weight': sum(weights) / len(weights),
-            'min_weight': min(weights),
-            'max_weight': max(weights)
+            'avg_height': sums['height'] / total_users,
+            'min_height': extremes['height'][0],
+            'max_height': extremes['height'][1],
+            'avg_weight': sums['weight'] / total_users,
+            'min_weight': extremes['weight'][0],
+            'max_weight': extremes['weight'][1]
         }
         
         # 学生统计
-        students = [user for user in self._users if user['is_student']]
+        student_count = len(self._buckets['is_student'].get(True, ()))
         student_stats = {
-            'student_count': len(students),
-            'non_student_count': total_users - len(students),
-            'student_percentage': (len(students) / total_users) * 100
+            'student_count': student_count,
+            'non_student_count': total_users - student_count,
+            'student_percentage': (student_count / total_users) * 100
         }
         
         # BMI统计
-        bmis = [user['bmi'] for user in self._users]
         bmi_stats = {
-            'avg_bmi': sum(bmis) / len(bmis),
-            'min_bmi': min(bmis),
-            'max_bmi': max(bmis)
+            'avg_bmi': sums['bmi'] / total_users,
+            'min_bmi': extremes['bmi'][0],
+            'max_bmi': extremes['bmi'][1]
         }
         
         # 年龄组统计
-        age_groups = {}
-        for user in self._users:
-            group = user['age_group']
-            age_groups[group] = age_groups.get(group, 0) + 1
+        age_groups = dict(self._age_groups)
         
         return {
             'age_stats': age_stats,
@@ -412,7 +575,7 @@ class UserManager:
         lines.append(f"用户总数: {len(self._users)}")
         lines.append("=" * 50)
         
-        for i, user in enumerate(self._users, 1):
+        for i, user in enumerate(self._users.values(), 1):
             lines.append(f"\n{i}. {user['name']}")
             lines.append(f"   ID: {user.get('id', 'N/A')}")
             lines.append(f"   年龄: {user['age']}岁 ({user['age_group']})")
@@ -436,10 +599,106 @@ class UserManager:
         try:
             self._users.clear()
             self._user_count = 0
+            self._reset_indexes()
             return True
         except Exception:
             return False
     
+    def _reset_indexes(self):
+        """
+        清空姓名索引、分桶索引和统计计数器
+        """
+        # 小写姓名 -> 用户ID
+        self._name_index: Dict[str, int] = {}
+        
+        # 字段 -> {字段值 -> 用户ID集合}
+        self._buckets: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self.BUCKET_FIELDS}
+        
+        # 数值字段的累计和与 [最小值, 最大值]
+        self._sums: Dict[str, float] = dict.fromkeys(self.NUMERIC_FIELDS, 0)
+        self._extremes: Dict[str, Optional[List[float]]] = dict.fromkeys(self.NUMERIC_FIELDS)
+        
+        # 极值被删除、需要重新计算的字段
+        self._stale_extremes: Set[str] = set()
+        
+        # 年龄组 -> 人数
+        self._age_groups: Dict[str, int] = {}
+    
+    def _index_user(self, user: Dict[str, Any]):
+        """
+        把用户加入索引并更新统计计数器
+        
+        Args:
+            user (Dict[str, Any]): 用户信息
+        """
+        user_id = user['id']
+        self._name_index[user['name'].lower()] = user_id
+        
+        for field in self.BUCKET_FIELDS:
+            if field in user:
+                self._buckets[field].setdefault(user[field], set()).add(user_id)
+        
+        for field in self.NUMERIC_FIELDS:
+            value = user[field]
+            self._sums[field] += value
+            if field in self._stale_extremes:
+                continue
+            extremes = self._extremes[field]
+            if extremes is None:
+                self._extremes[field] = [value, value]
+            elif value < extremes[0]:
+                extremes[0] = value
+            elif value > extremes[1]:
+                extremes[1] = value
+        
+        group = user['age_group']
+        self._age_groups[group] = self._age_groups.get(group, 0) + 1
+    
+    def _unindex_user(self, user: Dict[str, Any]):
+        """
+        把用户移出索引并更新统计计数器
+        
+        Args:
+            user (Dict[str, Any]): 用户信息
+        """
+        user_id = user['id']
+        name_key = user['name'].lower()
+        if self._name_index.get(name_key) == user_id:
+            del self._name_index[name_key]
+        
+        for field in self.BUCKET_FIELDS:
+            if field not in user:
+                continue
+            buckets = self._buckets[field]
+            ids = buckets.get(user[field])
+            if ids is not None:
+                ids.discard(user_id)
+                if not ids:
+                    del buckets[user[field]]
+        
+        for field in self.NUMERIC_FIELDS:
+            value = user[field]
+            self._sums[field] -= value
+            extremes = self._extremes[field]
+            if extremes is not None and (value <= extremes[0] or value >= extremes[1]):
+                self._stale_extremes.add(field)
+        
+        group = user['age_group']
+        count = self._age_groups.get(group, 0) - 1
+        if count > 0:
+            self._age_groups[group] = count
+        else:
+            self._age_groups.pop(group, None)
+    
+    def _refresh_extremes(self):
+        """
+        重新计算失效字段的极值
+        """
+        for field in self._stale_extremes:
+            values = [user[field] for user in self._users.values()]
+            self._extremes[field] = [min(values), max(values)] if values else None
+        self._stale_extremes.clear()
+    
     def __str__(self) -> str:
         """
         字符串表示
@@ -649,10 +649,13 @@ class StudentManagerCLI:
             print("2. 从JSON文件导入")
             print("3. 导出到CSV文件")
             print("4. 清空所有数据")
+            print("5. 导出到JSON Lines文件（流式）")
+            print("6. 从JSON Lines/CSV文件导入（合并）")
+            print("7. 增量导出变化的学生")
             print("0. 返回主菜单")
             print("-" * 60)
             
-            choice = self.get_input("请选择操作 (0-4): ")
+            choice = self.get_input("请选择操作 (0-7): ")
             
             if choice == "1":
                 self.export_json()
@@ -662,6 +665,12 @@ class StudentManagerCLI:
                 self.export_csv()
             elif choice == "4":
                 self.clear_all_data()
+            elif choice == "5":
+                self.export_jsonl()
+            elif choice == "6":
+                self.import_stream()
+            elif choice == "7":
+                self.export_changes()
             elif choice == "0":
                 break
             else:
@@ -724,6 +733,68 @@ class StudentManagerCLI:
         
         self.pause()
     
+    def print_progress(self, processed: int, total: Optional[int]):
+        """打印导入导出进度"""
+        if total:
+            print(f"\r已处理 {processed}/{total} ({processed / total:.0%})", end='', flush=True)
+        else:
+            print(f"\r已处理 {processed} 条", end='', flush=True)
+    
+    def export_jsonl(self):
+        """导出JSON Lines"""
+        self.print_header("导出到JSON Lines文件")
+        
+        filename = self.get_input("文件名 (默认: students_export.jsonl): ", str, False) or "students_export.jsonl"
+        
+        if not filename.endswith('.jsonl'):
+            filename += '.jsonl'
+        
+        success = self.manager.export_to_jsonl(filename, progress_callback=self.print_progress)
+        if success:
+            print(f"\n数据已成功导出到 {filename}")
+        
+        self.pause()
+    
+    def import_stream(self):
+        """流式导入JSON Lines或CSV"""
+        self.print_header("从JSON Lines/CSV文件导入")
+        
+        filename = self.get_input("文件名 (.jsonl 或 .csv): ")
+        if not filename:
+            return
+        
+        if not os.path.exists(filename):
+            print(f"文件 {filename} 不存在。")
+            self.pause()
+            return
+        
+        if filename.endswith('.csv'):
+            result = self.manager.import_from_csv(filename, progress_callback=self.print_progress)
+        else:
+            result = self.manager.import_from_jsonl(filename, progress_callback=self.print_progress)
+        
+        if result['errors']:
+            print("\n部分记录无效：")
+            for error in result['errors']:
+                print(f"  - {error}")
+        
+        self.pause()
+    
+    def export_changes(self):
+        """增量导出"""
+        self.print_header("增量导出变化的学生")
+        
+        filename = self.get_input("文件名 (默认: students_changes.jsonl): ", str, False) or "students_changes.jsonl"
+        
+        if not filename.endswith('.jsonl'):
+            filename += '.jsonl'
+        
+        success = self.manager.export_changes_to_jsonl(filename, progress_callback=self.print_progress)
+        if success:
+            print(f"\n变化已追加到 {filename}")
+        
+        self.pause()
+    
     def clear_all_data(self):
         """清空所有数据"""
         self.print_header("清空所有数据")
@@ -22,10 +22,168 @@ Session05 项目: 学生成绩管理系统
 
 import json
 import csv
-from typing import Dict, List, Set, Tuple, Optional, Any
-from collections import defaultdict, Counter
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, Optional, Any
+from collections import defaultdict
 from datetime import datetime
-import statistics
+
+
+class SortedIndex:
+    """
+    基于 bisect 的有序索引
+    
+    键是可比较的元组，例如 (-分数, 序号, 学号)。少量修改直接用 insort
+    插入有序列表；批量修改（如导入数据）先记录增减，查询时合并后
+    整体排序一次，避免每条记录都移动整个列表。
+    """
+    
+    # 待合并的修改超过该数量时改为整体重排
+    MERGE_THRESHOLD = 32
+    
+    def __init__(self, keys: Iterable[tuple] = ()):
+        self._keys: List[tuple] = sorted(keys)
+        # 键 -> 净增减次数（+1 待插入，-1 待删除）
+        self._delta: Dict[tuple, int] = {}
+    
+    def add(self, key: tuple):
+        """添加键"""
+        delta = self._delta
+        count = delta.get(key, 0) + 1
+        if count:
+            delta[key] = count
+        else:
+            del delta[key]
+    
+    def discard(self, key: tuple):
+        """删除键"""
+        delta = self._delta
+        count = delta.get(key, 0) - 1
+        if count:
+            delta[key] = count
+        else:
+            del delta[key]
+    
+    def __len__(self) -> int:
+        return len(self._materialize())
+    
+    def __iter__(self):
+        return iter(self._materialize())
+    
+    def __getitem__(self, index):
+        return self._materialize()[index]
+    
+    def head(self, n: int) -> List[tuple]:
+        """最小的n个键"""
+        return self._materialize()[:n]
+    
+    def range(self, low: tuple = None, high: tuple = None) -> List[tuple]:
+        """
+        获取 low <= 键 <= high 的所有键
+        
+        边界可以是较短的元组前缀，例如 (18,) 到 (22, math.inf)。
+        """
+        keys = self._materialize()
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return keys[start:end]
+    
+    def count_range(self, low: tuple = None, high: tuple = None) -> int:
+        """统计 low <= 键 <= high 的键数量"""
+        keys = self._materialize()
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return max(end - start, 0)
+    
+    def _materialize(self) -> List[tuple]:
+        """把待合并的修改应用到有序列表"""
+        if not self._delta:
+            return self._keys
+        
+        keys = self._keys
+        if len(self._delta) <= self.MERGE_THRESHOLD:
+            for key, count in self._delta.items():
+                if count > 0:
+                    insort(keys, key)
+                else:
+                    i = bisect_left(keys, key)
+                    if i < len(keys) and keys[i] == key:
+                        del keys[i]
+        else:
+            removed = {key for key, count in self._delta.items() if count < 0}
+            if removed:
+                keys = [key for key in keys if key not in removed]
+            keys.extend(key for key, count in self._delta.items() if count > 0)
+            keys.sort()
+            self._keys = keys
+        
+        self._delta.clear()
+        return self._keys
+
+
+class NameTrie:
+    """
+    姓名前缀树（不区分大小写）
+    
+    每个节点是一个字典：字符 -> 子节点，键 None 存放以该节点结尾的学号集合。
+    """
+    
+    def __init__(self):
+        self._root: Dict[Optional[str], Any] = {}
+    
+    def insert(self, name: str, student_id: str):
+        """插入姓名"""
+        node = self._root
+        for char in name.lower():
+            child = node.get(char)
+            if child is None:
+                child = node[char] = {}
+            node = child
+        ids = node.get(None)
+        if ids is None:
+            ids = node[None] = set()
+        ids.add(student_id)
+    
+    def remove(self, name: str, student_id: str):
+        """删除姓名，并清理不再使用的节点"""
+        name = name.lower()
+        path = [self._root]
+        for char in name:
+            node = path[-1].get(char)
+            if node is None:
+                return
+            path.append(node)
+        
+        ids = path[-1].get(None)
+        if ids is None:
+            return
+        ids.discard(student_id)
+        if not ids:
+            del path[-1][None]
+        
+        for depth in range(len(path) - 1, 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][name[depth - 1]]
+    
+    def search_prefix(self, prefix: str) -> Set[str]:
+        """获取姓名以prefix开头（不区分大小写）的所有学号"""
+        node = self._root
+        for char in prefix.lower():
+            node = node.get(char)
+            if node is None:
+                return set()
+        
+        result = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char is None:
+                    result.update(child)
+                else:
+                    stack.append(child)
+        return result
 
 
 class StudentManager:
@@ -37,8 +195,18 @@ class StudentManager:
     - majors: 集合，存储所有专业
     - courses: 集合，存储所有课程
     - grade_config: 元组，存储成绩等级配置
+    
+    另外维护若干二级索引，在增删改时同步更新，让查询不必扫描全部学生：
+    - 专业 -> 学号集合
+    - 年龄有序索引、姓名前缀树
+    - 每门课程按分数排序的索引和 人数/平均分/离差平方和
+    - 每个学生的 总分/课程数，平均分是O(1)
+    - 按平均分排序的排行榜（全体和各专业）
     """
     
+    # 删除成绩后课程人数不超过该值时，用剩余成绩重算平均分和离差平方和
+    RECOMPUTE_COURSE_STATS = 64
+    
     def __init__(self):
         # 主要数据存储：字典，键为学号，值为学生信息字典
         self.students: Dict[str, Dict[str, Any]] = {}
@@ -66,6 +234,12 @@ class StudentManager:
             'required_courses': ['数学', '英语'],
             'created_at': datetime.now().isoformat()
         }
+        
+        # 增量导出：上次导出以来新增/修改和删除的学号
+        self._dirty_students: Set[str] = set()
+        self._deleted_students: Set[str] = set()
+        
+        self._reset_indexes()
     
     def add_student(self, student_id: str, name: str, major: str, 
                    age: int = None, email: str = None) -> bool:
@@ -107,6 +281,10 @@ class StudentManager:
         # 更新专业集合
         self.majors.add(major)
         
+        # 更新索引
+        self._index_student(student_id)
+        self._mark_dirty(student_id)
+        
         print(f"成功添加学生：{name} ({student_id})")
         return True
     
@@ -125,7 +303,11 @@ class StudentManager:
             return False
         
         student_name = self.students[student_id]['name']
+        self._unindex_student(student_id)
         del self.students[student_id]
+        del self._seq[student_id]
+        self._dirty_students.discard(student_id)
+        self._deleted_students.add(student_id)
         
         print(f"成功删除学生：{student_name} ({student_id})")
         return True
@@ -149,6 +331,8 @@ class StudentManager:
         allowed_fields = {'name', 'major', 'age', 'email'}
         updated_fields = []
         
+        # 姓名、专业、年龄都有索引：先移出索引，改完再放回
+        self._unindex_student(student_id)
         for field, value in kwargs.items():
             if field in allowed_fields:
                 old_value = self.students[student_id].get(field)
@@ -158,9 +342,11 @@ class StudentManager:
                 # 如果更新专业，添加到专业集合
                 if field == 'major':
                     self.majors.add(value)
+        self._index_student(student_id)
         
         if updated_fields:
             self.students[student_id]['updated_at'] = datetime.now().isoformat()
+            self._mark_dirty(student_id)
             print(f"成功更新学生 {student_id}：{', '.join(updated_fields)}")
             return True
         else:
@@ -188,8 +374,9 @@ class StudentManager:
             return False
         
         # 添加成绩
-        self.students[student_id]['scores'][course] = score
+        self._set_score(student_id, course, score)
         self.students[student_id]['updated_at'] = datetime.now().isoformat()
+        self._mark_dirty(student_id)
         
         # 更新课程集合
         self.courses.add(course)
@@ -199,6 +386,46 @@ class StudentManager:
         print(f"成功添加成绩：{self.students[student_id]['name']} - {course}: {score} ({grade})")
         return True
     
+    def validate_record(self, record: Any) -> Optional[str]:
+        """
+        校验一条导入记录
+        
+        Args:
+            record: 记录字典，至少包含 student_id、name、major；
+                    {"student_id": ..., "deleted": true} 表示删除
+        
+        Returns:
+            Optional[str]: 错误原因，记录有效返回None
+        """
+        if not isinstance(record, dict):
+            return "记录不是JSON对象"
+        
+        student_id = record.get('student_id')
+        if not isinstance(student_id, str) or not student_id:
+            return "缺少学号"
+        if record.get('deleted'):
+            return None
+        
+        for field in ('name', 'major'):
+            if not isinstance(record.get(field), str) or not record[field]:
+                return f"学号 {student_id} 缺少字段 {field}"
+        
+        age = record.get('age')
+        if age is not None and (not isinstance(age, int) or isinstance(age, bool)):
+            return f"学号 {student_id} 年龄格式错误"
+        
+        scores = record.get('scores', {})
+        if not isinstance(scores, dict):
+            return f"学号 {student_id} 成绩格式错误"
+        min_score, max_score = self.config['min_score'], self.config['max_score']
+        for course, score in scores.items():
+            if isinstance(score, bool) or not isinstance(score, (int, float)):
+                return f"学号 {student_id} 课程 {course} 成绩不是数字"
+            if not (min_score <= score <= max_score):
+                return f"学号 {student_id} 课程 {course} 成绩超出范围"
+        
+        return None
+    
     def get_grade(self, score: float) -> str:
         """
         根据分数获取等级
@@ -230,35 +457,51 @@ class StudentManager:
         """
         搜索学生
         
+        支持的条件：
+        - name: 姓名包含该字符串（不区分大小写）
+        - name_prefix: 姓名以该字符串开头（不区分大小写，走前缀树）
+        - major: 专业
+        - min_age / max_age: 年龄范围（未填写年龄按 min 0 / max 999 处理）
+        
         Args:
             **criteria: 搜索条件
         
         Returns:
-            List[Dict]: 符合条件的学生列表
+            List[Dict]: 符合条件的学生列表（按添加顺序）
         """
-        results = []
+        # 先用索引求出候选集合，再在候选集合上做子串匹配
+        candidate_sets = []
         
-        for student_id, student_info in self.students.items():
-            match = True
-            
-            for field, value in criteria.items():
-                if field == 'name' and value.lower() not in student_info.get('name', '').lower():
-                    match = False
-                    break
-                elif field == 'major' and student_info.get('major') != value:
-                    match = False
-                    break
-                elif field == 'min_age' and (student_info.get('age') or 0) < value:
-                    match = False
-                    break
-                elif field == 'max_age' and (student_info.get('age') or 999) > value:
-                    match = False
-                    break
+        if 'major' in criteria:
+            candidate_sets.append(self._major_index.get(criteria['major'], set()))
+        
+        if 'name_prefix' in criteria:
+            candidate_sets.append(self._name_trie.search_prefix(criteria['name_prefix']))
+        
+        if 'min_age' in criteria or 'max_age' in criteria:
+            candidate_sets.append(self._students_in_age_range(criteria.get('min_age'),
+                                                              criteria.get('max_age')))
+        
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            candidates = set(candidate_sets[0]).intersection(*candidate_sets[1:])
+            candidates = sorted(candidates, key=self._seq.__getitem__)
+        else:
+            candidates = self.students.keys()
+        
+        name = criteria.get('name')
+        if name is not None:
+            name = name.lower()
+        
+        results = []
+        for student_id in candidates:
+            student_info = self.students[student_id]
+            if name is not None and name not in student_info.get('name', '').lower():
+                continue
             
-            if match:
-                result = student_info.copy()
-                result['student_id'] = student_id
-                results.append(result)
+            result = student_info.copy()
+            result['student_id'] = student_id
+            results.append(result)
         
         return results
     
@@ -276,7 +519,7 @@ class StudentManager:
     
     def calculate_student_average(self, student_id: str) -> Optional[float]:
         """
-        计算学生平均分
+        计算学生平均分（由维护的总分和课程数直接得出）
         
         Args:
             student_id: 学号
@@ -284,14 +527,11 @@ class StudentManager:
         Returns:
             Optional[float]: 平均分，无成绩返回None
         """
-        if student_id not in self.students:
+        totals = self._score_totals.get(student_id)
+        if not totals or not totals[1]:
             return None
         
-        scores = list(self.students[student_id]['scores'].values())
-        if not scores:
-            return None
-        
-        return sum(scores) / len(scores)
+        return totals[0] / totals[1]
     
     def get_course_statistics(self, course: str) -> Dict[str, Any]:
         """
@@ -303,35 +543,47 @@ class StudentManager:
         Returns:
             Dict: 统计信息
         """
-        scores = []
-        students_with_scores = []
+        index = self._course_index.get(course)
+        if not index:
+            return {'error': f'课程 {course} 没有成绩记录'}
         
-        # 收集该课程的所有成绩
-        for student_id, student_info in self.students.items():
-            if course in student_info['scores']:
-                score = student_info['scores'][course]
-                scores.append(score)
-                students_with_scores.append({
-                    'student_id': student_id,
-                    'name': student_info['name'],
-                    'score': score,
-                    'grade': self.get_grade(score)
-                })
+        # 索引按分数降序排列：第一个是最高分，最后一个是最低分
+        keys = index.head(len(index))
+        count, average, square_deviation = self._course_totals[course]
         
-        if not scores:
-            return {'error': f'课程 {course} 没有成绩记录'}
+        if count > 1 and keys[0][0] != keys[-1][0]:
+            std_dev = math.sqrt(square_deviation / (count - 1))
+        else:
+            std_dev = 0
+        
+        # 等级分布：在有序索引上按分数段二分计数
+        grade_distribution = {}
+        graded = 0
+        for grade, min_score, max_score in self.grade_config:
+            if grade == 'F':
+                continue
+            grade_count = index.count_range((-max_score,), (-min_score, math.inf))
+            if grade_count:
+                grade_distribution[grade] = grade_count
+                graded += grade_count
+        if count - graded:
+            grade_distribution['F'] = count - graded
         
-        # 计算统计信息
         stats = {
             'course': course,
-            'student_count': len(scores),
-            'average': statistics.mean(scores),
-            'median': statistics.median(scores),
-            'max_score': max(scores),
-            'min_score': min(scores),
-            'std_dev': statistics.stdev(scores) if len(scores) > 1 else 0,
-            'grade_distribution': dict(Counter(self.get_grade(score) for score in scores)),
-            'students': sorted(students_with_scores, key=lambda x: x['score'], reverse=True)
+            'student_count': count,
+            'average': average,
+            'median': self._median_of_sorted([-key[0] for key in keys]),
+            'max_score': -keys[0][0],
+            'min_score': -keys[-1][0],
+            'std_dev': std_dev,
+            'grade_distribution': grade_distribution,
+            'students': [{
+                'student_id': student_id,
+                'name': self.students[student_id]['name'],
+                'score': -neg_score,
+                'grade': self.get_grade(-neg_score)
+            } for neg_score, _seq, student_id in keys]
         }
         
         return stats
@@ -343,53 +595,60 @@ class StudentManager:
         Returns:
             Dict: 各专业的统计信息
         """
-        major_stats = defaultdict(lambda: {
-            'student_count': 0,
-            'total_scores': [],
-            'students': []
-        })
-        
-        # 按专业分组统计
-        for student_id, student_info in self.students.items():
-            major = student_info['major']
-            major_stats[major]['student_count'] += 1
-            major_stats[major]['students'].append({
+        self._refresh_leaderboards()
+        result = {}
+        for major, student_ids in self._major_index.items():
+            if not student_ids:
+                continue
+            
+            # 有成绩的学生来自专业排行榜（已按平均分降序），无成绩的按添加顺序排在后面
+            leaderboard = self._major_leaderboards.get(major)
+            ranked = leaderboard.head(len(leaderboard)) if leaderboard else []
+            students = [{
                 'student_id': student_id,
-                'name': student_info['name'],
-                'average': self.calculate_student_average(student_id)
-            })
+                'name': self.students[student_id]['name'],
+                'average': -neg_average
+            } for neg_average, _seq, student_id in ranked]
             
-            # 收集该专业所有学生的所有成绩
-            scores = list(student_info['scores'].values())
-            major_stats[major]['total_scores'].extend(scores)
-        
-        # 计算每个专业的统计信息
-        result = {}
-        for major, data in major_stats.items():
-            scores = data['total_scores']
+            if len(ranked) < len(student_ids):
+                # 与原来按 average or 0 降序的稳定排序一致：无成绩的学生和平均分不高于0的学生
+                # 视为同分，按添加顺序交错排列
+                ranked_ids = {student_id for _avg, _seq, student_id in ranked}
+                tail = [student for student in students if student['average'] <= 0]
+                del students[len(students) - len(tail):]
+                tail.extend({
+                    'student_id': student_id,
+                    'name': self.students[student_id]['name'],
+                    'average': None
+                } for student_id in student_ids - ranked_ids)
+                tail.sort(key=lambda student: (-(student['average'] or 0),
+                                               self._seq[student['student_id']]))
+                students.extend(tail)
+            
+            scores = self._major_scores.get(major)
             if scores:
+                total, count = self._major_totals[major]
+                keys = scores.head(len(scores))
                 result[major] = {
-                    'student_count': data['student_count'],
-                    'average_score': statistics.mean(scores),
-                    'median_score': statistics.median(scores),
-                    'max_score': max(scores),
-                    'min_score': min(scores),
-                    'students': sorted(data['students'], 
-                                     key=lambda x: x['average'] or 0, 
-                                     reverse=True)
+                    'student_count': len(student_ids),
+                    'average_score': total / count,
+                    'median_score': self._median_of_sorted([key[0] for key in keys]),
+                    'max_score': keys[-1][0],
+                    'min_score': keys[0][0],
+                    'students': students
                 }
             else:
                 result[major] = {
-                    'student_count': data['student_count'],
+                    'student_count': len(student_ids),
                     'message': '该专业暂无成绩记录',
-                    'students': data['students']
+                    'students': students
                 }
         
         return result
     
     def get_top_students(self, n: int = 10, course: str = None) -> List[Dict[str, Any]]:
         """
-        获取成绩排名前N的学生
+        获取成绩排名前N的学生（直接读取维护好的排行榜，不再全量排序）
         
         Args:
             n: 返回的学生数量
@@ -398,39 +657,30 @@ class StudentManager:
         Returns:
             List[Dict]: 排名前N的学生信息
         """
-        student_scores = []
-        
-        for student_id, student_info in self.students.items():
-            if course:
-                # 按指定课程排名
-                if course in student_info['scores']:
-                    score = student_info['scores'][course]
-                    student_scores.append({
-                        'student_id': student_id,
-                        'name': student_info['name'],
-                        'major': student_info['major'],
-                        'score': score,
-                        'grade': self.get_grade(score),
-                        'course': course
-                    })
-            else:
-                # 按平均分排名
-                avg_score = self.calculate_student_average(student_id)
-                if avg_score is not None:
-                    student_scores.append({
-                        'student_id': student_id,
-                        'name': student_info['name'],
-                        'major': student_info['major'],
-                        'average_score': avg_score,
-                        'grade': self.get_grade(avg_score),
-                        'course_count': len(student_info['scores'])
-                    })
-        
-        # 按分数降序排序
-        sort_key = 'score' if course else 'average_score'
-        student_scores.sort(key=lambda x: x[sort_key], reverse=True)
-        
-        return student_scores[:n]
+        if course:
+            # 按指定课程排名
+            index = self._course_index.get(course)
+            if not index:
+                return []
+            return [{
+                'student_id': student_id,
+                'name': self.students[student_id]['name'],
+                'major': self.students[student_id]['major'],
+                'score': -neg_score,
+                'grade': self.get_grade(-neg_score),
+                'course': course
+            } for neg_score, _seq, student_id in index.head(n)]
+        
+        # 按平均分排名
+        self._refresh_leaderboards()
+        return [{
+            'student_id': student_id,
+            'name': self.students[student_id]['name'],
+            'major': self.students[student_id]['major'],
+            'average_score': -neg_average,
+            'grade': self.get_grade(-neg_average),
+            'course_count': len(self.students[student_id]['scores'])
+        } for neg_average, _seq, student_id in self._leaderboard.head(n)]
     
     def export_to_json(self, filename: str) -> bool:
         """
@@ -454,6 +704,7 @@ class StudentManager:
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(export_data, f, ensure_ascii=False, indent=2)
             
+            self._clear_dirty()
             print(f"数据已导出到 {filename}")
             return True
         except Exception as e:
@@ -477,6 +728,8 @@ class StudentManager:
             self.students = data.get('students', {})
             self.majors = set(data.get('majors', []))
             self.courses = set(data.get('courses', []))
+            self._rebuild_indexes()
+            self._clear_dirty()
             
             # 合并配置，保留现有配置的优先级
             imported_config = data.get('config', {})
@@ -491,12 +744,15 @@ class StudentManager:
             print(f"导入失败：{e}")
             return False
     
-    def export_to_csv(self, filename: str) -> bool:
+    def export_to_csv(self, filename: str, batch_size: int = 1000,
+                      progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bool:
         """
-        导出学生信息到CSV文件
+        导出学生信息到CSV文件（按批写入）
         
         Args:
             filename: 文件名
+            batch_size: 每批写入的行数
+            progress_callback: 进度回调 (已处理数, 总数)
         
         Returns:
             bool: 导出成功返回True
@@ -506,29 +762,36 @@ class StudentManager:
                 writer = csv.writer(f)
                 
                 # 写入表头
-                headers = ['学号', '姓名', '专业', '年龄', '邮箱', '平均分', '课程数']
+                headers = list(self.CSV_HEADERS)
                 all_courses = sorted(self.courses)
                 headers.extend(all_courses)
                 writer.writerow(headers)
                 
                 # 写入学生数据
-                for student_id, student_info in self.students.items():
-                    row = [
-                        student_id,
-                        student_info['name'],
-                        student_info['major'],
-                        student_info.get('age', ''),
-                        student_info.get('email', ''),
-                        self.calculate_student_average(student_id) or '',
-                        len(student_info['scores'])
-                    ]
-                    
-                    # 添加各科成绩
-                    for course in all_courses:
-                        score = student_info['scores'].get(course, '')
-                        row.append(score)
+                total = len(self.students)
+                processed = 0
+                for batch in self._batched(self.students.items(), batch_size):
+                    rows = []
+                    for student_id, student_info in batch:
+                        scores = student_info['scores']
+                        row = [
+                            student_id,
+                            student_info['name'],
+                            student_info['major'],
+                            student_info.get('age', ''),
+                            student_info.get('email', ''),
+                            self.calculate_student_average(student_id) or '',
+                            len(scores)
+                        ]
+                        
+                        # 添加各科成绩
+                        row.extend(scores.get(course, '') for course in all_courses)
+                        rows.append(row)
                     
-                    writer.writerow(row)
+                    writer.writerows(rows)
+                    processed += len(rows)
+                    if progress_callback:
+                        progress_callback(processed, total)
             
             print(f"学生信息已导出到 {filename}")
             return True
@@ -536,6 +799,159 @@ class StudentManager:
             print(f"导出失败：{e}")
             return False
     
+    # ==================== 流式导入导出 ====================
+    
+    def export_to_jsonl(self, filename: str, batch_size: int = 1000,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bool:
+        """
+        以 JSON Lines 格式导出全部学生（每行一个学生，按批写入）
+        
+        与 export_to_json 不同，不需要先在内存中组装整个数据结构。
+        
+        Args:
+            filename: 文件名
+            batch_size: 每批写入的学生数
+            progress_callback: 进度回调 (已处理数, 总数)
+        
+        Returns:
+            bool: 导出成功返回True
+        """
+        records = ({'student_id': student_id, **student_info}
+                   for student_id, student_info in self.students.items())
+        count = self._write_jsonl(filename, 'w', records, len(self.students),
+                                  batch_size, progress_callback)
+        if count is None:
+            return False
+        
+        self._clear_dirty()
+        print(f"已导出 {count} 个学生到 {filename}")
+        return True
+    
+    def export_changes_to_jsonl(self, filename: str, batch_size: int = 1000,
+                                progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> bool:
+        """
+        增量导出：把上次导出以来新增/修改的学生追加到 JSON Lines 文件
+        
+        删除的学生写成 {"student_id": ..., "deleted": true}，
+        import_from_jsonl 按顺序回放即可得到最新状态。
+        
+        Args:
+            filename: 文件名（追加写入）
+            batch_size: 每批写入的学生数
+            progress_callback: 进度回调 (已处理数, 总数)
+        
+        Returns:
+            bool: 导出成功返回True
+        """
+        deleted = sorted(self._deleted_students)
+        changed = sorted(self._dirty_students, key=self._seq.__getitem__)
+        
+        def records():
+            for student_id in deleted:
+                yield {'student_id': student_id, 'deleted': True}
+            for student_id in changed:
+                yield {'student_id': student_id, **self.students[student_id]}
+        
+        count = self._write_jsonl(filename, 'a', records(), len(deleted) + len(changed),
+                                  batch_size, progress_callback)
+        if count is None:
+            return False
+        
+        self._clear_dirty()
+        print(f"增量导出到 {filename}：{len(changed)} 个新增/修改，{len(deleted)} 个删除")
+        return True
+    
+    def import_from_jsonl(self, filename: str, batch_size: int = 1000,
+                          progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """
+        从 JSON Lines 文件流式导入（与现有数据合并，学号相同的记录覆盖旧数据）
+        
+        每批记录先整体校验，再一次性写入；无效的行会被跳过并记录原因。
+        
+        Args:
+            filename: 文件名
+            batch_size: 每批处理的行数
+            progress_callback: 进度回调 (已处理行数, None)
+        
+        Returns:
+            Dict: 导入结果 {'imported', 'deleted', 'invalid', 'errors'}
+        """
+        def records(f):
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, f"JSON格式错误: {e.msg}"
+        
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                result = self._import_records(records(f), batch_size, progress_callback)
+        except OSError as e:
+            print(f"导入失败：{e}")
+            return {'imported': 0, 'deleted': 0, 'invalid': 0, 'errors': [str(e)]}
+        
+        print(f"从 {filename} 导入 {result['imported']} 个学生，删除 {result['deleted']} 个，"
+              f"跳过无效记录 {result['invalid']} 条")
+        return result
+    
+    def import_from_csv(self, filename: str, batch_size: int = 1000,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, Any]:
+        """
+        从 export_to_csv 格式的CSV文件流式导入（与现有数据合并）
+        
+        Args:
+            filename: 文件名
+            batch_size: 每批处理的行数
+            progress_callback: 进度回调 (已处理行数, None)
+        
+        Returns:
+            Dict: 导入结果 {'imported', 'deleted', 'invalid', 'errors'}
+        """
+        fixed_columns = len(self.CSV_HEADERS)
+        
+        def parse_number(value: str):
+            return float(value) if any(c in value for c in '.eE') else int(value)
+        
+        def records(f):
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            courses = header[fixed_columns:]
+            
+            for row in reader:
+                line_number = reader.line_num
+                if not row:
+                    continue
+                if len(row) < fixed_columns:
+                    yield line_number, "列数不足"
+                    continue
+                try:
+                    yield line_number, {
+                        'student_id': row[0],
+                        'name': row[1],
+                        'major': row[2],
+                        'age': int(row[3]) if row[3] else None,
+                        'email': row[4] or None,
+                        'scores': {course: parse_number(value)
+                                   for course, value in zip(courses, row[fixed_columns:]) if value}
+                    }
+                except ValueError as e:
+                    yield line_number, f"数值格式错误: {e}"
+        
+        try:
+            with open(filename, 'r', newline='', encoding='utf-8') as f:
+                result = self._import_records(records(f), batch_size, progress_callback)
+        except OSError as e:
+            print(f"导入失败：{e}")
+            return {'imported': 0, 'deleted': 0, 'invalid': 0, 'errors': [str(e)]}
+        
+        print(f"从 {filename} 导入 {result['imported']} 个学生，跳过无效记录 {result['invalid']} 条")
+        return result
+    
     def get_summary(self) -> Dict[str, Any]:
         """
         获取系统概览信息
@@ -547,11 +963,12 @@ class StudentManager:
         total_majors = len(self.majors)
         total_courses = len(self.courses)
         
-        # 统计有成绩的学生数
-        students_with_scores = sum(1 for s in self.students.values() if s['scores'])
+        # 统计有成绩的学生数（排行榜里正好是所有有成绩的学生）
+        self._refresh_leaderboards()
+        students_with_scores = len(self._leaderboard)
         
         # 统计总成绩记录数
-        total_score_records = sum(len(s['scores']) for s in self.students.values())
+        total_score_records = self._score_record_count
         
         # 最新添加的学生
         latest_student = None
@@ -602,6 +1019,329 @@ class StudentManager:
             print(f"\n最新添加学生：{latest['name']} ({latest['student_id']})")
         
         print("=" * 50)
+    
+    # ==================== 导入导出辅助 ====================
+    
+    # CSV 固定列，之后每门课程一列
+    CSV_HEADERS = ('学号', '姓名', '专业', '年龄', '邮箱', '平均分', '课程数')
+    
+    # 导入结果中最多保留的错误信息条数
+    MAX_REPORTED_ERRORS = 20
+    
+    @staticmethod
+    def _batched(iterable: Iterable, batch_size: int) -> Iterator[list]:
+        """把可迭代对象按批切分"""
+        batch = []
+        for item in iterable:
+            batch.append(item)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def _write_jsonl(self, filename: str, mode: str, records: Iterable[Dict[str, Any]],
+                     total: int, batch_size: int,
+                     progress_callback: Optional[Callable[[int, Optional[int]], None]]) -> Optional[int]:
+        """按批把记录写成 JSON Lines，返回写入条数，失败返回None"""
+        processed = 0
+        try:
+            with open(filename, mode, encoding='utf-8') as f:
+                for batch in self._batched(records, batch_size):
+                    f.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+                    processed += len(batch)
+                    if progress_callback:
+                        progress_callback(processed, total)
+        except Exception as e:
+            print(f"导出失败：{e}")
+            return None
+        return processed
+    
+    def _import_records(self, records: Iterable[Tuple[int, Any]], batch_size: int,
+                        progress_callback: Optional[Callable[[int, Optional[int]], None]]) -> Dict[str, Any]:
+        """
+        按批校验并写入记录
+        
+        records 产出 (行号, 记录字典或解析错误信息)。
+        新学号超过 config['max_students'] 上限时，该记录按无效记录跳过。
+        """
+        result = {'imported': 0, 'deleted': 0, 'invalid': 0, 'errors': []}
+        processed = 0
+        
+        def reject(line_number: int, error: str):
+            result['invalid'] += 1
+            if len(result['errors']) < self.MAX_REPORTED_ERRORS:
+                result['errors'].append(f"第 {line_number} 行：{error}")
+        
+        for batch in self._batched(records, batch_size):
+            # 先整批校验，再整批写入
+            valid = []
+            for line_number, record in batch:
+                error = record if isinstance(record, str) else self.validate_record(record)
+                if error is None:
+                    valid.append((line_number, record))
+                else:
+                    reject(line_number, error)
+            
+            # 按顺序写入，批内先删除的学生会腾出名额
+            for line_number, record in valid:
+                if record.get('deleted'):
+                    if self._drop_student(record['student_id']):
+                        result['deleted'] += 1
+                elif (record['student_id'] not in self.students
+                      and len(self.students) >= self.config['max_students']):
+                    reject(line_number, f"学生数量已达上限 {self.config['max_students']}")
+                else:
+                    self._load_record(record)
+                    result['imported'] += 1
+            
+            processed += len(batch)
+            if progress_callback:
+                progress_callback(processed, None)
+        
+        return result
+    
+    def _load_record(self, record: Dict[str, Any]):
+        """写入一条已校验的记录（覆盖同学号的旧数据，不打印、不标记为待导出）"""
+        student_id = record['student_id']
+        if student_id in self._deleted_students:
+            # 之前删除且尚未导出的学生重新出现，增量导出时要写出它的新数据
+            self._mark_dirty(student_id)
+        now = datetime.now().isoformat()
+        old_info = self.students.get(student_id)
+        if old_info is not None:
+            self._unindex_student(student_id)
+        
+        student_info = {
+            'name': record['name'],
+            'major': record['major'],
+            'age': record.get('age'),
+            'email': record.get('email'),
+            'scores': dict(record.get('scores', {})),
+            'created_at': record.get('created_at') or (old_info or {}).get('created_at') or now,
+            'updated_at': record.get('updated_at') or now
+        }
+        self.students[student_id] = student_info
+        self.majors.add(student_info['major'])
+        self.courses.update(student_info['scores'])
+        self._index_student(student_id)
+    
+    def _drop_student(self, student_id: str) -> bool:
+        """删除学生（导入回放用，不打印），与 remove_student 一样记录到待导出的删除集合"""
+        if student_id not in self.students:
+            return False
+        self._unindex_student(student_id)
+        del self.students[student_id]
+        del self._seq[student_id]
+        self._dirty_students.discard(student_id)
+        self._deleted_students.add(student_id)
+        return True
+    
+    def _mark_dirty(self, student_id: str):
+        """记录学生在上次导出后发生了变化"""
+        self._dirty_students.add(student_id)
+        self._deleted_students.discard(student_id)
+    
+    def _clear_dirty(self):
+        """全量导出或导入后清空变化记录"""
+        self._dirty_students.clear()
+        self._deleted_students.clear()
+    
+    # ==================== 索引维护 ====================
+    
+    def _reset_indexes(self):
+        """清空所有索引"""
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+        self._major_index: Dict[str, Set[str]] = defaultdict(set)
+        # 年龄为空（或为0）的学生单独存放，与原有的 age or 0 / age or 999 规则一致
+        self._age_index = SortedIndex()
+        self._students_without_age: Set[str] = set()
+        self._name_trie = NameTrie()
+        
+        # 学号 -> [总分, 课程数]；学号 -> 当前在排行榜中的键
+        self._score_totals: Dict[str, List[float]] = {}
+        self._average_keys: Dict[str, tuple] = {}
+        # 平均分有变化、排行榜尚未更新的学生；查询排行榜前统一刷新
+        self._stale_averages: Set[str] = set()
+        self._leaderboard = SortedIndex()
+        self._major_leaderboards: Dict[str, SortedIndex] = defaultdict(SortedIndex)
+        
+        # 课程 -> (-分数, 序号, 学号) 有序索引；
+        # 课程 -> [人数, 平均分, 离差平方和]（Welford 增量更新，避免平方和相减的精度损失）
+        self._course_index: Dict[str, SortedIndex] = defaultdict(SortedIndex)
+        self._course_totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+        
+        # 专业 -> (分数, 序号, 课程) 有序索引；专业 -> [总分, 成绩数]
+        self._major_scores: Dict[str, SortedIndex] = defaultdict(SortedIndex)
+        self._major_totals: Dict[str, List[float]] = defaultdict(lambda: [0, 0])
+        
+        self._score_record_count = 0
+    
+    def _rebuild_indexes(self):
+        """根据 self.students 重建所有索引（导入数据后调用）"""
+        self._reset_indexes()
+        for student_id, student_info in self.students.items():
+            self.majors.add(student_info['major'])
+            self.courses.update(student_info['scores'])
+            self._index_student(student_id)
+    
+    def _index_student(self, student_id: str):
+        """把学生加入所有索引"""
+        student_info = self.students[student_id]
+        if student_id not in self._seq:
+            self._seq[student_id] = self._next_seq
+            self._next_seq += 1
+        seq = self._seq[student_id]
+        
+        major = student_info['major']
+        self._major_index[major].add(student_id)
+        self._name_trie.insert(student_info['name'], student_id)
+        
+        age = student_info.get('age')
+        if age:
+            self._age_index.add((age, seq, student_id))
+        else:
+            self._students_without_age.add(student_id)
+        
+        scores = student_info['scores']
+        for course, score in scores.items():
+            self._index_score(student_id, course, score, major)
+        self._score_totals[student_id] = [sum(scores.values()), len(scores)]
+        self._stale_averages.add(student_id)
+    
+    def _unindex_student(self, student_id: str):
+        """把学生从所有索引中移除（序号保留，重新加入时排名顺序不变）"""
+        student_info = self.students[student_id]
+        seq = self._seq[student_id]
+        
+        major = student_info['major']
+        self._major_index[major].discard(student_id)
+        if not self._major_index[major]:
+            del self._major_index[major]
+        self._name_trie.remove(student_info['name'], student_id)
+        
+        age = student_info.get('age')
+        if age:
+            self._age_index.discard((age, seq, student_id))
+        else:
+            self._students_without_age.discard(student_id)
+        
+        self._remove_average_key(student_id)
+        self._stale_averages.discard(student_id)
+        for course, score in student_info['scores'].items():
+            self._unindex_score(student_id, course, score, major)
+        self._score_totals.pop(student_id, None)
+    
+    def _set_score(self, student_id: str, course: str, score: float):
+        """写入成绩并同步更新课程索引、专业索引和平均分排行榜"""
+        student_info = self.students[student_id]
+        major = student_info['major']
+        scores = student_info['scores']
+        
+        old_score = scores.get(course)
+        if old_score is not None:
+            self._unindex_score(student_id, course, old_score, major)
+        
+        scores[course] = score
+        self._index_score(student_id, course, score, major)
+        
+        # 每个学生只有几门课，直接重算总分可以避免浮点累加误差
+        self._score_totals[student_id] = [sum(scores.values()), len(scores)]
+        self._stale_averages.add(student_id)
+    
+    def _index_score(self, student_id: str, course: str, score: float, major: str):
+        seq = self._seq[student_id]
+        self._course_index[course].add((-score, seq, student_id))
+        course_totals = self._course_totals[course]
+        course_totals[0] += 1
+        delta = score - course_totals[1]
+        course_totals[1] += delta / course_totals[0]
+        course_totals[2] += delta * (score - course_totals[1])
+        
+        self._major_scores[major].add((score, seq, course))
+        major_totals = self._major_totals[major]
+        major_totals[0] += score
+        major_totals[1] += 1
+        
+        self._score_record_count += 1
+    
+    def _unindex_score(self, student_id: str, course: str, score: float, major: str):
+        seq = self._seq[student_id]
+        self._course_index[course].discard((-score, seq, student_id))
+        course_totals = self._course_totals[course]
+        course_totals[0] -= 1
+        if not course_totals[0]:
+            del self._course_index[course]
+            del self._course_totals[course]
+        elif course_totals[0] <= self.RECOMPUTE_COURSE_STATS:
+            # 人数较少时直接用剩余成绩重算，逆向更新的舍入误差不会累积
+            scores = [-key[0] for key in self._course_index[course]]
+            mean = sum(scores) / len(scores)
+            course_totals[1] = mean
+            course_totals[2] = sum((value - mean) ** 2 for value in scores)
+        else:
+            # Welford 的逆向更新；舍入误差可能留下极小的值或负值，截断为0
+            old_mean = course_totals[1]
+            course_totals[1] -= (score - old_mean) / course_totals[0]
+            square_deviation = course_totals[2] - (score - old_mean) * (score - course_totals[1])
+            if square_deviation <= 1e-9 * course_totals[0] * max(old_mean * old_mean, 1.0):
+                square_deviation = 0.0
+            course_totals[2] = square_deviation
+        
+        self._major_scores[major].discard((score, seq, course))
+        major_totals = self._major_totals[major]
+        major_totals[0] -= score
+        major_totals[1] -= 1
+        if not major_totals[1]:
+            del self._major_scores[major]
+            del self._major_totals[major]
+        
+        self._score_record_count -= 1
+    
+    def _refresh_leaderboards(self):
+        """把平均分有变化的学生重新放入排行榜"""
+        for student_id in self._stale_averages:
+            self._remove_average_key(student_id)
+            self._update_average_key(student_id)
+        self._stale_averages.clear()
+    
+    def _update_average_key(self, student_id: str):
+        """按当前平均分把学生放入排行榜"""
+        average = self.calculate_student_average(student_id)
+        if average is None:
+            return
+        key = (-average, self._seq[student_id], student_id)
+        self._average_keys[student_id] = key
+        self._leaderboard.add(key)
+        self._major_leaderboards[self.students[student_id]['major']].add(key)
+    
+    def _remove_average_key(self, student_id: str):
+        """把学生从排行榜移除"""
+        key = self._average_keys.pop(student_id, None)
+        if key is None:
+            return
+        self._leaderboard.discard(key)
+        self._major_leaderboards[self.students[student_id]['major']].discard(key)
+    
+    def _students_in_age_range(self, min_age: Optional[int], max_age: Optional[int]) -> Set[str]:
+        """按年龄范围查询学号（边界包含在内）"""
+        low = (min_age,) if min_age is not None else None
+        high = (max_age, math.inf) if max_age is not None else None
+        result = {student_id for _age, _seq, student_id in self._age_index.range(low, high)}
+        
+        # 未填写年龄的学生：min_age 按0比较，max_age 按999比较
+        if (min_age is None or min_age <= 0) and (max_age is None or max_age >= 999):
+            result |= self._students_without_age
+        return result
+    
+    @staticmethod
+    def _median_of_sorted(values: List[float]) -> float:
+        """有序列表的中位数"""
+        middle = len(values) // 2
+        if len(values) % 2:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2
 
 
 def demonstrate_system():
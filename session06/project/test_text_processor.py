@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文本处理器测试：多词匹配
+
+验证 WordMatcher 在英文和中文混合的词表中优先匹配最长的词，
+以及英文词的边界检查。
+
+运行测试:
+    python test_text_processor.py
+
+作者: Python教程团队
+"""
+
+import unittest
+
+from text_processor import TextProcessor, WordMatcher
+
+
+class TestWordMatcher(unittest.TestCase):
+    """
+    多词匹配器测试类
+    """
+
+    def test_longest_match_with_mixed_prefix(self):
+        """英文开头、中文结尾的长词优先于它的英文前缀"""
+        matcher = WordMatcher(('ab', 'ab中'))
+        self.assertEqual(matcher.find_all('xx ab中 yy'), ['ab中'])
+        self.assertEqual(matcher.find_all('xx ab yy'), ['ab'])
+
+    def test_longest_match_with_chinese_prefix(self):
+        """中文开头的长词优先于它的中文前缀"""
+        matcher = WordMatcher(('中', '中cat'))
+        self.assertEqual(matcher.find_all('中cat 中'), ['中cat', '中'])
+
+    def test_falls_back_to_shorter_word_on_boundary(self):
+        """长词的右边界不满足时回退到较短的词"""
+        matcher = WordMatcher(('中', '中cat'))
+        self.assertEqual(matcher.find_all('中cats'), ['中'])
+
+    def test_english_word_boundary(self):
+        """英文词前后不能紧挨英文字母或数字，中文词不受限制"""
+        matcher = WordMatcher(('cat', '猫'))
+        self.assertEqual(matcher.find_all('cat cats 1cat 猫猫'), ['cat', '猫', '猫'])
+
+    def test_ignore_case_keeps_original(self):
+        """忽略大小写匹配，并能找回原始写法"""
+        matcher = WordMatcher(('Python',))
+        self.assertEqual(matcher.find_all('PYTHON python'), ['PYTHON', 'python'])
+        self.assertEqual(matcher.original('PYTHON'), 'Python')
+
+    def test_replace_patterns_prefers_longest(self):
+        """单次扫描替换同样优先替换最长的词"""
+        result = TextProcessor.replace_patterns('ab中 ab', {'ab': 'X', 'ab中': 'Y'})
+        self.assertEqual(result, 'Y X')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -17,11 +17,16 @@ Session 06: 函数编程 - 项目：文本处理工具集
 创建日期: 2024-12-22
 """
 
+import os
 import re
+import json
 import string
 import unicodedata
-from typing import List, Dict, Tuple, Optional, Callable
-from functools import wraps
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import List, Dict, Tuple, Optional, Callable, Iterable, Iterator, Any
+from functools import wraps, lru_cache
 import time
 
 
@@ -87,6 +92,28 @@ def cache_result(func):
 
 # ==================== 文本分析模块 ====================
 
+# 一次扫描用的分词正则：单词串（\w+）和句末标点串，其余字符不产生标记
+SENTENCE_END_CHARS = '.!?。！？'
+_TOKEN_PATTERN = re.compile(r'(\w+)|([' + re.escape(SENTENCE_END_CHARS) + r']+)')
+_CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff]+')
+
+
+def tokenize(text: str) -> List[Tuple[bool, int, int]]:
+    """
+    把文本切分成紧凑的标记流
+
+    参数:
+        text: 输入文本
+
+    返回:
+        list: [(是否单词串, 起始位置, 结束位置), ...]，不是单词串的就是句末标点串
+    """
+    return [
+        (match.lastindex == 1, *match.span())
+        for match in _TOKEN_PATTERN.finditer(text)
+    ]
+
+
 class TextAnalyzer:
     """
     文本分析器类
@@ -190,12 +217,20 @@ class TextAnalyzer:
         sentences = re.split(r'[.!?。！？]+', text)
         sentences = [s.strip() for s in sentences if s.strip()]
         
-        if not words or not sentences:
+        return TextAnalyzer._readability_from_counts(
+            len(words), sum(len(word) for word in words), len(sentences)
+        )
+
+    @staticmethod
+    def _readability_from_counts(word_count: int, word_chars: int,
+                                 sentence_count: int) -> Dict[str, float]:
+        """根据单词数、单词总字符数和句子数计算可读性"""
+        if not word_count or not sentence_count:
             return {'readability_score': 0, 'difficulty_level': '无法分析'}
         
         # 简化的可读性评分
-        avg_words_per_sentence = len(words) / len(sentences)
-        avg_chars_per_word = sum(len(word) for word in words) / len(words)
+        avg_words_per_sentence = word_count / sentence_count
+        avg_chars_per_word = word_chars / word_count
         
         # 可读性评分 (简化版)
         readability_score = 100 - (avg_words_per_sentence * 1.5) - (avg_chars_per_word * 2)
@@ -220,6 +255,110 @@ class TextAnalyzer:
             'avg_chars_per_word': round(avg_chars_per_word, 2)
         }
 
+    @staticmethod
+    @validate_input(str, True)
+    def analyze_all(text: str) -> Dict[str, Dict]:
+        """
+        一次扫描完成全部统计
+
+        只分词一次，由标记流推导出字符、单词、句子和可读性统计，
+        结果与分别调用 count_characters、count_words(language='mixed')、
+        count_sentences、analyze_readability 完全一致。
+
+        参数:
+            text: 输入文本
+
+        返回:
+            dict: {'characters': ..., 'words': ..., 'sentences': ..., 'readability': ...}
+        """
+        letters = digits = chinese_chars = word_chars = word_count = 0
+        english_words = []
+        chinese_words = []
+        sentences = []
+        sentence_start = 0
+
+        for is_word, start, end in tokenize(text):
+            token = text[start:end]
+
+            if is_word:
+                # \w+ 串就是可读性分析中的单词
+                word_count += 1
+                word_chars += end - start
+
+                if token.isascii():
+                    # 纯英文字母串才算英文单词（与 \b[a-zA-Z]+\b 一致）
+                    if token.isalpha():
+                        letters += end - start
+                        english_words.append(token)
+                    elif token.isdigit():
+                        digits += end - start
+                    else:
+                        letters += sum(map(str.isalpha, token))
+                        digits += sum(map(str.isdigit, token))
+                else:
+                    if token.isalpha():
+                        letters += end - start
+                    else:
+                        letters += sum(map(str.isalpha, token))
+                        digits += sum(map(str.isdigit, token))
+                    for chinese in _CHINESE_PATTERN.findall(token):
+                        chinese_words.append(chinese)
+                        chinese_chars += len(chinese)
+            else:
+                sentence = text[sentence_start:start].strip()
+                if sentence:
+                    sentences.append(sentence)
+                sentence_start = end
+
+        sentence = text[sentence_start:].strip()
+        if sentence:
+            sentences.append(sentence)
+
+        words = english_words + chinese_words
+
+        return {
+            'characters': {
+                'total_chars': len(text),
+                'letters': letters,
+                'digits': digits,
+                'spaces': text.count(' '),
+                'punctuation': sum(text.count(c) for c in string.punctuation),
+                'chinese_chars': chinese_chars
+            },
+            'words': {
+                'total_words': len(words),
+                'unique_words': len(set(words)),
+                'average_length': sum(len(word) for word in words) / len(words) if words else 0,
+                'longest_word': max(words, key=len) if words else '',
+                'shortest_word': min(words, key=len) if words else ''
+            },
+            'sentences': {
+                'total_sentences': len(sentences),
+                'average_length': sum(len(s) for s in sentences) / len(sentences) if sentences else 0,
+                'longest_sentence': max(sentences, key=len) if sentences else '',
+                'shortest_sentence': min(sentences, key=len) if sentences else ''
+            },
+            'readability': TextAnalyzer._readability_from_counts(word_count, word_chars, len(sentences))
+        }
+
+    @staticmethod
+    def analyze_many(texts: Iterable[str], max_workers: Optional[int] = 1,
+                     chunk_size: int = 1000) -> List[Dict[str, Dict]]:
+        """
+        批量综合统计
+
+        参数:
+            texts: 文本列表（或任意可迭代对象）
+            max_workers: 进程数，默认1（当前进程）；大于1或为 None 时使用 BatchEngine 并行
+            chunk_size: 并行时每块的条数
+
+        返回:
+            list: 每个文本的 analyze_all 结果
+        """
+        return batch_process_texts(
+            texts, TextAnalyzer.analyze_all, max_workers=max_workers, chunk_size=chunk_size
+        )
+
 
 # ==================== 文本格式化模块 ====================
 
@@ -378,6 +517,76 @@ class TextFormatter:
 
 # ==================== 文本转换模块 ====================
 
+# 简化的拼音映射（实际应用中应使用专门的拼音库）
+PINYIN_MAP = {
+    '你': 'ni', '好': 'hao', '世': 'shi', '界': 'jie',
+    '中': 'zhong', '国': 'guo', '人': 'ren', '民': 'min',
+    '大': 'da', '学': 'xue', '生': 'sheng', '活': 'huo'
+}
+
+MORSE_MAP = {
+    'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
+    'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
+    'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
+    'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
+    'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
+    '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
+    '8': '---..', '9': '----.', ' ': '/'
+}
+
+# 每个字节对应的8位二进制字符串，转换时直接查表
+_BYTE_BITS = tuple(format(byte, '08b') for byte in range(256))
+
+
+class _LazyTranslationTable(dict):
+    """
+    按需填充的 str.translate 转换表
+
+    第一次遇到某个字符时才计算它的转换结果并记住，
+    之后同一字符直接查表，任意 Unicode 字符都能处理。
+    """
+
+    def __init__(self, convert_char: Callable[[str], Optional[str]]):
+        super().__init__()
+        self.convert_char = convert_char
+
+    def __missing__(self, code: int) -> Optional[str]:
+        value = self.convert_char(chr(code))
+        self[code] = value
+        return value
+
+
+def _pinyin_char(char: str) -> Optional[str]:
+    """单个字符的拼音转换结果（带分隔空格），None 表示丢弃该字符"""
+    if char in PINYIN_MAP:
+        return PINYIN_MAP[char] + ' '
+    if char.isalpha():
+        return char + ' '
+    if char.isspace():
+        return '  '
+    return None
+
+
+def _morse_char(char: str) -> Optional[str]:
+    """单个字符的摩尔斯电码（带分隔空格），None 表示丢弃该字符"""
+    code = MORSE_MAP.get(char)
+    return code + ' ' if code is not None else None
+
+
+_PINYIN_TABLE = _LazyTranslationTable(_pinyin_char)
+_MORSE_TABLE = _LazyTranslationTable(_morse_char)
+
+
+@lru_cache(maxsize=65536)
+def _convert_cached(kind: str, text: str) -> str:
+    """带 LRU 缓存的转换，用于大量重复的短文本"""
+    if kind == 'pinyin':
+        return text.translate(_PINYIN_TABLE)[:-1]
+    if kind == 'morse':
+        return text.upper().translate(_MORSE_TABLE)[:-1]
+    return ' '.join(map(_BYTE_BITS.__getitem__, text.encode('utf-8')))
+
+
 class TextConverter:
     """
     文本转换器类
@@ -396,23 +605,8 @@ class TextConverter:
         返回:
             str: 拼音文本
         """
-        # 简化的拼音映射（实际应用中应使用专门的拼音库）
-        pinyin_map = {
-            '你': 'ni', '好': 'hao', '世': 'shi', '界': 'jie',
-            '中': 'zhong', '国': 'guo', '人': 'ren', '民': 'min',
-            '大': 'da', '学': 'xue', '生': 'sheng', '活': 'huo'
-        }
-        
-        result = []
-        for char in text:
-            if char in pinyin_map:
-                result.append(pinyin_map[char])
-            elif char.isalpha():
-                result.append(char)
-            elif char.isspace():
-                result.append(' ')
-        
-        return ' '.join(result)
+        # 查表转换：每个字符映射为"拼音+分隔空格"，最后去掉末尾多出的一个空格
+        return text.translate(_PINYIN_TABLE)[:-1]
     
     @staticmethod
     @validate_input(str, False)
@@ -426,22 +620,7 @@ class TextConverter:
         返回:
             str: 摩尔斯电码
         """
-        morse_map = {
-            'A': '.-', 'B': '-...', 'C': '-.-.', 'D': '-..', 'E': '.', 'F': '..-.',
-            'G': '--.', 'H': '....', 'I': '..', 'J': '.---', 'K': '-.-', 'L': '.-..',
-            'M': '--', 'N': '-.', 'O': '---', 'P': '.--.', 'Q': '--.-', 'R': '.-.',
-            'S': '...', 'T': '-', 'U': '..-', 'V': '...-', 'W': '.--', 'X': '-..-',
-            'Y': '-.--', 'Z': '--..', '0': '-----', '1': '.----', '2': '..---',
-            '3': '...--', '4': '....-', '5': '.....', '6': '-....', '7': '--...',
-            '8': '---..', '9': '----.', ' ': '/'
-        }
-        
-        result = []
-        for char in text.upper():
-            if char in morse_map:
-                result.append(morse_map[char])
-        
-        return ' '.join(result)
+        return text.upper().translate(_MORSE_TABLE)[:-1]
     
     @staticmethod
     @validate_input(str, False)
@@ -458,9 +637,40 @@ class TextConverter:
         """
         try:
             binary_data = text.encode(encoding)
-            return ' '.join(format(byte, '08b') for byte in binary_data)
+            return ' '.join(map(_BYTE_BITS.__getitem__, binary_data))
         except UnicodeEncodeError:
             return "编码错误"
+
+    @staticmethod
+    def convert_many(texts: Iterable[str], kind: str = 'pinyin',
+                     cache_max_length: int = 64) -> List[str]:
+        """
+        批量转换
+
+        短文本（如单词、短语）往往大量重复，走带 LRU 缓存的转换；
+        长文本直接查表转换。
+
+        参数:
+            texts: 文本列表（或任意可迭代对象）
+            kind: 转换类型 ('pinyin', 'morse', 'binary')
+            cache_max_length: 不超过此长度的文本使用缓存
+
+        返回:
+            list: 与输入一一对应的转换结果
+        """
+        converters = {
+            'pinyin': TextConverter.to_pinyin,
+            'morse': TextConverter.to_morse_code,
+            'binary': TextConverter.to_binary,
+        }
+        if kind not in converters:
+            raise ValueError(f"不支持的转换类型: {kind}")
+
+        convert = converters[kind]
+        return [
+            _convert_cached(kind, text) if len(text) <= cache_max_length else convert(text)
+            for text in texts
+        ]
     
     @staticmethod
     @validate_input(str, False)
@@ -500,6 +710,31 @@ class TextConverter:
 
 # ==================== 文本验证模块 ====================
 
+# 预编译的正则表达式注册表：模块加载时编译一次，每次调用直接使用，
+# 省去构建模式字典和 re 模块内部缓存查找的开销
+VALIDATION_PATTERNS = {
+    'email': re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'),
+    'phone_china': re.compile(r'^1[3-9]\d{9}$'),
+    'phone_us': re.compile(r'^\+?1?[2-9]\d{2}[2-9]\d{2}\d{4}$'),
+    'url': re.compile(r'^https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?$'),
+}
+
+# 密码强度规则：(正则, 不满足时的提示)
+PASSWORD_RULES = [
+    (re.compile(r'[a-z]'), "需要包含小写字母"),
+    (re.compile(r'[A-Z]'), "需要包含大写字母"),
+    (re.compile(r'\d'), "需要包含数字"),
+    (re.compile(r'[!@#$%^&*(),.?":{}|<>]'), "需要包含特殊字符"),
+]
+
+EXTRACTION_PATTERNS = {
+    'email': re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'),
+    'phone': re.compile(r'1[3-9]\d{9}'),
+    'url': re.compile(r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?'),
+    'number': re.compile(r'\d+(?:\.\d+)?'),
+}
+
+
 class TextValidator:
     """
     文本验证器类
@@ -517,8 +752,7 @@ class TextValidator:
         返回:
             bool: 是否有效
         """
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(pattern, email))
+        return VALIDATION_PATTERNS['email'].match(email) is not None
     
     @staticmethod
     @validate_input(str, True)
@@ -533,16 +767,12 @@ class TextValidator:
         返回:
             bool: 是否有效
         """
-        if country == 'china':
-            # 中国手机号码
-            pattern = r'^1[3-9]\d{9}$'
-        elif country == 'us':
-            # 美国电话号码
-            pattern = r'^\+?1?[2-9]\d{2}[2-9]\d{2}\d{4}$'
-        else:
+        # 中国手机号码 / 美国电话号码
+        pattern = VALIDATION_PATTERNS.get(f'phone_{country}')
+        if pattern is None:
             return False
         
-        return bool(re.match(pattern, phone.replace('-', '').replace(' ', '')))
+        return pattern.match(phone.replace('-', '').replace(' ', '')) is not None
     
     @staticmethod
     @validate_input(str, True)
@@ -593,17 +823,9 @@ class TextValidator:
         if len(password) < 8:
             issues.append("密码长度至少8位")
         
-        if not re.search(r'[a-z]', password):
-            issues.append("需要包含小写字母")
-        
-        if not re.search(r'[A-Z]', password):
-            issues.append("需要包含大写字母")
-        
-        if not re.search(r'\d', password):
-            issues.append("需要包含数字")
-        
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', password):
-            issues.append("需要包含特殊字符")
+        for pattern, message in PASSWORD_RULES:
+            if pattern.search(password) is None:
+                issues.append(message)
         
         return len(issues) == 0, issues
     
@@ -619,8 +841,188 @@ class TextValidator:
         返回:
             bool: 是否有效
         """
-        pattern = r'^https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?$'
-        return bool(re.match(pattern, url))
+        return VALIDATION_PATTERNS['url'].match(url) is not None
+
+    @staticmethod
+    def validate_many(values: Iterable[str], kind: str, country: str = 'china') -> List[bool]:
+        """
+        批量验证
+
+        直接使用预编译正则的 match 方法，每条数据只有一次方法调用，
+        适合验证大量字段。空字符串视为无效（单条验证函数会对空值报错）。
+
+        参数:
+            values: 字符串列表（或任意可迭代对象）
+            kind: 验证类型 ('email', 'phone', 'url', 'id_card', 'password')
+            country: 电话号码所属国家，仅 kind='phone' 时使用
+
+        返回:
+            list: 与输入一一对应的布尔值列表
+        """
+        if kind == 'phone':
+            pattern = VALIDATION_PATTERNS.get(f'phone_{country}')
+            if pattern is None:
+                return [False for _ in values]
+            match = pattern.match
+            return [match(value.replace('-', '').replace(' ', '')) is not None for value in values]
+
+        if kind in VALIDATION_PATTERNS:
+            match = VALIDATION_PATTERNS[kind].match
+            return [match(value) is not None for value in values]
+
+        if kind == 'id_card':
+            return [bool(value) and TextValidator.is_valid_id_card(value) for value in values]
+
+        if kind == 'password':
+            searches = [pattern.search for pattern, _ in PASSWORD_RULES]
+            return [
+                len(value) >= 8 and all(search(value) is not None for search in searches)
+                for value in values
+            ]
+
+        raise ValueError(f"不支持的验证类型: {kind}")
+
+
+# ==================== 多词匹配引擎 ====================
+
+# 英文单词字符：英文词的边界只看这些字符，中文词不需要边界
+ASCII_WORD_CHARS = 'A-Za-z0-9_'
+
+
+class WordMatcher:
+    """
+    多词匹配器
+
+    把一组词构建成前缀树，再由前缀树生成一个正则表达式，
+    一次扫描就能找出文本中所有的词，而不是每个词扫描一遍。
+    同一位置有多个词可匹配时优先匹配最长的词。
+    """
+
+    def __init__(self, words: Tuple[str, ...], ignore_case: bool = True,
+                 word_boundary: bool = True):
+        """
+        参数:
+            words: 词列表
+            ignore_case: 是否忽略大小写
+            word_boundary: 是否要求英文词前后不能紧挨英文字母或数字
+        """
+        self.ignore_case = ignore_case
+        self.word_boundary = word_boundary
+
+        # 规范化后的词 -> 原始写法（高亮时使用原始写法）
+        self.originals = {}
+        for word in words:
+            if word:
+                self.originals.setdefault(self._normalize(word), word)
+
+        self.pattern = self._compile()
+
+    def _normalize(self, word: str) -> str:
+        return word.lower() if self.ignore_case else word
+
+    def _is_ascii_word_char(self, char: str) -> bool:
+        return char.isascii() and (char.isalnum() or char == '_')
+
+    def _compile(self) -> Optional[re.Pattern]:
+        """构建前缀树并生成正则表达式"""
+        if not self.originals:
+            return None
+
+        # 所有词放在同一棵前缀树里：每个节点的分支首字符互不相同，
+        # 正则的"最左优先"就等价于"最长优先"
+        trie = {}
+        for word in self.originals:
+            node = trie
+            for char in word:
+                node = node.setdefault(char, {})
+            node[''] = True
+
+        flags = re.IGNORECASE if self.ignore_case else 0
+        return re.compile(self._node_regex(trie, root=True), flags)
+
+    def _node_regex(self, node: Dict, root: bool = False, last_char: str = '') -> str:
+        """
+        把前缀树的一个节点转换成正则表达式片段
+
+        边界检查挂在具体的位置上：英文字符开头的分支前面检查左边界，
+        以英文字符结尾的词在结束处检查右边界。
+        """
+        head = f'(?<![{ASCII_WORD_CHARS}])' if self.word_boundary and root else ''
+        tail = f'(?![{ASCII_WORD_CHARS}])' if self.word_boundary else ''
+
+        def boundary_head(char: str) -> str:
+            return head if self._is_ascii_word_char(char) else ''
+
+        def boundary_tail(char: str) -> str:
+            return tail if self._is_ascii_word_char(char) else ''
+
+        # 只剩一个字符就结束的分支合并成字符集，如 [abc]；
+        # 左右边界要求相同的叶子才能合并
+        leaves = {}
+        branches = []
+        for char, child in sorted(node.items()):
+            if not char:
+                continue
+            if child == {'': True}:
+                key = (boundary_head(char), boundary_tail(char))
+                leaves.setdefault(key, []).append(char)
+            else:
+                branches.append(boundary_head(char) + re.escape(char) + self._node_regex(child, last_char=char))
+
+        for (leaf_head, leaf_tail), chars in sorted(leaves.items()):
+            if len(chars) == 1:
+                charset = re.escape(chars[0])
+            else:
+                charset = '[' + ''.join(re.escape(c) for c in chars) + ']'
+            branches.append(leaf_head + charset + leaf_tail)
+
+        # 词在这里结束：空分支放在最后，保证先尝试更长的词，
+        # 边界检查失败时正则会回溯到更短的词
+        if '' in node:
+            branches.append(boundary_tail(last_char))
+
+        if len(branches) == 1:
+            return branches[0]
+        return '(?:' + '|'.join(branches) + ')'
+
+    def original(self, matched: str) -> str:
+        """返回匹配文本对应的原始词"""
+        return self.originals.get(self._normalize(matched), matched)
+
+    def find_all(self, text: str) -> List[str]:
+        """找出文本中所有匹配的词"""
+        if self.pattern is None:
+            return []
+        return self.pattern.findall(text)
+
+    def sub(self, text: str, replace: Callable[[str], str]) -> str:
+        """
+        一次扫描完成所有替换
+
+        参数:
+            text: 输入文本
+            replace: 替换函数，参数为匹配到的文本，返回替换后的文本
+        """
+        if self.pattern is None:
+            return text
+        return self.pattern.sub(lambda match: replace(match.group()), text)
+
+
+@lru_cache(maxsize=32)
+def get_word_matcher(words: Tuple[str, ...], ignore_case: bool = True,
+                     word_boundary: bool = True) -> WordMatcher:
+    """
+    获取编译好的多词匹配器（同一词表只编译一次）
+
+    参数:
+        words: 词元组（元组才能作为缓存键）
+        ignore_case: 是否忽略大小写
+        word_boundary: 是否检查英文词边界
+
+    返回:
+        WordMatcher: 匹配器
+    """
+    return WordMatcher(words, ignore_case, word_boundary)
 
 
 # ==================== 文本处理模块 ====================
@@ -675,17 +1077,30 @@ class TextProcessor:
         返回:
             list: 匹配的模式列表
         """
-        patterns = {
-            'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-            'phone': r'1[3-9]\d{9}',
-            'url': r'https?://(?:[-\w.])+(?:[:\d]+)?(?:/(?:[\w/_.])*(?:\?(?:[\w&=%.])*)?(?:#(?:[\w.])*)?)?',
-            'number': r'\d+(?:\.\d+)?'
-        }
-        
-        if pattern_type not in patterns:
+        pattern = EXTRACTION_PATTERNS.get(pattern_type)
+        if pattern is None:
             return []
         
-        return re.findall(patterns[pattern_type], text)
+        return pattern.findall(text)
+
+    @staticmethod
+    def extract_many(texts: Iterable[str], pattern_type: str) -> List[List[str]]:
+        """
+        批量提取文本模式
+
+        参数:
+            texts: 文本列表（或任意可迭代对象）
+            pattern_type: 模式类型 ('email', 'phone', 'url', 'number')
+
+        返回:
+            list: 与输入一一对应的匹配列表
+        """
+        pattern = EXTRACTION_PATTERNS.get(pattern_type)
+        if pattern is None:
+            return [[] for _ in texts]
+
+        findall = pattern.findall
+        return [findall(text) for text in texts]
     
     @staticmethod
     @validate_input(str, False)
@@ -701,16 +1116,19 @@ class TextProcessor:
         
         返回:
             str: 替换后的文本
+
+        说明:
+            普通模式下所有替换一次扫描完成，同一位置优先替换最长的词，
+            替换结果不会被再次替换；正则模式按顺序逐个替换（正则之间可能有分组引用）。
         """
-        result = text
-        
-        for pattern, replacement in replacements.items():
-            if use_regex:
+        if use_regex:
+            result = text
+            for pattern, replacement in replacements.items():
                 result = re.sub(pattern, replacement, result)
-            else:
-                result = result.replace(pattern, replacement)
-        
-        return result
+            return result
+
+        matcher = get_word_matcher(tuple(replacements), ignore_case=False, word_boundary=False)
+        return matcher.sub(text, lambda matched: replacements[matched])
     
     @staticmethod
     @validate_input(str, False)
@@ -722,20 +1140,25 @@ class TextProcessor:
         参数:
             text: 输入文本
             filter_list: 过滤词列表
-            action: 操作类型 ('remove', 'replace', 'highlight')
+            action: 操作类型 ('remove', 'replace'/'mask', 'highlight')
         
         返回:
             str: 过滤后的文本
+
+        说明:
+            词表会编译成一个匹配器并缓存，整段文本只扫描一次。
+            英文词要求前后不紧挨英文字母或数字，中文词在任意位置都能匹配。
         """
-        result = text
-        
-        for word in filter_list:
-            if action == 'remove':
-                result = re.sub(r'\b' + re.escape(word) + r'\b', '', result, flags=re.IGNORECASE)
-            elif action == 'replace':
-                result = re.sub(r'\b' + re.escape(word) + r'\b', '*' * len(word), result, flags=re.IGNORECASE)
-            elif action == 'highlight':
-                result = re.sub(r'\b' + re.escape(word) + r'\b', f'**{word}**', result, flags=re.IGNORECASE)
+        matcher = get_word_matcher(tuple(filter_list))
+        
+        if action == 'remove':
+            result = matcher.sub(text, lambda matched: '')
+        elif action in ('replace', 'mask'):
+            result = matcher.sub(text, lambda matched: '*' * len(matched))
+        elif action == 'highlight':
+            result = matcher.sub(text, lambda matched: f'**{matcher.original(matched)}**')
+        else:
+            result = text
         
         # 清理多余空格
         result = re.sub(r'\s+', ' ', result.strip())
@@ -761,6 +1184,25 @@ def apply_text_operations(text: str, *operations: Callable) -> str:
     return result
 
 
+class TextPipeline:
+    """
+    文本处理管道
+
+    依次调用各个处理函数。与闭包不同，管道对象可以被 pickle，
+    因此能交给多进程批处理引擎使用（前提是各处理函数本身可 pickle，
+    即模块级函数或类的静态方法，而不是 lambda）。
+    """
+
+    def __init__(self, *functions: Callable):
+        self.stages = functions
+
+    def __call__(self, text: str) -> str:
+        result = text
+        for func in self.stages:
+            result = func(result)
+        return result
+
+
 def create_text_pipeline(*functions: Callable) -> Callable:
     """
     创建文本处理管道
@@ -771,26 +1213,255 @@ def create_text_pipeline(*functions: Callable) -> Callable:
     返回:
         function: 管道函数
     """
-    def pipeline(text: str) -> str:
-        result = text
-        for func in functions:
-            result = func(result)
-        return result
-    return pipeline
+    return TextPipeline(*functions)
+
+
+def read_jsonl(path: str, field: Optional[str] = None) -> Iterator[Any]:
+    """
+    逐行读取 JSON Lines 文件
+
+    参数:
+        path: 文件路径
+        field: 只取每条记录中的这个字段，None 表示返回整条记录
+
+    返回:
+        iterator: 记录（或字段值）的迭代器，不会一次读入整个文件
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield record[field] if field is not None else record
+
+
+def _process_chunk(stages: Tuple[Callable, ...], chunk: List[Any]) -> Tuple[List[Any], List[float]]:
+    """
+    在工作进程中处理一块数据
+
+    逐个阶段处理整块数据，记录每个阶段耗时，用于统计各阶段吞吐量。
+    """
+    stage_times = []
+    for stage in stages:
+        start_time = time.perf_counter()
+        chunk = [stage(item) for item in chunk]
+        stage_times.append(time.perf_counter() - start_time)
+    return chunk, stage_times
+
 
+class BatchEngine:
+    """
+    并行流式批处理引擎
 
-def batch_process_texts(texts: List[str], processor: Callable) -> List[str]:
+    输入可以是任意可迭代对象（如列表、生成器、read_jsonl 的结果），
+    按块切分后交给进程池处理，结果以生成器形式流式返回。
+    同时在途的块数有上限（背压），内存占用与输入总量无关。
+    """
+
+    def __init__(self, processor: Callable, chunk_size: int = 1000,
+                 max_workers: Optional[int] = None, ordered: bool = True,
+                 max_pending_chunks: Optional[int] = None):
+        """
+        参数:
+            processor: 处理函数，或由 create_text_pipeline 创建的管道
+                （管道会按阶段分别统计吞吐量）
+            chunk_size: 每块的条数
+            max_workers: 进程数，None 表示 CPU 核数，1 表示在当前进程中处理
+            ordered: 是否按输入顺序输出
+            max_pending_chunks: 最多同时在途的块数，默认为进程数的2倍
+        """
+        self.stages = processor.stages if isinstance(processor, TextPipeline) else (processor,)
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.ordered = ordered
+        self.max_pending_chunks = max_pending_chunks
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {
+            'items': 0,
+            'chunks': 0,
+            'elapsed': 0.0,
+            'stage_times': [0.0] * len(self.stages)
+        }
+
+    def _chunks(self, items: Iterable[Any]) -> Iterator[List[Any]]:
+        iterator = iter(items)
+        while True:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _collect(self, result: Tuple[List[Any], List[float]]) -> List[Any]:
+        """累计统计信息并返回处理结果"""
+        chunk, stage_times = result
+        self.stats['items'] += len(chunk)
+        self.stats['chunks'] += 1
+        for i, seconds in enumerate(stage_times):
+            self.stats['stage_times'][i] += seconds
+        return chunk
+
+    def process(self, items: Iterable[Any]) -> Iterator[Any]:
+        """
+        流式处理
+
+        参数:
+            items: 输入数据（任意可迭代对象）
+
+        返回:
+            iterator: 处理结果的迭代器
+        """
+        self._reset_stats()
+        start_time = time.perf_counter()
+
+        if self.max_workers == 1:
+            for chunk in self._chunks(items):
+                yield from self._collect(_process_chunk(self.stages, chunk))
+            self.stats['elapsed'] = time.perf_counter() - start_time
+            return
+
+        workers = self.max_workers or os.cpu_count() or 1
+        max_pending = self.max_pending_chunks or workers * 2
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+
+            if self.ordered:
+                # 按提交顺序排队，队首完成后才输出，保证顺序
+                pending = deque()
+                for chunk in self._chunks(items):
+                    pending.append(executor.submit(_process_chunk, self.stages, chunk))
+                    if len(pending) >= max_pending:
+                        yield from self._collect(pending.popleft().result())
+                while pending:
+                    yield from self._collect(pending.popleft().result())
+            else:
+                # 哪块先完成就先输出哪块
+                pending = set()
+                for chunk in self._chunks(items):
+                    pending.add(executor.submit(_process_chunk, self.stages, chunk))
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield from self._collect(future.result())
+                for future in wait(pending).done:
+                    yield from self._collect(future.result())
+
+        self.stats['elapsed'] = time.perf_counter() - start_time
+
+    def report(self) -> Dict[str, Any]:
+        """
+        吞吐量报告
+
+        返回:
+            dict: 总条数、总耗时、整体吞吐量，以及每个阶段的耗时和吞吐量
+                （阶段耗时为各分块在各进程中的墙钟耗时之和，多进程时可能大于总耗时）
+        """
+        items = self.stats['items']
+        elapsed = self.stats['elapsed']
+        return {
+            'items': items,
+            'chunks': self.stats['chunks'],
+            'elapsed': round(elapsed, 4),
+            'items_per_second': round(items / elapsed, 1) if elapsed else 0,
+            'stages': [
+                {
+                    'stage': getattr(stage, '__name__', repr(stage)),
+                    'seconds': round(seconds, 4),
+                    'items_per_second': round(items / seconds, 1) if seconds else 0
+                }
+                for stage, seconds in zip(self.stages, self.stats['stage_times'])
+            ]
+        }
+
+
+def batch_process_texts(texts: Iterable[str], processor: Callable,
+                        max_workers: Optional[int] = 1,
+                        chunk_size: int = 1000) -> List[str]:
     """
     批量处理文本
     
     参数:
-        texts: 文本列表
+        texts: 文本列表（或任意可迭代对象）
         processor: 处理函数
+        max_workers: 进程数，默认1（当前进程中处理，可使用 lambda）；
+            大于1或为 None 时使用多进程，processor 必须可 pickle
+        chunk_size: 多进程时每块的条数
     
     返回:
         list: 处理后的文本列表
     """
-    return [processor(text) for text in texts]
+    if max_workers == 1:
+        return [processor(text) for text in texts]
+
+    engine = BatchEngine(processor, chunk_size=chunk_size, max_workers=max_workers)
+    return list(engine.process(texts))
+
+
+def benchmark_text_analysis(texts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """
+    对比分别调用四个统计函数与 analyze_all 的耗时
+
+    参数:
+        texts: 测试文本列表
+        repeat: 重复次数，取最好成绩
+
+    返回:
+        dict: 两种方式的耗时（秒）和加速比
+    """
+    def separate_calls():
+        for text in texts:
+            TextAnalyzer.count_characters(text)
+            TextAnalyzer.count_words(text)
+            TextAnalyzer.count_sentences(text)
+            TextAnalyzer.analyze_readability(text)
+
+    def combined_call():
+        for text in texts:
+            TextAnalyzer.analyze_all(text)
+
+    timings = {}
+    for name, func in [('separate', separate_calls), ('analyze_all', combined_call)]:
+        best = float('inf')
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start_time)
+        timings[name] = best
+
+    timings['speedup'] = timings['separate'] / timings['analyze_all'] if timings['analyze_all'] else 0
+    print(f"[基准] 分别调用: {timings['separate']:.4f}秒, "
+          f"analyze_all: {timings['analyze_all']:.4f}秒, 加速 {timings['speedup']:.1f} 倍")
+    return timings
+
+
+def benchmark_text_conversion(texts: List[str], repeat: int = 3) -> Dict[str, float]:
+    """
+    测试各转换器的吞吐量
+
+    参数:
+        texts: 测试语料
+        repeat: 重复次数，取最好成绩
+
+    返回:
+        dict: 每种转换的吞吐量（MB/s，按输入的 UTF-8 字节数计算，每轮都从空缓存开始）
+    """
+    total_mb = sum(len(text.encode('utf-8')) for text in texts) / 1024 ** 2
+    throughput = {}
+
+    for kind in ['pinyin', 'morse', 'binary']:
+        best = float('inf')
+        for _ in range(repeat):
+            # 清空短文本的 LRU 缓存，避免后几轮只测到缓存命中
+            _convert_cached.cache_clear()
+            start_time = time.perf_counter()
+            TextConverter.convert_many(texts, kind)
+            best = min(best, time.perf_counter() - start_time)
+        throughput[kind] = total_mb / best if best else 0
+        print(f"[基准] {kind}: {throughput[kind]:.2f} MB/s")
+
+    return throughput
 
 
 # ==================== 主程序和演示 ====================
@@ -835,6 +1506,10 @@ def main():
     # 可读性分析
     readability = analyzer.analyze_readability(sample_text)
     print(f"可读性分析: {readability}")
+
+    # 一次扫描完成全部统计
+    all_stats = analyzer.analyze_all(sample_text)
+    print(f"综合统计与分别统计一致: {all_stats['readability'] == readability}")
     
     # 2. 文本格式化演示
     print("\n2. 文本格式化演示")
@@ -104,6 +104,7 @@ FILE_OPERATIONS = {
     'show_hidden_files': False,
     'follow_symlinks': False,
     'buffer_size': 64 * 1024,  # 64KB
+    'listing_page_size': 200,  # 目录列表分页时每页的条数
     'max_file_size_preview': 10 * 1024 * 1024,  # 10MB
     'backup_before_overwrite': True
 }
@@ -134,6 +135,7 @@ SEARCH_CONFIG = {
     'use_regex': False,
     'search_content': False,
     'max_content_size': 1024 * 1024,  # 1MB
+    'content_max_file_size': 100 * 1024 * 1024,  # 内容搜索跳过大于100MB的文件
     'index_cache_ttl': 3600,  # 1小时
     'enable_indexing': True
 }
@@ -154,9 +156,19 @@ FILE_TYPE_FILTERS = {
 CACHE_CONFIG = {
     'enable_cache': True,
     'cache_size_mb': 100,
+    'max_entries': 1000,
+    'bytes_per_item': 512,  # 估算缓存占用时每个列表项按此大小计算
     'cache_ttl': 3600,  # 1小时
     'auto_cleanup': True,
-    'cleanup_interval': 24 * 3600  # 24小时
+    'cleanup_interval': 24 * 3600,  # 24小时
+    'watch_directories': True,  # 监控已缓存目录，变化时立即失效对应缓存
+    'max_watched_directories': 256,
+    'watch_poll_interval': 1.0  # 秒，无 inotify 时的轮询间隔
+}
+
+# 持久化设置
+STORAGE_CONFIG = {
+    'write_behind_delay': 2.0  # 秒，书签/标签修改合并后延迟写盘，0表示立即写入
 }
 
 # 线程池设置
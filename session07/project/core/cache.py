@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件管理器缓存
+
+基于 OrderedDict 的 LRU 缓存：
+- 命中时 move_to_end，淘汰时 popitem(last=False)，都是 O(1)
+- 按条目数估算内存占用，超过字节预算或条目上限时淘汰最久未用的条目
+- 维护 分组 -> 键集合 的二级索引（分组通常是目录路径），按目录失效是 O(1)
+- 统计命中/未命中/淘汰次数
+
+作者: Python教程团队
+创建日期: 2024-12-22
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+def estimate_size(data: Any, bytes_per_item: int = 512) -> int:
+    """
+    估算缓存数据占用的字节数
+
+    目录列表等容器按元素个数乘以单个元素的估计大小计算，
+    比递归 sys.getsizeof 便宜得多，精度对预算控制已经足够。
+    """
+    try:
+        return (len(data) + 1) * bytes_per_item
+    except TypeError:
+        return bytes_per_item
+
+
+class LRUCache:
+    """
+    线程安全的 LRU 缓存，支持 TTL、字节预算和分组失效
+    """
+
+    def __init__(self, max_bytes: int, max_entries: int = 1000,
+                 ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = estimate_size):
+        """
+        初始化缓存
+
+        Args:
+            max_bytes: 估算内存的上限（字节）
+            max_entries: 条目数上限
+            ttl: 过期时间（秒），None表示不过期
+            sizeof: 估算单个值大小的函数
+        """
+        self._max_bytes = max_bytes
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._sizeof = sizeof
+
+        # key -> (value, 写入时间, 估算大小, 分组)
+        self._entries = OrderedDict()
+        self._groups: Dict[Hashable, set] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._entries.keys()))
+
+    def get(self, key, default=None):
+        """获取缓存值，未命中或已过期时返回default"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            if self._ttl is not None and time.monotonic() - entry[1] >= self._ttl:
+                self._remove(key)
+                self._expirations += 1
+                self._misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def set(self, key, value, group: Hashable = None):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            group: 所属分组，之后可以用 invalidate_group 一次性清除
+        """
+        size = self._sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size > self._max_bytes:
+                # 单个值就超过预算，缓存它只会把其他条目全部挤掉
+                return
+
+            self._entries[key] = (value, time.monotonic(), size, group)
+            self._bytes += size
+            if group is not None:
+                self._groups.setdefault(group, set()).add(key)
+
+            while self._entries and (self._bytes > self._max_bytes or
+                                     len(self._entries) > self._max_entries):
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._evictions += 1
+
+    def delete(self, key) -> bool:
+        """删除指定键"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self._invalidations += 1
+            return True
+
+    def invalidate_group(self, group: Hashable) -> int:
+        """清除分组内的所有键，返回清除的数量"""
+        with self._lock:
+            keys = self._groups.get(group)
+            if not keys:
+                return 0
+            keys = list(keys)
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def remove_if(self, predicate: Callable[[Any], bool]) -> int:
+        """清除所有满足条件的键（需要遍历全部键，只用于低频操作）"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            self._invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        """清空缓存（统计数据保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'groups': len(self._groups),
+                'bytes': self._bytes,
+                'max_bytes': self._max_bytes,
+                'max_entries': self._max_entries,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'invalidations': self._invalidations
+            }
+
+    def _remove(self, key):
+        """删除条目并维护字节数和分组索引（调用方持有锁）"""
+        _value, _timestamp, size, group = self._entries.pop(key)
+        self._bytes -= size
+        if group is not None:
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
@@ -14,9 +14,8 @@ import os
 import json
 from pathlib import Path
 from typing import List, Dict, Optional, Callable, Any
-from datetime import datetime
-import threading
 import queue
+from functools import partial
 
 try:
     from loguru import logger
@@ -27,8 +26,14 @@ except ImportError:
 # 导入配置
 from config import (
     USER_CONFIG_DIR, HISTORY_FILE, BOOKMARKS_FILE, TAGS_FILE,
-    FILE_OPERATIONS, DEFAULT_SETTINGS, CACHE_CONFIG
+    FILE_OPERATIONS, DEFAULT_SETTINGS, CACHE_CONFIG, STORAGE_CONFIG
 )
+from .cache import LRUCache, estimate_size
+from .listing import DirectoryListing
+from .search_engine import ContentSearchTask, compile_content_pattern
+from .storage import WriteBehindWriter
+from .tags import TagStore
+from .watcher import create_directory_watcher
 
 
 class FileManagerError(Exception):
@@ -70,20 +75,34 @@ class FileManager:
         self._history = []
         self._history_index = -1
         self._bookmarks = {}
-        self._tags = {}
+        self._tags = TagStore()
         self._settings = DEFAULT_SETTINGS.copy()
         
         # 事件系统
         self._event_handlers = {}
         self._event_queue = queue.Queue()
         
-        # 缓存系统
-        self._cache = {}
-        self._cache_lock = threading.Lock()
+        # 缓存系统：LRU + 字节预算，按目录分组以便精确失效
+        self._cache = LRUCache(
+            max_bytes=CACHE_CONFIG['cache_size_mb'] * 1024 * 1024,
+            max_entries=CACHE_CONFIG.get('max_entries', 1000),
+            ttl=CACHE_CONFIG['cache_ttl'],
+            sizeof=partial(estimate_size, bytes_per_item=CACHE_CONFIG.get('bytes_per_item', 512))
+        )
         
         # 状态管理
         self._is_running = False
         self._background_tasks = []
+        self._watcher = None
+        
+        # 持久化：修改只做标记，合并后由后台原子写盘
+        write_delay = STORAGE_CONFIG.get('write_behind_delay', 2.0)
+        self._bookmarks_writer = WriteBehindWriter(
+            BOOKMARKS_FILE, lambda: dict(self._bookmarks), write_delay, name='书签'
+        )
+        self._tags_writer = WriteBehindWriter(
+            TAGS_FILE, lambda: self._tags.to_dict(), write_delay, name='标签'
+        )
         
         # 初始化
         self._load_data()
@@ -132,7 +151,7 @@ class FileManager:
     @property
     def tags(self) -> Dict[str, List[str]]:
         """获取标签"""
-        return self._tags.copy()
+        return self._tags.to_dict()
     
     def start(self):
         """启动文件管理器"""
@@ -169,78 +188,55 @@ class FileManager:
         logger.info("文件管理器已停止")
     
     def list_directory(self, path: Optional[Path] = None, 
-                      show_hidden: Optional[bool] = None) -> List[Dict[str, Any]]:
+                      show_hidden: Optional[bool] = None,
+                      page: Optional[int] = None,
+                      page_size: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         列出目录内容
         
         Args:
             path: 要列出的目录路径，默认为当前路径
             show_hidden: 是否显示隐藏文件，默认使用设置
+            page: 页码（从0开始），为None时返回全部内容
+            page_size: 每页条数，默认使用配置
         
         Returns:
-            文件和目录信息列表
+            文件和目录信息列表（无法获取信息的项被跳过）；
+            指定 page 时只对该页的项执行stat
         """
-        target_path = path or self._current_path
+        target_path = Path(path or self._current_path)
         show_hidden = show_hidden if show_hidden is not None else self._settings.get('show_hidden_files', False)
         
         # 检查缓存
         cache_key = f"list_{target_path}_{show_hidden}"
+        listing = None
         if CACHE_CONFIG['enable_cache']:
-            cached_result = self._get_from_cache(cache_key)
-            if cached_result:
-                return cached_result
+            listing = self._get_from_cache(cache_key)
         
-        try:
-            items = []
-            
-            for item_path in target_path.iterdir():
-                # 跳过隐藏文件（如果设置不显示）
-                if not show_hidden and self._is_hidden_file(item_path):
-                    continue
-                
-                try:
-                    stat_info = item_path.stat()
-                    
-                    item_info = {
-                        'name': item_path.name,
-                        'path': str(item_path),
-                        'is_dir': item_path.is_dir(),
-                        'is_file': item_path.is_file(),
-                        'is_symlink': item_path.is_symlink(),
-                        'size': stat_info.st_size if item_path.is_file() else 0,
-                        'modified_time': datetime.fromtimestamp(stat_info.st_mtime),
-                        'created_time': datetime.fromtimestamp(stat_info.st_ctime),
-                        'permissions': oct(stat_info.st_mode)[-3:],
-                        'extension': item_path.suffix.lower() if item_path.is_file() else '',
-                        'tags': self._get_file_tags(str(item_path))
-                    }
-                    
-                    items.append(item_info)
-                    
-                except (OSError, PermissionError) as e:
-                    logger.warning(f"无法获取文件信息: {item_path}, 错误: {e}")
-                    continue
-            
-            # 排序：目录在前，然后按名称排序
-            items.sort(key=lambda x: (not x['is_dir'], x['name'].lower()))
+        if listing is None:
+            try:
+                listing = DirectoryListing(target_path, show_hidden, tag_lookup=self._get_file_tags)
+            except PermissionError:
+                raise PermissionError(f"没有权限访问目录: {target_path}")
+            except Exception as e:
+                logger.error(f"列出目录失败: {target_path}, 错误: {e}")
+                raise FileManagerError(f"列出目录失败: {e}")
             
-            # 缓存结果
+            # 缓存结果，并监控该目录以便变化时立即失效
             if CACHE_CONFIG['enable_cache']:
-                self._add_to_cache(cache_key, items)
+                self._add_to_cache(cache_key, listing, group=str(target_path))
+                if self._watcher is not None:
+                    self._watcher.watch(target_path)
             
             # 触发事件
             self._emit_event('directory_listed', {
                 'path': target_path,
-                'items': items
+                'items': listing
             })
-            
-            return items
-            
-        except PermissionError:
-            raise PermissionError(f"没有权限访问目录: {target_path}")
-        except Exception as e:
-            logger.error(f"列出目录失败: {target_path}, 错误: {e}")
-            raise FileManagerError(f"列出目录失败: {e}")
+        
+        if page is None:
+            return listing.to_list()
+        return listing.page(page, page_size or FILE_OPERATIONS.get('listing_page_size', 200))
     
     def navigate_to(self, path: str | Path):
         """导航到指定路径"""
@@ -319,12 +315,9 @@ class FileManager:
     
     def add_file_tag(self, file_path: str, tag: str):
         """为文件添加标签"""
-        if file_path not in self._tags:
-            self._tags[file_path] = []
-        
-        if tag not in self._tags[file_path]:
-            self._tags[file_path].append(tag)
+        if self._tags.add(file_path, tag):
             self._save_tags()
+            self._invalidate_tagged_listings([file_path])
             
             self._emit_event('tag_added', {
                 'file_path': file_path,
@@ -335,14 +328,9 @@ class FileManager:
     
     def remove_file_tag(self, file_path: str, tag: str) -> bool:
         """删除文件标签"""
-        if file_path in self._tags and tag in self._tags[file_path]:
-            self._tags[file_path].remove(tag)
-            
-            # 如果没有标签了，删除整个条目
-            if not self._tags[file_path]:
-                del self._tags[file_path]
-            
+        if self._tags.remove(file_path, tag):
             self._save_tags()
+            self._invalidate_tagged_listings([file_path])
             
             self._emit_event('tag_removed', {
                 'file_path': file_path,
@@ -353,9 +341,61 @@ class FileManager:
             return True
         return False
     
+    def add_tags_bulk(self, file_paths: List[str], tags: List[str]) -> int:
+        """
+        为一批文件添加一组标签（只写盘一次、只触发一次事件）
+        
+        Returns:
+            实际发生变化的文件数量
+        """
+        changed = self._tags.add_bulk(file_paths, tags)
+        if changed:
+            self._save_tags()
+            self._invalidate_tagged_listings(changed)
+            
+            self._emit_event('tags_changed', {
+                'action': 'add',
+                'tags': list(tags),
+                'file_paths': changed
+            })
+            
+            logger.debug(f"批量添加标签: {len(changed)} 个文件 -> {tags}")
+        return len(changed)
+    
+    def remove_tags_bulk(self, file_paths: List[str], tags: List[str]) -> int:
+        """
+        从一批文件上删除一组标签（只写盘一次、只触发一次事件）
+        
+        Returns:
+            实际发生变化的文件数量
+        """
+        changed = self._tags.remove_bulk(file_paths, tags)
+        if changed:
+            self._save_tags()
+            self._invalidate_tagged_listings(changed)
+            
+            self._emit_event('tags_changed', {
+                'action': 'remove',
+                'tags': list(tags),
+                'file_paths': changed
+            })
+            
+            logger.debug(f"批量删除标签: {len(changed)} 个文件 -> {tags}")
+        return len(changed)
+    
     def get_files_by_tag(self, tag: str) -> List[str]:
         """根据标签获取文件列表"""
-        return [file_path for file_path, tags in self._tags.items() if tag in tags]
+        return sorted(self._tags.files_with_tag(tag))
+    
+    def find_files_by_tags(self, tags: List[str], match_all: bool = True) -> List[str]:
+        """
+        按多个标签查询文件
+        
+        Args:
+            tags: 标签列表
+            match_all: True 需要同时具有所有标签（AND），False 具有任一标签即可（OR）
+        """
+        return sorted(self._tags.query(tags, match_all))
     
     def on(self, event_name: str, handler: Callable):
         """注册事件处理器"""
@@ -393,10 +433,68 @@ class FileManager:
         
         logger.debug(f"设置已更改: {key} = {value}")
     
+    def search_content(self, pattern: str, root: Optional[str | Path] = None,
+                       globs: Optional[List[str]] = None, **options) -> ContentSearchTask:
+        """
+        在后台搜索文件内容
+        
+        每个匹配触发一次 content_match 事件，结束（完成、取消、达到上限或超时）时
+        触发 content_search_finished 事件。事件在搜索线程中触发，GUI需要切回主线程更新界面。
+        
+        Args:
+            pattern: 搜索关键词或正则表达式
+            root: 搜索的根目录，默认为当前路径
+            globs: 文件名通配符列表，如 ['*.py']
+            **options: 传给 SearchEngine.search_content 的其他选项
+                （use_regex、case_sensitive、max_results、max_file_size、timeout等）
+        
+        Returns:
+            ContentSearchTask: 可用于 cancel()/wait() 并读取 results、stats
+        """
+        search_root = Path(root or self._current_path)
+        if not search_root.is_dir():
+            raise FileNotFoundError(f"搜索目录不存在: {search_root}")
+        
+        # 先编译一次，让无效的正则在调用方线程里直接报错
+        compile_content_pattern(
+            pattern,
+            options.get('use_regex') or False,
+            options.get('case_sensitive') or False
+        )
+        options.setdefault('include_hidden', self._settings.get('show_hidden_files', False))
+        
+        def on_match(match):
+            self._emit_event('content_match', dict(match, search_id=task.search_id))
+        
+        def on_finished(stats):
+            if task in self._background_tasks:
+                self._background_tasks.remove(task)
+            self._emit_event('content_search_finished', dict(stats, search_id=task.search_id))
+            logger.info(f"内容搜索结束: {pattern}, 匹配 {stats.get('matches', 0)} 处")
+        
+        task = ContentSearchTask(
+            on_match, on_finished,
+            pattern=pattern, root=search_root, globs=globs, **options
+        )
+        self._background_tasks.append(task)
+        
+        self._emit_event('content_search_started', {
+            'search_id': task.search_id,
+            'pattern': pattern,
+            'root': search_root,
+            'globs': globs
+        })
+        
+        return task.start()
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息（命中率、条目数、估算内存等）"""
+        return self._cache.stats()
+    
     def refresh(self):
         """刷新当前目录"""
         # 清除相关缓存
-        self._clear_cache_by_pattern(f"list_{self._current_path}")
+        self._invalidate_directory_cache(self._current_path)
         
         # 触发刷新事件
         self._emit_event('directory_refreshed', {
@@ -424,25 +522,14 @@ class FileManager:
                 self._history = self._history[-max_history:]
                 self._history_index = len(self._history) - 1
     
-    def _is_hidden_file(self, path: Path) -> bool:
-        """判断是否为隐藏文件"""
-        # Unix/Linux: 以点开头
-        if path.name.startswith('.'):
-            return True
-        
-        # Windows: 检查隐藏属性
-        if os.name == 'nt':
-            try:
-                import stat
-                return bool(path.stat().st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
-            except (AttributeError, OSError):
-                pass
-        
-        return False
-    
     def _get_file_tags(self, file_path: str) -> List[str]:
         """获取文件标签"""
-        return self._tags.get(file_path, [])
+        return self._tags.tags_of(file_path)
+    
+    def _invalidate_tagged_listings(self, file_paths: List[str]):
+        """标签变化后清除所在目录的列表缓存（列表项里带有标签）"""
+        for parent in {os.path.dirname(file_path) for file_path in file_paths}:
+            self._invalidate_directory_cache(parent)
     
     def _emit_event(self, event_name: str, data: Dict[str, Any]):
         """触发事件"""
@@ -460,46 +547,46 @@ class FileManager:
     
     def _start_background_tasks(self):
         """启动后台任务"""
-        # 这里可以启动文件监控、缓存清理等后台任务
-        pass
+        # 目录监控：已缓存的目录发生变化时只失效该目录的列表缓存
+        if CACHE_CONFIG['enable_cache'] and CACHE_CONFIG.get('watch_directories', True):
+            self._watcher = create_directory_watcher(
+                self._on_directory_changed,
+                max_watches=CACHE_CONFIG.get('max_watched_directories', 256),
+                poll_interval=CACHE_CONFIG.get('watch_poll_interval', 1.0)
+            )
+            self._watcher.start()
+            self._background_tasks.append(self._watcher)
     
     def _stop_background_tasks(self):
         """停止后台任务"""
-        for task in self._background_tasks:
+        for task in list(self._background_tasks):
             if hasattr(task, 'stop'):
                 task.stop()
         self._background_tasks.clear()
+        self._watcher = None
+    
+    def _on_directory_changed(self, path: str, names: List[str]):
+        """目录监控回调（在监控线程中执行）"""
+        self._invalidate_directory_cache(path)
+        
+        self._emit_event('directory_changed', {
+            'path': Path(path),
+            'names': names
+        })
+        
+        logger.debug(f"目录已变化: {path}, 变化项: {len(names)}")
     
     def _get_from_cache(self, key: str):
-        """从缓存获取数据"""
-        with self._cache_lock:
-            if key in self._cache:
-                data, timestamp = self._cache[key]
-                # 检查是否过期
-                if datetime.now().timestamp() - timestamp < CACHE_CONFIG['cache_ttl']:
-                    return data
-                else:
-                    del self._cache[key]
-        return None
-    
-    def _add_to_cache(self, key: str, data):
-        """添加数据到缓存"""
-        with self._cache_lock:
-            self._cache[key] = (data, datetime.now().timestamp())
-            
-            # 检查缓存大小限制
-            if len(self._cache) > 1000:  # 简单的缓存大小限制
-                # 删除最旧的条目
-                oldest_key = min(self._cache.keys(), 
-                                key=lambda k: self._cache[k][1])
-                del self._cache[oldest_key]
-    
-    def _clear_cache_by_pattern(self, pattern: str):
-        """根据模式清除缓存"""
-        with self._cache_lock:
-            keys_to_remove = [key for key in self._cache.keys() if pattern in key]
-            for key in keys_to_remove:
-                del self._cache[key]
+        """从缓存获取数据（过期条目由缓存自行清除）"""
+        return self._cache.get(key)
+    
+    def _add_to_cache(self, key: str, data, group: Optional[str] = None):
+        """添加数据到缓存，超出预算时淘汰最久未使用的条目"""
+        self._cache.set(key, data, group=group)
+    
+    def _invalidate_directory_cache(self, path: str | Path):
+        """只清除指定目录的缓存（通过目录索引，不扫描其他键）"""
+        self._cache.invalidate_group(str(path))
     
     def _load_data(self):
         """加载数据"""
@@ -508,9 +595,9 @@ class FileManager:
         self._load_settings()
     
     def _save_data(self):
-        """保存数据"""
-        self._save_bookmarks()
-        self._save_tags()
+        """保存数据（立即写入所有尚未落盘的修改）"""
+        self._bookmarks_writer.flush()
+        self._tags_writer.flush()
         self._save_settings()
     
     def _load_bookmarks(self):
@@ -525,33 +612,23 @@ class FileManager:
             self._bookmarks = {}
     
     def _save_bookmarks(self):
-        """保存书签"""
-        try:
-            with open(BOOKMARKS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self._bookmarks, f, ensure_ascii=False, indent=2)
-            logger.debug("书签已保存")
-        except Exception as e:
-            logger.error(f"保存书签失败: {e}")
+        """保存书签（延迟合并写入）"""
+        self._bookmarks_writer.mark_dirty()
     
     def _load_tags(self):
         """加载标签"""
         try:
             if TAGS_FILE.exists():
                 with open(TAGS_FILE, 'r', encoding='utf-8') as f:
-                    self._tags = json.load(f)
+                    self._tags = TagStore(json.load(f))
                 logger.debug(f"加载标签: {len(self._tags)} 个文件")
         except Exception as e:
             logger.error(f"加载标签失败: {e}")
-            self._tags = {}
+            self._tags = TagStore()
     
     def _save_tags(self):
-        """保存标签"""
-        try:
-            with open(TAGS_FILE, 'w', encoding='utf-8') as f:
-                json.dump(self._tags, f, ensure_ascii=False, indent=2)
-            logger.debug("标签已保存")
-        except Exception as e:
-            logger.error(f"保存标签失败: {e}")
+        """保存标签（延迟合并写入）"""
+        self._tags_writer.mark_dirty()
     
     def _load_settings(self):
         """加载设置"""
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录列表视图
+
+基于 os.scandir 的惰性目录列表：
+- 扫描时只使用 DirEntry 自带的类型信息（d_type），不额外 stat
+- 排序键只包含 是否目录 和 名称，排序本身不触发系统调用
+- 完整的文件信息（大小、时间、权限、标签）在行被访问时才构建并缓存
+- 只看前几页时用 heapq.nsmallest 取前 k 项，不必对整个目录排序
+
+这样 20 万项的目录，第一页只需要一次 scandir 和一次部分选择。
+无法 stat 的项（失效的符号链接、扫描后被删除的文件等）在构建信息时跳过，与原来的列表行为一致。
+
+作者: Python教程团队
+创建日期: 2024-12-22
+"""
+
+import heapq
+import os
+import stat
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from loguru import logger
+except ImportError:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+def is_hidden_entry(entry: os.DirEntry) -> bool:
+    """判断目录项是否为隐藏文件"""
+    # Unix/Linux: 以点开头
+    if entry.name.startswith('.'):
+        return True
+
+    # Windows: DirEntry.stat() 的结果来自目录扫描本身，不产生额外系统调用
+    if os.name == 'nt':
+        try:
+            return bool(entry.stat().st_file_attributes & stat.FILE_ATTRIBUTE_HIDDEN)
+        except (AttributeError, OSError):
+            pass
+
+    return False
+
+
+class DirectoryListing(Sequence):
+    """
+    已排序的惰性目录列表
+
+    支持下标、切片和迭代，排序规则与原来的列表相同：目录在前、再按名称（不区分大小写）排序。
+    无法 stat 的项不会出现在迭代、切片和分页结果中（下标访问这样的项时返回None），
+    因此 len() 是扫描到的项数，是结果数量的上限；需要普通列表时使用 to_list()。
+    """
+
+    # 只需要前 (页码+1)*每页条数 项且不超过总数的 1/8 时，用部分选择代替全量排序
+    PARTIAL_SELECT_RATIO = 8
+
+    def __init__(self, path: str | Path, show_hidden: bool = False,
+                 tag_lookup: Optional[Callable[[str], List[str]]] = None):
+        """
+        扫描目录
+
+        Args:
+            path: 目录路径
+            show_hidden: 是否包含隐藏文件
+            tag_lookup: 根据文件路径获取标签的函数
+        """
+        self._path = Path(path)
+        self._tag_lookup = tag_lookup
+        # 名称 -> 已构建的详细信息，部分选择和全量排序两条路径共用
+        self._details: Dict[str, Dict[str, Any]] = {}
+        self._sorted = False
+
+        # 每行: (是否文件, 小写名称, 名称, DirEntry)；同一目录内名称唯一，比较不会落到DirEntry
+        self._rows = []
+        with os.scandir(self._path) as entries:
+            for entry in entries:
+                if not show_hidden and is_hidden_entry(entry):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                self._rows.append((not is_dir, entry.name.lower(), entry.name, entry))
+
+    @property
+    def path(self) -> Path:
+        """列表对应的目录"""
+        return self._path
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        self._ensure_sorted()
+        if isinstance(index, slice):
+            details = (self._detail(i) for i in range(*index.indices(len(self._rows))))
+            return [detail for detail in details if detail is not None]
+        if index < 0:
+            index += len(self._rows)
+        if not 0 <= index < len(self._rows):
+            raise IndexError("目录列表下标越界")
+        return self._detail(index)
+
+    def __iter__(self):
+        self._ensure_sorted()
+        for i in range(len(self._rows)):
+            detail = self._detail(i)
+            if detail is not None:
+                yield detail
+
+    def page(self, number: int, size: int) -> List[Dict[str, Any]]:
+        """
+        获取一页数据
+
+        Args:
+            number: 页码（从0开始）
+            size: 每页条数
+
+        Returns:
+            该页的文件信息列表（跳过无法 stat 的项，可能少于 size 条）
+        """
+        start = max(number, 0) * size
+        end = start + size
+        if start >= len(self._rows):
+            return []
+
+        if not self._sorted and end * self.PARTIAL_SELECT_RATIO <= len(self._rows):
+            rows = heapq.nsmallest(end, self._rows)[start:end]
+            details = (self._row_detail(row) for row in rows)
+            return [detail for detail in details if detail is not None]
+
+        return self[start:end]
+
+    def page_count(self, size: int) -> int:
+        """按每页条数计算总页数"""
+        return (len(self._rows) + size - 1) // size
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """构建全部行的详细信息列表（会对每一项执行stat，跳过失败的项）"""
+        return list(self)
+
+    def _ensure_sorted(self):
+        if not self._sorted:
+            self._rows.sort()
+            self._sorted = True
+
+    def _detail(self, index: int) -> Dict[str, Any]:
+        return self._row_detail(self._rows[index])
+
+    def _row_detail(self, row) -> Optional[Dict[str, Any]]:
+        if row[2] in self._details:
+            return self._details[row[2]]
+        detail = self._build_detail(row)
+        self._details[row[2]] = detail
+        return detail
+
+    def _build_detail(self, row) -> Optional[Dict[str, Any]]:
+        """构建单行的完整文件信息，无法 stat 时返回None"""
+        is_file_flag, _lower, name, entry = row
+        is_dir = not is_file_flag
+        is_symlink = entry.is_symlink()
+
+        try:
+            stat_info = entry.stat()
+        except OSError as e:
+            logger.warning(f"无法获取文件信息: {entry.path}, 错误: {e}")
+            return None
+
+        is_file = stat.S_ISREG(stat_info.st_mode) and not is_dir
+        return {
+            'name': name,
+            'path': entry.path,
+            'is_dir': is_dir,
+            'is_file': is_file,
+            'is_symlink': is_symlink,
+            'size': stat_info.st_size if is_file else 0,
+            'modified_time': datetime.fromtimestamp(stat_info.st_mtime),
+            'created_time': datetime.fromtimestamp(stat_info.st_ctime),
+            'permissions': oct(stat_info.st_mode)[-3:],
+            'extension': Path(name).suffix.lower() if is_file else '',
+            'tags': self._tag_lookup(entry.path) if self._tag_lookup else []
+        }
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件搜索引擎
+
+目前提供文件内容搜索：
+- 用 os.scandir 遍历目录树，按文件名通配符过滤
+- 读取文件头部判断二进制文件并跳过
+- 线程池并发扫描文件；大文件用 mmap，配合预编译的 bytes 正则，不必整体解码
+- 匹配结果以生成器形式流式返回，可随时取消，并受结果数量、文件大小和超时限制
+
+作者: Python教程团队
+创建日期: 2024-12-22
+"""
+
+import fnmatch
+import itertools
+import mmap
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    from loguru import logger
+except ImportError:
+    import logging
+    logger = logging.getLogger(__name__)
+
+from config import SEARCH_CONFIG, THREAD_CONFIG
+
+
+# 判断二进制文件时读取的文件头大小
+BINARY_SNIFF_SIZE = 8192
+
+# 小于该大小的文件直接读入内存，比建立mmap更快
+MMAP_THRESHOLD = 64 * 1024
+
+# 结果中保留的匹配行最大长度
+MAX_LINE_LENGTH = 300
+
+
+def is_binary_file(head: bytes) -> bool:
+    """根据文件头判断是否为二进制文件（包含NUL字节）"""
+    return b'\0' in head
+
+
+def compile_content_pattern(pattern: str, use_regex: bool = False,
+                            case_sensitive: bool = False) -> re.Pattern:
+    """
+    编译内容搜索用的 bytes 正则
+
+    Args:
+        pattern: 搜索关键词或正则表达式
+        use_regex: 是否按正则表达式解释
+        case_sensitive: 是否区分大小写（不区分时只对ASCII字母生效）
+    """
+    source = pattern if use_regex else re.escape(pattern)
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(source.encode('utf-8'), flags)
+
+
+def scan_file(file_path: str, regex: re.Pattern, max_matches: int,
+              cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    扫描单个文件
+
+    每一行最多报告一次匹配。
+
+    Returns:
+        {'path', 'binary', 'matches': [{'line_number', 'line', 'offset'}, ...]}
+    """
+    result = {'path': file_path, 'binary': False, 'matches': []}
+
+    with open(file_path, 'rb') as f:
+        head = f.read(BINARY_SNIFF_SIZE)
+        if is_binary_file(head):
+            result['binary'] = True
+            return result
+
+        if len(head) < BINARY_SNIFF_SIZE:
+            data = head
+        else:
+            size = os.fstat(f.fileno()).st_size
+            if size <= MMAP_THRESHOLD:
+                data = head + f.read()
+            else:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            _collect_matches(data, regex, max_matches, cancel_event, result['matches'])
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+    return result
+
+
+def _collect_matches(data, regex: re.Pattern, max_matches: int,
+                     cancel_event: Optional[threading.Event], matches: List[Dict[str, Any]]):
+    """在 bytes 或 mmap 中查找匹配，行号随扫描位置增量计算"""
+    line_number = 1
+    counted_to = 0
+    position = 0
+    length = len(data)
+
+    while position <= length and len(matches) < max_matches:
+        match = regex.search(data, position)
+        if match is None:
+            break
+
+        start = match.start()
+        line_start = data.rfind(b'\n', 0, start) + 1
+        line_end = data.find(b'\n', start)
+        if line_end < 0:
+            line_end = length
+
+        line_number += data[counted_to:line_start].count(b'\n')
+        counted_to = line_start
+
+        line = data[line_start:min(line_end, line_start + MAX_LINE_LENGTH * 4)]
+        matches.append({
+            'line_number': line_number,
+            'line': line.decode('utf-8', errors='replace').rstrip('\r')[:MAX_LINE_LENGTH],
+            'offset': start
+        })
+
+        # 跳到下一行继续，同一行只报告一次
+        position = line_end + 1
+
+        if cancel_event is not None and cancel_event.is_set():
+            break
+
+
+class SearchEngine:
+    """
+    文件搜索引擎
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        初始化搜索引擎
+
+        Args:
+            max_workers: 内容搜索的并发线程数，默认使用配置
+        """
+        self._max_workers = max_workers or THREAD_CONFIG.get('search_workers', 2)
+        self.last_stats: Dict[str, Any] = {}
+
+    def iter_files(self, root: str | Path, globs: Optional[List[str]] = None,
+                   include_hidden: bool = False, follow_symlinks: bool = False,
+                   max_file_size: Optional[int] = None,
+                   cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        遍历目录树中符合条件的文件
+
+        Args:
+            root: 起始目录
+            globs: 文件名通配符列表（如 ['*.py', '*.txt']），为空表示所有文件
+            include_hidden: 是否包含隐藏文件和目录
+            follow_symlinks: 是否进入符号链接指向的目录
+            max_file_size: 跳过大于该大小的文件
+            cancel_event: 取消标志
+        """
+        patterns = [re.compile(fnmatch.translate(g), re.IGNORECASE if os.name == 'nt' else 0)
+                    for g in (globs or [])]
+        stack = [str(root)]
+
+        while stack:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if not include_hidden and entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=follow_symlinks):
+                                stack.append(entry.path)
+                                continue
+                            if not entry.is_file(follow_symlinks=follow_symlinks):
+                                continue
+                            if patterns and not any(p.match(entry.name) for p in patterns):
+                                continue
+                            if max_file_size is not None and entry.stat().st_size > max_file_size:
+                                continue
+                        except OSError:
+                            continue
+                        yield entry.path
+            except OSError as e:
+                logger.debug(f"无法访问目录: {directory}, 错误: {e}")
+
+    def search_content(self, pattern: str, root: str | Path,
+                       globs: Optional[List[str]] = None,
+                       use_regex: Optional[bool] = None,
+                       case_sensitive: Optional[bool] = None,
+                       max_results: Optional[int] = None,
+                       max_file_size: Optional[int] = None,
+                       max_matches_per_file: int = 100,
+                       include_hidden: bool = False,
+                       timeout: Optional[float] = None,
+                       cancel_event: Optional[threading.Event] = None) -> Iterator[Dict[str, Any]]:
+        """
+        在目录树中搜索文件内容
+
+        结果按扫描完成的顺序流式产出，每项为
+        {'path', 'line_number', 'line', 'offset'}。
+        提前关闭生成器、设置 cancel_event、达到结果上限或超时都会停止搜索，
+        统计信息保存在 last_stats 中。
+
+        Args:
+            pattern: 搜索关键词或正则表达式
+            root: 搜索的根目录
+            globs: 文件名通配符列表
+            use_regex: 是否按正则解释 pattern，默认使用配置
+            case_sensitive: 是否区分大小写，默认使用配置
+            max_results: 最多返回的匹配数，默认使用配置
+            max_file_size: 跳过大于该大小的文件，默认使用配置
+            max_matches_per_file: 单个文件最多返回的匹配数
+            include_hidden: 是否搜索隐藏文件和目录
+            timeout: 超时时间（秒），默认使用配置
+            cancel_event: 外部取消标志
+        """
+        regex = compile_content_pattern(
+            pattern,
+            SEARCH_CONFIG['use_regex'] if use_regex is None else use_regex,
+            SEARCH_CONFIG['case_sensitive'] if case_sensitive is None else case_sensitive
+        )
+        max_results = max_results or SEARCH_CONFIG['max_results']
+        if max_file_size is None:
+            max_file_size = SEARCH_CONFIG.get('content_max_file_size')
+        timeout = timeout or SEARCH_CONFIG['search_timeout']
+        deadline = time.monotonic() + timeout if timeout else None
+        cancel_event = cancel_event or threading.Event()
+
+        stats = self.last_stats = {
+            'root': str(root),
+            'files_scanned': 0,
+            'files_matched': 0,
+            'binary_skipped': 0,
+            'errors': 0,
+            'matches': 0,
+            'truncated': False,
+            'cancelled': False,
+            'timed_out': False,
+            'elapsed': 0.0
+        }
+        started = time.perf_counter()
+
+        files = self.iter_files(root, globs, include_hidden,
+                                max_file_size=max_file_size, cancel_event=cancel_event)
+        # 限制在途任务数量，避免遍历远快于扫描时堆积大量future
+        max_pending = self._max_workers * 4
+        pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='content-search')
+        pending = set()
+
+        def drain(done):
+            for future in done:
+                try:
+                    result = future.result()
+                except OSError as e:
+                    stats['errors'] += 1
+                    logger.debug(f"无法读取文件: {e}")
+                    continue
+                stats['files_scanned'] += 1
+                if result['binary']:
+                    stats['binary_skipped'] += 1
+                    continue
+                if result['matches']:
+                    stats['files_matched'] += 1
+                for match in result['matches']:
+                    if stats['matches'] >= max_results:
+                        stats['truncated'] = True
+                        return
+                    stats['matches'] += 1
+                    match['path'] = result['path']
+                    yield match
+
+        def should_stop():
+            if cancel_event.is_set():
+                stats['cancelled'] = not stats['truncated'] and not stats['timed_out']
+                return True
+            if stats['truncated']:
+                return True
+            if deadline is not None and time.monotonic() > deadline:
+                stats['timed_out'] = True
+                return True
+            return False
+
+        try:
+            for file_path in files:
+                pending.add(pool.submit(scan_file, file_path, regex, max_matches_per_file, cancel_event))
+                if len(pending) < max_pending:
+                    continue
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from drain(done)
+                if should_stop():
+                    break
+
+            while pending and not should_stop():
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                yield from drain(done)
+        finally:
+            cancel_event.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+            files.close()
+            stats['elapsed'] = time.perf_counter() - started
+            logger.debug(f"内容搜索完成: {stats}")
+
+
+class ContentSearchTask:
+    """
+    后台内容搜索任务
+
+    在独立线程中运行 SearchEngine.search_content，并把每个匹配交给 on_match
+    回调（FileManager 用它把结果转成事件）。可以随时 cancel()，或 wait() 等待结束。
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, on_match: Callable[[Dict[str, Any]], None],
+                 on_finished: Callable[[Dict[str, Any]], None],
+                 max_workers: Optional[int] = None, **search_kwargs):
+        self.search_id = next(self._ids)
+        self.results: List[Dict[str, Any]] = []
+        self.stats: Dict[str, Any] = {}
+        self._engine = SearchEngine(max_workers)
+        self._on_match = on_match
+        self._on_finished = on_finished
+        self._search_kwargs = search_kwargs
+        self._cancel_event = threading.Event()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f'content-search-{self.search_id}', daemon=True)
+
+    @property
+    def is_running(self) -> bool:
+        """任务是否仍在运行"""
+        return self._thread.is_alive()
+
+    def start(self) -> 'ContentSearchTask':
+        """启动后台搜索"""
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """取消搜索（已产生的结果保留）"""
+        self._cancel_event.set()
+
+    def stop(self):
+        """取消并等待结束（供 FileManager 停止后台任务时调用）"""
+        self.cancel()
+        self.wait()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """等待搜索结束，返回是否已结束"""
+        return self._done.wait(timeout)
+
+    def _run(self):
+        engine = self._engine
+        try:
+            for match in engine.search_content(cancel_event=self._cancel_event, **self._search_kwargs):
+                self.results.append(match)
+                self._on_match(match)
+        except Exception as e:
+            logger.error(f"内容搜索失败: {e}")
+            engine.last_stats['error'] = str(e)
+        finally:
+            self.stats = engine.last_stats
+            self._done.set()
+            self._on_finished(self.stats)
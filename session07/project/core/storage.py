@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据持久化工具
+
+- atomic_write_json: 先写临时文件再 os.replace，写到一半崩溃也不会留下损坏的文件
+- WriteBehindWriter: 延迟写入，一段时间内的多次修改合并成一次写盘
+
+作者: Python教程团队
+创建日期: 2024-12-22
+"""
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    from loguru import logger
+except ImportError:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+def atomic_write_json(file_path: str | Path, data: Any):
+    """
+    原子地写入JSON文件
+
+    Args:
+        file_path: 目标文件路径
+        data: 要写入的数据
+    """
+    file_path = Path(file_path)
+    fd, temp_path = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WriteBehindWriter:
+    """
+    延迟合并写入器
+
+    mark_dirty() 只做标记，第一次标记后 delay 秒由后台定时器统一写盘；
+    期间的所有修改都合并到这一次写入里。stop() 或 flush() 会立即写入。
+    """
+
+    def __init__(self, file_path: str | Path, snapshot: Callable[[], Any],
+                 delay: float = 2.0, name: str = ''):
+        """
+        初始化写入器
+
+        Args:
+            file_path: 目标文件路径
+            snapshot: 返回待写入数据的函数，在写盘时调用
+            delay: 合并窗口（秒），为0时每次标记都立即写入
+            name: 日志中使用的名称
+        """
+        self._file_path = Path(file_path)
+        self._snapshot = snapshot
+        self._delay = delay
+        self._name = name or self._file_path.name
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._dirty = False
+        self._timer = None
+        self._writes = 0
+
+    @property
+    def is_dirty(self) -> bool:
+        """是否有尚未写盘的修改"""
+        return self._dirty
+
+    @property
+    def write_count(self) -> int:
+        """已经执行的写盘次数"""
+        return self._writes
+
+    def mark_dirty(self):
+        """标记数据已修改，安排一次延迟写入"""
+        if self._delay <= 0:
+            with self._lock:
+                self._dirty = True
+            self.flush()
+            return
+
+        with self._lock:
+            self._dirty = True
+            if self._timer is None:
+                # 定时器不设为daemon：解释器退出前会等它完成最后一次写入
+                self._timer = threading.Timer(self._delay, self.flush)
+                self._timer.start()
+
+    def flush(self) -> bool:
+        """立即写入所有未保存的修改，返回是否执行了写盘"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return False
+            self._dirty = False
+
+        # 写盘期间的新修改会重新标记并安排下一次写入
+        with self._write_lock:
+            try:
+                atomic_write_json(self._file_path, self._snapshot())
+                self._writes += 1
+                logger.debug(f"{self._name} 已保存")
+                return True
+            except Exception as e:
+                with self._lock:
+                    self._dirty = True
+                logger.error(f"保存{self._name}失败: {e}")
+                return False
+
+    def stop(self):
+        """停止写入器并写入剩余修改"""
+        self.flush()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件标签存储
+
+同时维护两份映射：
+- 正向：文件路径 -> 标签列表（保持添加顺序，用于显示和持久化）
+- 倒排：标签 -> 文件路径集合（按标签查询，AND/OR 组合就是集合交/并）
+
+作者: Python教程团队
+创建日期: 2024-12-22
+"""
+
+import threading
+from typing import Dict, Iterable, List, Set
+
+
+class TagStore:
+    """
+    带倒排索引的标签存储（线程安全）
+    """
+
+    def __init__(self, data: Dict[str, List[str]] | None = None):
+        """
+        初始化标签存储
+
+        Args:
+            data: 已有的 路径 -> 标签列表 数据（例如从tags.json加载）
+        """
+        self._path_tags: Dict[str, List[str]] = {}
+        self._tag_paths: Dict[str, Set[str]] = {}
+        self._lock = threading.RLock()
+
+        for file_path, tags in (data or {}).items():
+            for tag in tags:
+                self._add(file_path, tag)
+
+    def __len__(self) -> int:
+        """带标签的文件数量"""
+        return len(self._path_tags)
+
+    def __contains__(self, file_path: str) -> bool:
+        return file_path in self._path_tags
+
+    @property
+    def all_tags(self) -> Dict[str, int]:
+        """所有标签及其文件数量"""
+        with self._lock:
+            return {tag: len(paths) for tag, paths in self._tag_paths.items()}
+
+    def tags_of(self, file_path: str) -> List[str]:
+        """获取文件的标签"""
+        with self._lock:
+            return list(self._path_tags.get(file_path, ()))
+
+    def add(self, file_path: str, tag: str) -> bool:
+        """为文件添加标签，返回是否真正发生了变化"""
+        with self._lock:
+            return self._add(file_path, tag)
+
+    def remove(self, file_path: str, tag: str) -> bool:
+        """删除文件标签，返回是否真正发生了变化"""
+        with self._lock:
+            return self._remove(file_path, tag)
+
+    def add_bulk(self, file_paths: Iterable[str], tags: Iterable[str]) -> List[str]:
+        """
+        为一批文件添加一组标签
+
+        Returns:
+            实际发生变化的文件路径列表
+        """
+        tags = list(tags)
+        changed = []
+        with self._lock:
+            for file_path in file_paths:
+                if any([self._add(file_path, tag) for tag in tags]):
+                    changed.append(file_path)
+        return changed
+
+    def remove_bulk(self, file_paths: Iterable[str], tags: Iterable[str]) -> List[str]:
+        """
+        从一批文件上删除一组标签
+
+        Returns:
+            实际发生变化的文件路径列表
+        """
+        tags = list(tags)
+        changed = []
+        with self._lock:
+            for file_path in file_paths:
+                if any([self._remove(file_path, tag) for tag in tags]):
+                    changed.append(file_path)
+        return changed
+
+    def files_with_tag(self, tag: str) -> Set[str]:
+        """获取带有指定标签的文件集合"""
+        with self._lock:
+            return set(self._tag_paths.get(tag, ()))
+
+    def query(self, tags: Iterable[str], match_all: bool = True) -> Set[str]:
+        """
+        按多个标签查询文件
+
+        Args:
+            tags: 标签列表
+            match_all: True 表示同时具有所有标签（AND），False 表示具有任一标签（OR）
+
+        Returns:
+            符合条件的文件路径集合
+        """
+        with self._lock:
+            sets = [self._tag_paths.get(tag, set()) for tag in tags]
+            if not sets:
+                return set()
+            if match_all:
+                # 从最小的集合开始求交，代价取决于最小集合的大小
+                sets.sort(key=len)
+                return set(sets[0]).intersection(*sets[1:])
+            return set().union(*sets)
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """导出为 路径 -> 标签列表 的字典（用于持久化）"""
+        with self._lock:
+            return {file_path: list(tags) for file_path, tags in self._path_tags.items()}
+
+    def _add(self, file_path: str, tag: str) -> bool:
+        tags = self._path_tags.setdefault(file_path, [])
+        if tag in tags:
+            return False
+        tags.append(tag)
+        self._tag_paths.setdefault(tag, set()).add(file_path)
+        return True
+
+    def _remove(self, file_path: str, tag: str) -> bool:
+        tags = self._path_tags.get(file_path)
+        if not tags or tag not in tags:
+            return False
+
+        tags.remove(tag)
+        # 如果没有标签了，删除整个条目
+        if not tags:
+            del self._path_tags[file_path]
+
+        paths = self._tag_paths[tag]
+        paths.discard(file_path)
+        if not paths:
+            del self._tag_paths[tag]
+        return True
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录变化监控
+
+这个模块为文件管理器提供后台目录监控，目录内容发生变化时
+回调通知，让 FileManager 只失效受影响目录的列表缓存。
+
+- Linux 上通过 ctypes 直接调用 inotify，事件实时到达
+- 其他平台（或 inotify 不可用时）退化为轮询目录的 mtime
+
+注意：回调在监控线程中执行，GUI 需要自行切回主线程再刷新界面。
+
+作者: Python教程团队
+创建日期: 2024-12-22
+"""
+
+import os
+import select
+import struct
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Set
+
+try:
+    from loguru import logger
+except ImportError:
+    import logging
+    logger = logging.getLogger(__name__)
+
+
+# 回调签名: callback(目录路径, 发生变化的文件名列表)
+ChangeCallback = Callable[[str, List[str]], None]
+
+
+class DirectoryWatcher:
+    """
+    目录监控基类
+
+    维护被监控目录的集合（按最近使用顺序，超过上限时淘汰最久未用的目录），
+    子类负责实现具体的监控方式。
+    """
+
+    def __init__(self, callback: ChangeCallback, max_watches: int = 256):
+        """
+        初始化监控器
+
+        Args:
+            callback: 目录变化时的回调函数
+            max_watches: 最多同时监控的目录数量
+        """
+        self._callback = callback
+        self._max_watches = max_watches
+        self._watched = OrderedDict()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def watched_paths(self) -> List[str]:
+        """获取当前被监控的目录"""
+        with self._lock:
+            return list(self._watched.keys())
+
+    def start(self):
+        """启动监控线程"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        logger.debug(f"目录监控已启动: {type(self).__name__}")
+
+    def stop(self):
+        """停止监控线程并释放所有监控"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        for path in self.watched_paths:
+            self.unwatch(path)
+        logger.debug("目录监控已停止")
+
+    def watch(self, path: str | Path):
+        """开始监控目录（重复调用只会刷新其最近使用顺序）"""
+        key = str(path)
+        evicted = None
+        with self._lock:
+            if key in self._watched:
+                self._watched.move_to_end(key)
+                return
+            handle = self._add_watch(key)
+            if handle is None:
+                return
+            self._watched[key] = handle
+            if len(self._watched) > self._max_watches:
+                evicted = next(iter(self._watched))
+        if evicted is not None:
+            self.unwatch(evicted)
+
+    def unwatch(self, path: str | Path):
+        """取消监控目录"""
+        key = str(path)
+        with self._lock:
+            handle = self._watched.pop(key, None)
+            if handle is not None:
+                self._remove_watch(key, handle)
+
+    def _notify(self, path: str, names: List[str]):
+        """调用回调，回调中的异常不能中断监控线程"""
+        try:
+            self._callback(path, names)
+        except Exception as e:
+            logger.error(f"目录变化回调错误: {path}, {e}")
+
+    def _add_watch(self, path: str):
+        """添加底层监控，返回句柄；失败时返回None"""
+        raise NotImplementedError
+
+    def _remove_watch(self, path: str, handle):
+        """移除底层监控"""
+        raise NotImplementedError
+
+    def _run(self):
+        """监控线程主循环"""
+        raise NotImplementedError
+
+
+class PollingWatcher(DirectoryWatcher):
+    """
+    轮询监控器
+
+    定期比较目录的 mtime。目录项的增加、删除、重命名都会更新目录
+    mtime，但仅修改已有文件的内容不会，这类变化仍依赖缓存 TTL。
+    """
+
+    def __init__(self, callback: ChangeCallback, max_watches: int = 256,
+                 interval: float = 1.0):
+        super().__init__(callback, max_watches)
+        self._interval = interval
+
+    def _add_watch(self, path: str):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _remove_watch(self, path: str, handle):
+        pass
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            with self._lock:
+                snapshot = list(self._watched.items())
+
+            for path, old_mtime in snapshot:
+                try:
+                    new_mtime = os.stat(path).st_mtime_ns
+                except OSError:
+                    new_mtime = None
+
+                if new_mtime == old_mtime:
+                    continue
+
+                with self._lock:
+                    if path in self._watched:
+                        if new_mtime is None:
+                            del self._watched[path]
+                        else:
+                            self._watched[path] = new_mtime
+                self._notify(path, [])
+
+
+class InotifyWatcher(DirectoryWatcher):
+    """
+    基于 inotify 的监控器（仅 Linux）
+
+    每个目录一个 watch descriptor，一次 read 读到的事件按目录合并后
+    只回调一次，批量复制大量文件时不会产生回调风暴。
+    """
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    # 目录列表里展示了大小、修改时间和权限，所以内容和属性变化也要关注
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM |
+                  IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF |
+                  IN_MOVE_SELF | IN_ONLYDIR)
+
+    _EVENT_HEADER = struct.Struct('iIII')
+
+    def __init__(self, callback: ChangeCallback, max_watches: int = 256):
+        super().__init__(callback, max_watches)
+        import ctypes
+        import ctypes.util
+
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+
+        self._fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, f"inotify_init1 失败: {os.strerror(errno)}")
+
+        # 同一目录经由不同路径（如符号链接）添加时内核返回同一个wd
+        self._wd_paths: Dict[int, Set[str]] = {}
+
+    def stop(self):
+        super().stop()
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def _add_watch(self, path: str):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            logger.debug(f"无法监控目录: {path}")
+            return None
+        self._wd_paths.setdefault(wd, set()).add(path)
+        return wd
+
+    def _remove_watch(self, path: str, handle):
+        paths = self._wd_paths.get(handle)
+        if paths is None:
+            return
+        paths.discard(path)
+        if not paths:
+            del self._wd_paths[handle]
+            self._libc.inotify_rm_watch(self._fd, handle)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], 0.5)
+            except (OSError, ValueError):
+                break
+            if not readable:
+                continue
+
+            try:
+                buffer = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+
+            for path, names in self._parse_events(buffer).items():
+                self._notify(path, names)
+
+    def _parse_events(self, buffer: bytes) -> Dict[str, List[str]]:
+        """解析一批 inotify 事件，按目录合并变化的文件名"""
+        changes: Dict[str, List[str]] = {}
+        header_size = self._EVENT_HEADER.size
+        offset = 0
+
+        with self._lock:
+            while offset + header_size <= len(buffer):
+                wd, mask, _cookie, name_len = self._EVENT_HEADER.unpack_from(buffer, offset)
+                raw_name = buffer[offset + header_size:offset + header_size + name_len]
+                offset += header_size + name_len
+
+                if mask & self.IN_Q_OVERFLOW:
+                    # 事件队列溢出，无法确定哪些目录变了，全部视为已变化
+                    for path in self._watched:
+                        changes.setdefault(path, [])
+                    continue
+
+                paths = self._wd_paths.get(wd)
+                if not paths:
+                    continue
+
+                name = os.fsdecode(raw_name.rstrip(b'\0'))
+                for path in paths:
+                    names = changes.setdefault(path, [])
+                    if name and name not in names:
+                        names.append(name)
+
+                if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                    # 目录本身已不存在，内核会自动移除watch
+                    for path in self._wd_paths.pop(wd, ()):
+                        self._watched.pop(path, None)
+
+        return changes
+
+
+def create_directory_watcher(callback: ChangeCallback, max_watches: int = 256,
+                             poll_interval: float = 1.0) -> DirectoryWatcher:
+    """
+    创建当前平台可用的最佳目录监控器
+
+    Args:
+        callback: 目录变化时的回调函数
+        max_watches: 最多同时监控的目录数量
+        poll_interval: 轮询模式下的检查间隔（秒）
+
+    Returns:
+        DirectoryWatcher: Linux 上为 InotifyWatcher，否则为 PollingWatcher
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(callback, max_watches)
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify 不可用，改用轮询监控: {e}")
+    return PollingWatcher(callback, max_watches, poll_interval)
@@ -171,6 +171,59 @@ def run_gui_mode():
         return 1
 
 
+def run_content_search(args):
+    """
+    CLI模式下搜索文件内容: grep <关键词> [目录]
+    
+    匹配结果通过 FileManager 的 content_match 事件逐条输出，Ctrl+C 取消搜索。
+    
+    Args:
+        args: 命令行参数
+    """
+    if not args.args:
+        print("用法: main.py --cli grep <关键词> [目录] [--glob '*.py'] [--regex] [--case-sensitive]")
+        return 1
+    
+    import re
+    from core.file_manager import FileManager, FileManagerError
+    
+    pattern = args.args[0]
+    root = args.args[1] if len(args.args) > 1 else os.getcwd()
+    
+    manager = FileManager(root)
+    manager.on('content_match', lambda match: print(
+        f"{match['path']}:{match['line_number']}: {match['line']}"
+    ))
+    
+    try:
+        task = manager.search_content(
+            pattern, root, args.glob,
+            use_regex=args.regex,
+            case_sensitive=args.case_sensitive,
+            max_results=args.max_results
+        )
+    except (FileManagerError, re.error) as e:
+        print(f"❌ 搜索失败: {e}")
+        return 1
+    
+    try:
+        while not task.wait(0.2):
+            pass
+    except KeyboardInterrupt:
+        task.stop()
+        print("\n⏹️  搜索已取消")
+    
+    stats = task.stats
+    summary = f"\n共 {stats.get('matches', 0)} 处匹配，扫描 {stats.get('files_scanned', 0)} 个文件"
+    summary += f"（跳过二进制 {stats.get('binary_skipped', 0)} 个），用时 {stats.get('elapsed', 0):.2f}s"
+    if stats.get('truncated'):
+        summary += "，已达到结果上限"
+    if stats.get('timed_out'):
+        summary += "，已超时"
+    print(summary)
+    return 0
+
+
 def run_cli_mode(args):
     """
     运行CLI模式
@@ -181,6 +234,10 @@ def run_cli_mode(args):
     try:
         logger.info("启动CLI模式")
         
+        # 内容搜索直接由核心模块完成
+        if args.command == 'grep':
+            return run_content_search(args)
+        
         # 导入CLI模块
         try:
             from cli.interface import FileManagerCLI
@@ -224,6 +281,7 @@ def create_argument_parser():
   %(prog)s                    # 启动GUI模式
   %(prog)s --cli              # 启动CLI模式
   %(prog)s --cli ls /path     # CLI模式列出目录
+  %(prog)s --cli grep TODO /path --glob "*.py"  # 搜索文件内容
   %(prog)s --version          # 显示版本信息
   %(prog)s --check-deps       # 检查依赖
 
@@ -268,7 +326,7 @@ def create_argument_parser():
     cli_group.add_argument(
         'command',
         nargs='?',
-        help='CLI命令 (ls, search, copy, move, delete, analyze等)'
+        help='CLI命令 (ls, search, grep, copy, move, delete, analyze等)'
     )
     
     cli_group.add_argument(
@@ -277,6 +335,30 @@ def create_argument_parser():
         help='命令参数'
     )
     
+    cli_group.add_argument(
+        '--glob',
+        action='append',
+        help='grep: 只搜索匹配该通配符的文件，可重复使用'
+    )
+    
+    cli_group.add_argument(
+        '--regex',
+        action='store_true',
+        help='grep: 按正则表达式解释关键词'
+    )
+    
+    cli_group.add_argument(
+        '--case-sensitive',
+        action='store_true',
+        help='grep: 区分大小写'
+    )
+    
+    cli_group.add_argument(
+        '--max-results',
+        type=int,
+        help='grep: 最多显示的匹配数'
+    )
+    
     cli_group.add_argument(
         '--no-color',
         action='store_true',
@@ -15,15 +15,40 @@ Session08 项目演示：银行账户管理系统
 1. 基础账户管理（存款、取款、查询余额）
 2. 储蓄账户（利息计算）
 3. 信用账户（透支功能）
-4. 交易记录管理
+4. 交易记录管理（列式存储的交易账本）
 5. 账户统计和报告
+6. 线程安全的转账和批量记账（按账户号码顺序加锁）
+7. 日终批处理（利息计提、信用额度使用率和全行汇总，NumPy向量化计算）
+8. 持久化存储（预写日志 + 快照，重启后自动恢复）
 """
 
+from array import array
+from bisect import bisect_right
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, NamedTuple
 from enum import Enum
+import base64
+import functools
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import uuid
 
+from bank_storage import DURABILITY_MODES, WriteAheadLog, atomic_write_json, load_json
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
 
 class TransactionType(Enum):
     """交易类型枚举"""
@@ -45,6 +70,9 @@ class AccountStatus(Enum):
 class Transaction:
     """交易记录类"""
     
+    __slots__ = ('transaction_id', 'transaction_type', 'amount', 
+                 'description', 'balance_after', 'timestamp')
+    
     def __init__(self, transaction_type: TransactionType, amount: float, 
                  description: str = "", balance_after: float = 0.0):
         """初始化交易记录
@@ -80,6 +108,347 @@ class Transaction:
     
     def __repr__(self) -> str:
         return f"Transaction({self.transaction_type}, {self.amount}, '{self.description}')"
+    
+    @classmethod
+    def from_record(cls, transaction_id: str, transaction_type: TransactionType, 
+                    amount: float, description: str, balance_after: float, 
+                    timestamp: datetime) -> 'Transaction':
+        """由账本中的一行记录构建交易对象（不重新生成ID和时间）
+        
+        Returns:
+            Transaction: 交易记录
+        """
+        transaction = cls.__new__(cls)
+        transaction.transaction_id = transaction_id
+        transaction.transaction_type = transaction_type
+        transaction.amount = amount
+        transaction.description = description
+        transaction.balance_after = balance_after
+        transaction.timestamp = timestamp
+        return transaction
+
+
+class DescriptionPool:
+    """交易描述字符串池
+    
+    同样的描述（如"开户初始存款"、"来自 张三 的转账"）只保存一份，
+    账本中只记录它的编号。
+    """
+    
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._texts)
+    
+    def intern(self, text: str) -> int:
+        """获取描述的编号，新描述会被加入字符串池
+        
+        Args:
+            text (str): 交易描述
+        
+        Returns:
+            int: 描述编号
+        """
+        description_id = self._ids.get(text)
+        if description_id is None:
+            with self._lock:
+                description_id = self._ids.get(text)
+                if description_id is None:
+                    description_id = len(self._texts)
+                    self._texts.append(text)
+                    self._ids[text] = description_id
+        return description_id
+    
+    def text(self, description_id: int) -> str:
+        """根据编号获取描述文本"""
+        return self._texts[description_id]
+
+
+# 交易类型与账本中类型编码的对应关系
+_TRANSACTION_TYPES = tuple(TransactionType)
+_TRANSACTION_TYPE_CODES = {transaction_type: code for code, transaction_type in enumerate(_TRANSACTION_TYPES)}
+
+
+class TransactionLedger(Sequence):
+    """交易账本（列式存储）
+    
+    每笔交易不再保存为一个 Transaction 对象，而是拆成几列定长的 array：
+    - 时间戳：int64，微秒
+    - 交易类型：int8 编码
+    - 金额和交易后余额：int64，单位为分
+    - 描述：字符串池中的编号
+    - 交易ID：uuid 的前32位
+    
+    每笔交易约占 33 字节，而一个 Transaction 对象连同 datetime、字符串要几百字节。
+    Transaction 对象只在读取时按需构建；支持 len、下标、切片和迭代，
+    可以像原来的交易列表一样使用。
+    """
+    
+    # 所有账本共用的描述字符串池
+    shared_descriptions = DescriptionPool()
+    
+    def __init__(self, description_pool: Optional[DescriptionPool] = None):
+        """初始化账本
+        
+        Args:
+            description_pool (DescriptionPool, optional): 描述字符串池，默认使用共享池
+        """
+        self._timestamps = array('q')
+        self._types = array('b')
+        self._amounts = array('q')
+        self._balances = array('q')
+        self._descriptions = array('I')
+        self._ids = array('I')
+        self._pool = description_pool or self.shared_descriptions
+    
+    def __len__(self) -> int:
+        return len(self._timestamps)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("交易记录下标越界")
+        return self._record(index)
+    
+    def __iter__(self) -> Iterator[Transaction]:
+        return self.iter_range()
+    
+    def append(self, transaction_type: TransactionType, amount: float, 
+               description: str = "", balance_after: float = 0.0) -> int:
+        """追加一笔交易
+        
+        Args:
+            transaction_type (TransactionType): 交易类型
+            amount (float): 交易金额
+            description (str): 交易描述
+            balance_after (float): 交易后余额
+        
+        Returns:
+            int: 交易在账本中的序号
+        """
+        # 时间戳保持单调不减，系统时间回拨时按时间查询仍然可以二分
+        timestamp = time.time_ns() // 1000
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            timestamp = self._timestamps[-1]
+        
+        self._timestamps.append(timestamp)
+        self._types.append(_TRANSACTION_TYPE_CODES[transaction_type])
+        self._amounts.append(round(amount * 100))
+        self._balances.append(round(balance_after * 100))
+        self._descriptions.append(self._pool.intern(description))
+        # 与 str(uuid4())[:8] 相同：32位随机数
+        self._ids.append(int.from_bytes(os.urandom(4), 'big'))
+        return len(self._timestamps) - 1
+    
+    def extend(self, records: List[tuple]) -> None:
+        """批量追加交易，整批共用一个时间戳
+        
+        Args:
+            records (List[tuple]): (交易类型, 金额, 描述, 交易后余额) 列表
+        """
+        if not records:
+            return
+        timestamp = time.time_ns() // 1000
+        if self._timestamps and timestamp < self._timestamps[-1]:
+            timestamp = self._timestamps[-1]
+        
+        intern = self._pool.intern
+        self._timestamps.extend([timestamp] * len(records))
+        self._types.extend([_TRANSACTION_TYPE_CODES[record[0]] for record in records])
+        self._amounts.extend([round(record[1] * 100) for record in records])
+        self._descriptions.extend([intern(record[2]) for record in records])
+        self._balances.extend([round(record[3] * 100) for record in records])
+        # 一次读取所有交易ID所需的随机字节
+        self._ids.frombytes(os.urandom(self._ids.itemsize * len(records)))
+    
+    def iter_range(self, start: int = 0, stop: Optional[int] = None, 
+                   reverse: bool = False) -> Iterator[Transaction]:
+        """按序号范围迭代交易，不复制账本
+        
+        Args:
+            start (int): 起始序号
+            stop (int, optional): 结束序号（不包含），默认到末尾
+            reverse (bool): 是否从新到旧迭代
+        
+        Yields:
+            Transaction: 交易记录
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        indexes = range(stop - 1, start - 1, -1) if reverse else range(start, stop)
+        for index in indexes:
+            yield self._record(index)
+    
+    def page(self, number: int, size: int = 20, newest_first: bool = True) -> List[Transaction]:
+        """获取一页交易记录
+        
+        Args:
+            number (int): 页码（从0开始）
+            size (int): 每页条数
+            newest_first (bool): 是否从最新的交易开始分页
+        
+        Returns:
+            List[Transaction]: 该页的交易记录
+        """
+        total = len(self)
+        offset = max(number, 0) * size
+        if newest_first:
+            return list(self.iter_range(max(total - offset - size, 0), total - offset, reverse=True))
+        return list(self.iter_range(offset, offset + size))
+    
+    def page_count(self, size: int = 20) -> int:
+        """按每页条数计算总页数"""
+        return (len(self) + size - 1) // size
+    
+    def balance_at(self, when: datetime) -> float:
+        """查询某一时刻的余额
+        
+        每行都保存了交易后余额，相当于每笔交易都是一个余额检查点，
+        时间戳单调不减，二分查找该时刻之前的最后一笔交易即可，复杂度 O(log n)。
+        
+        Args:
+            when (datetime): 查询时刻
+        
+        Returns:
+            float: 该时刻的余额，早于第一笔交易时为0
+        """
+        timestamp = int(when.timestamp() * 1_000_000)
+        index = bisect_right(self._timestamps, timestamp) - 1
+        return self._balances[index] / 100 if index >= 0 else 0.0
+    
+    def truncate(self, length: int) -> None:
+        """只保留前 length 笔交易（批量记账失败回滚时使用）
+        
+        Args:
+            length (int): 保留的交易数量
+        """
+        for _name, column in self._columns():
+            del column[length:]
+    
+    def memory_usage(self) -> int:
+        """账本各列占用的字节数（不含共享的描述字符串池）"""
+        return sum(column.itemsize * len(column) for _name, column in self._columns())
+    
+    def rows(self, start: int = 0) -> List[list]:
+        """导出从 start 开始的原始行（写入预写日志用）
+        
+        Returns:
+            List[list]: [时间戳, 类型编码, 金额(分), 余额(分), 描述, 交易ID] 列表
+        """
+        text = self._pool.text
+        return [
+            [self._timestamps[i], self._types[i], self._amounts[i], 
+             self._balances[i], text(self._descriptions[i]), self._ids[i]]
+            for i in range(start, len(self))
+        ]
+    
+    def extend_rows(self, rows: Iterable[list]) -> None:
+        """追加 rows() 导出的原始行（从预写日志恢复用）"""
+        intern = self._pool.intern
+        for timestamp, type_code, amount, balance, description, transaction_id in rows:
+            self._timestamps.append(timestamp)
+            self._types.append(type_code)
+            self._amounts.append(amount)
+            self._balances.append(balance)
+            self._descriptions.append(intern(description))
+            self._ids.append(transaction_id)
+    
+    def to_state(self) -> Dict[str, str]:
+        """把各列导出为 base64 字符串（写入快照用）
+        
+        描述列保存的是字符串池中的编号，快照需要同时保存字符串池的内容。
+        """
+        return {name: base64.b64encode(column.tobytes()).decode('ascii') 
+                for name, column in self._columns()}
+    
+    def load_state(self, state: Dict[str, str], description_map: Optional[List[int]] = None, 
+                   byteswap: bool = False) -> None:
+        """从 to_state() 的结果恢复各列
+        
+        Args:
+            state (Dict[str, str]): 快照中的账本数据
+            description_map (List[int], optional): 快照中的描述编号 -> 当前字符串池编号
+            byteswap (bool): 快照来自字节序不同的机器时为True
+        """
+        for name, column in self._columns():
+            del column[:]
+            column.frombytes(base64.b64decode(state[name]))
+            if byteswap:
+                column.byteswap()
+        if description_map is not None:
+            self._descriptions = array('I', [description_map[i] for i in self._descriptions])
+    
+    def _columns(self) -> List[tuple]:
+        """所有列及其名称"""
+        return [('timestamps', self._timestamps), ('types', self._types), 
+                ('amounts', self._amounts), ('balances', self._balances), 
+                ('descriptions', self._descriptions), ('ids', self._ids)]
+    
+    def _record(self, index: int) -> Transaction:
+        """把账本中的一行构建成 Transaction 对象"""
+        return Transaction.from_record(
+            f"{self._ids[index]:08x}",
+            _TRANSACTION_TYPES[self._types[index]],
+            self._amounts[index] / 100,
+            self._pool.text(self._descriptions[index]),
+            self._balances[index] / 100,
+            datetime.fromtimestamp(self._timestamps[index] / 1_000_000)
+        )
+
+
+def synchronized(method):
+    """装饰器：在账户锁内执行方法"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def lock_accounts(accounts: Iterable['BankAccount']):
+    """同时锁定多个账户
+    
+    所有需要多把锁的操作都按账户号码升序加锁，
+    不会出现两个线程各持有一把锁、互相等待对方的情况，因此不会死锁。
+    
+    Args:
+        accounts (Iterable[BankAccount]): 要锁定的账户（可以重复）
+    """
+    unique = {id(account): account for account in accounts}
+    ordered = sorted(unique.values(), key=lambda account: (account.account_number, id(account)))
+    with ExitStack() as stack:
+        for account in ordered:
+            stack.enter_context(account._lock)
+        yield
+
+
+def _journal_updates(items: Iterable[tuple], wait: bool = True) -> None:
+    """把账户的变化写入各自所属的持久化存储
+    
+    同一个存储中的多个账户合并为一条日志记录，恢复时要么全部生效要么全部不生效。
+    调用方需要持有这些账户的锁。
+    
+    Args:
+        items (Iterable[tuple]): (账户, 新增交易笔数) 列表
+        wait (bool): 是否等待日志落盘
+    """
+    journals: Dict[int, tuple] = {}
+    for account, count in items:
+        journal = account._journal
+        if journal is None:
+            continue
+        _, counts = journals.setdefault(id(journal), (journal, {}))
+        previous = counts.get(id(account), (account, 0))[1]
+        counts[id(account)] = (account, previous + count)
+    
+    for journal, counts in journals.values():
+        journal.log_update(list(counts.values()), wait)
 
 
 class BankAccount:
@@ -112,13 +481,16 @@ class BankAccount:
         BankAccount.total_accounts += 1
         
         # 初始化实例变量
+        self._lock = threading.RLock()  # 保护余额和交易记录
         self.account_holder = account_holder.strip()
         self._balance = float(initial_balance)  # 使用私有变量保护余额
         self.account_number = account_number or self._generate_account_number()
         self.status = AccountStatus.ACTIVE
         self.created_date = datetime.now()
         self.last_transaction_date = datetime.now() if initial_balance > 0 else None
-        self.transactions: List[Transaction] = []
+        self.transactions = TransactionLedger()
+        self._journal: Optional['AccountStore'] = None  # 所属的持久化存储
+        self._lsn = 0  # 最后一条相关日志记录的LSN
         
         # 如果有初始余额，记录初始存款
         if initial_balance > 0:
@@ -137,17 +509,70 @@ class BankAccount:
         return f"ACC{BankAccount.total_accounts:08d}"
     
     def _add_transaction(self, transaction_type: TransactionType, 
-                        amount: float, description: str = "") -> None:
+                        amount: float, description: str = "", log: bool = True) -> None:
         """添加交易记录（私有方法）
         
         Args:
             transaction_type (TransactionType): 交易类型
             amount (float): 交易金额
             description (str): 交易描述
+            log (bool): 是否立即写入预写日志（转账等需要和其他账户合并记录时为False）
         """
-        transaction = Transaction(transaction_type, amount, description, self._balance)
-        self.transactions.append(transaction)
+        self.transactions.append(transaction_type, amount, description, self._balance)
         self.last_transaction_date = datetime.now()
+        if log and self._journal is not None:
+            self._journal.log_update([(self, 1)])
+    
+    def _export_state(self, full: bool = False) -> Dict[str, Any]:
+        """导出账户状态（不含交易记录），用于预写日志和快照
+        
+        Args:
+            full (bool): 是否包含开户时确定的信息（类型、持有人、账户号码等）
+        
+        Returns:
+            Dict[str, Any]: 可JSON序列化的状态
+        """
+        state = {
+            'balance': self._balance,
+            'status': self.status.name,
+            'last_transaction': self.last_transaction_date.isoformat() if self.last_transaction_date else None
+        }
+        if full:
+            state.update({
+                'type': self.__class__.__name__,
+                'number': self.account_number,
+                'holder': self.account_holder,
+                'created': self.created_date.isoformat()
+            })
+        return state
+    
+    def _apply_state(self, state: Dict[str, Any]) -> None:
+        """应用 _export_state() 导出的状态（恢复时使用）"""
+        self._balance = state['balance']
+        self.status = AccountStatus[state['status']]
+        last_transaction = state.get('last_transaction')
+        self.last_transaction_date = datetime.fromisoformat(last_transaction) if last_transaction else None
+    
+    @classmethod
+    def _restore(cls, state: Dict[str, Any]) -> 'BankAccount':
+        """根据完整状态重建账户（不经过 __init__，不产生交易记录）
+        
+        Args:
+            state (Dict[str, Any]): _export_state(full=True) 导出的状态
+        
+        Returns:
+            BankAccount: 重建的账户
+        """
+        account = cls.__new__(cls)
+        account._lock = threading.RLock()
+        account.account_holder = state['holder']
+        account.account_number = state['number']
+        account.created_date = datetime.fromisoformat(state['created'])
+        account.transactions = TransactionLedger()
+        account._journal = None
+        account._lsn = 0
+        account._apply_state(state)
+        return account
     
     def _validate_amount(self, amount: float) -> None:
         """验证金额（私有方法）
@@ -181,6 +606,7 @@ class BankAccount:
         """
         return self._balance
     
+    @synchronized
     def deposit(self, amount: float, description: str = "") -> bool:
         """存款
         
@@ -208,6 +634,7 @@ class BankAccount:
         print(f"存款成功！金额：¥{amount:.2f}，当前余额：¥{self._balance:.2f}")
         return True
     
+    @synchronized
     def withdraw(self, amount: float, description: str = "") -> bool:
         """取款
         
@@ -254,6 +681,8 @@ class BankAccount:
                    description: str = "") -> bool:
         """转账到其他账户
         
+        同时持有双方账户的锁（按账户号码顺序获取），并发转账不会丢失更新或死锁。
+        
         Args:
             target_account (BankAccount): 目标账户
             amount (float): 转账金额
@@ -270,28 +699,31 @@ class BankAccount:
         if not isinstance(target_account, BankAccount):
             raise TypeError("目标账户必须是BankAccount类的实例")
         
-        self._check_account_status()
-        target_account._check_account_status()
-        self._validate_amount(amount)
-        
-        if not self._can_withdraw(amount):
-            print(f"转账失败！余额不足。当前余额：¥{self._balance:.2f}，尝试转账：¥{amount:.2f}")
-            return False
-        
-        # 执行转账
-        self._balance -= amount
-        target_account._balance += amount
-        
-        # 记录交易
-        transfer_desc = description or f"转账给 {target_account.account_holder}"
-        receive_desc = f"来自 {self.account_holder} 的转账"
-        
-        self._add_transaction(TransactionType.TRANSFER_OUT, amount, transfer_desc)
-        target_account._add_transaction(TransactionType.TRANSFER_IN, amount, receive_desc)
-        
-        print(f"转账成功！向 {target_account.account_holder} 转账 ¥{amount:.2f}")
-        print(f"您的余额：¥{self._balance:.2f}，对方余额：¥{target_account._balance:.2f}")
-        return True
+        with lock_accounts((self, target_account)):
+            self._check_account_status()
+            target_account._check_account_status()
+            self._validate_amount(amount)
+            
+            if not self._can_withdraw(amount):
+                print(f"转账失败！余额不足。当前余额：¥{self._balance:.2f}，尝试转账：¥{amount:.2f}")
+                return False
+            
+            # 执行转账
+            self._balance -= amount
+            target_account._balance += amount
+            
+            # 记录交易
+            transfer_desc = description or f"转账给 {target_account.account_holder}"
+            receive_desc = f"来自 {self.account_holder} 的转账"
+            
+            self._add_transaction(TransactionType.TRANSFER_OUT, amount, transfer_desc, log=False)
+            target_account._add_transaction(TransactionType.TRANSFER_IN, amount, receive_desc, log=False)
+            # 转出和转入写成同一条日志记录
+            _journal_updates([(self, 1), (target_account, 1)])
+            
+            print(f"转账成功！向 {target_account.account_holder} 转账 ¥{amount:.2f}")
+            print(f"您的余额：¥{self._balance:.2f}，对方余额：¥{target_account._balance:.2f}")
+            return True
     
     def get_balance(self) -> float:
         """获取余额
@@ -335,7 +767,32 @@ class BankAccount:
         Returns:
             List[Transaction]: 交易记录列表
         """
-        return self.transactions[-limit:] if limit > 0 else self.transactions
+        return self.transactions[-limit:] if limit > 0 else self.transactions[:]
+    
+    def get_transaction_page(self, page: int = 0, page_size: int = 20, 
+                             newest_first: bool = True) -> List[Transaction]:
+        """分页获取交易历史
+        
+        Args:
+            page (int): 页码（从0开始）
+            page_size (int): 每页条数，默认20条
+            newest_first (bool): 是否从最新的交易开始，默认是
+        
+        Returns:
+            List[Transaction]: 该页的交易记录
+        """
+        return self.transactions.page(page, page_size, newest_first)
+    
+    def get_balance_at(self, when: datetime) -> float:
+        """查询历史某一时刻的余额
+        
+        Args:
+            when (datetime): 查询时刻
+        
+        Returns:
+            float: 该时刻的余额
+        """
+        return self.transactions.balance_at(when)
     
     def print_transaction_history(self, limit: int = 10) -> None:
         """打印交易历史
@@ -354,6 +811,7 @@ class BankAccount:
         for transaction in transactions:
             print(transaction.get_info())
     
+    @synchronized
     def freeze_account(self) -> None:
         """冻结账户"""
         if self.status == AccountStatus.CLOSED:
@@ -361,16 +819,20 @@ class BankAccount:
             return
         
         self.status = AccountStatus.FROZEN
+        _journal_updates([(self, 0)])
         print(f"账户 {self.account_number} 已冻结")
     
+    @synchronized
     def unfreeze_account(self) -> None:
         """解冻账户"""
         if self.status == AccountStatus.FROZEN:
             self.status = AccountStatus.ACTIVE
+            _journal_updates([(self, 0)])
             print(f"账户 {self.account_number} 已解冻")
         else:
             print("账户未处于冻结状态")
     
+    @synchronized
     def close_account(self) -> bool:
         """关闭账户
         
@@ -382,6 +844,7 @@ class BankAccount:
             return False
         
         self.status = AccountStatus.CLOSED
+        _journal_updates([(self, 0)])
         print(f"账户 {self.account_number} 已关闭")
         return True
     
@@ -497,6 +960,7 @@ class SavingsAccount(BankAccount):
         interest = self._balance * daily_rate * days
         return round(interest, 2)
     
+    @synchronized
     def add_interest(self, days: int = 30) -> float:
         """添加利息到账户
         
@@ -524,6 +988,21 @@ class SavingsAccount(BankAccount):
         
         return interest
     
+    def _export_state(self, full: bool = False) -> Dict[str, Any]:
+        """导出账户状态（增加利率和最后计息日期）"""
+        state = super()._export_state(full)
+        state['last_interest'] = self.last_interest_date.isoformat()
+        if full:
+            state['interest_rate'] = self.interest_rate
+        return state
+    
+    def _apply_state(self, state: Dict[str, Any]) -> None:
+        """应用账户状态（增加利率和最后计息日期）"""
+        super()._apply_state(state)
+        self.last_interest_date = datetime.fromisoformat(state['last_interest'])
+        if 'interest_rate' in state:
+            self.interest_rate = state['interest_rate']
+    
     def get_account_info(self) -> str:
         """获取账户信息（重写父类方法）
         
@@ -578,6 +1057,7 @@ class CreditAccount(BankAccount):
         available_amount = self._balance + (self.credit_limit - self.used_credit)
         return available_amount >= amount
     
+    @synchronized
     def withdraw(self, amount: float, description: str = "") -> bool:
         """取款（重写父类方法，支持透支）
         
@@ -618,6 +1098,7 @@ class CreditAccount(BankAccount):
         
         return True
     
+    @synchronized
     def deposit(self, amount: float, description: str = "") -> bool:
         """存款（重写父类方法，优先还信用额度）
         
@@ -656,6 +1137,21 @@ class CreditAccount(BankAccount):
         print(f"存款成功！金额：¥{amount:.2f}，当前余额：¥{self._balance:.2f}")
         return True
     
+    def _export_state(self, full: bool = False) -> Dict[str, Any]:
+        """导出账户状态（增加信用额度和已使用信用）"""
+        state = super()._export_state(full)
+        state['used_credit'] = self.used_credit
+        if full:
+            state['credit_limit'] = self.credit_limit
+        return state
+    
+    def _apply_state(self, state: Dict[str, Any]) -> None:
+        """应用账户状态（增加信用额度和已使用信用）"""
+        super()._apply_state(state)
+        self.used_credit = state['used_credit']
+        if 'credit_limit' in state:
+            self.credit_limit = state['credit_limit']
+    
     def get_available_credit(self) -> float:
         """获取可用信用额度
         
@@ -691,18 +1187,645 @@ class CreditAccount(BankAccount):
         return base_info + credit_info
 
 
+class Transfer(NamedTuple):
+    """一笔待记账的转账"""
+    source: str           # 转出账户号码
+    target: str           # 转入账户号码
+    amount: float         # 转账金额
+    description: str = ""  # 交易描述
+
+
+class TransferEngine:
+    """转账引擎
+    
+    - transfer(): 单笔转账，按账户号码顺序锁定双方账户
+    - post_batch(): 批量记账，整批要么全部成功要么全部不生效
+    
+    批量记账的步骤：
+    1. 校验账户和金额，按账户号码顺序锁定批次涉及的所有账户
+    2. 按批内顺序回放每个账户的余额变化，余额最低点也必须满足取款条件
+       （批内先转入的钱可以继续转出，后转入的钱不能提前使用）
+    3. 把交易按账户分组，分给多个线程写入各自账户的余额和账本；
+       每个账户只由一个线程写，线程之间不需要再加锁
+    4. 写入中途出错时恢复余额并截断账本
+    """
+    
+    # 批次交易条目少于该数量时直接在当前线程写入，不值得启动线程池
+    PARALLEL_THRESHOLD = 2000
+    
+    def __init__(self, accounts: Dict[str, 'BankAccount'], max_workers: int = 4):
+        """初始化转账引擎
+        
+        Args:
+            accounts (Dict[str, BankAccount]): 账户号码到账户的映射（与 BankManager 共享）
+            max_workers (int): 批量记账时写入账户的线程数
+        """
+        self._accounts = accounts
+        self.max_workers = max(1, max_workers)
+    
+    def transfer(self, source_number: str, target_number: str, amount: float, 
+                 description: str = "") -> bool:
+        """按账户号码转账
+        
+        Args:
+            source_number (str): 转出账户号码
+            target_number (str): 转入账户号码
+            amount (float): 转账金额
+            description (str): 交易描述
+        
+        Returns:
+            bool: 转账是否成功
+        """
+        source = self._accounts.get(source_number)
+        target = self._accounts.get(target_number)
+        if source is None or target is None:
+            missing = source_number if source is None else target_number
+            print(f"转账失败！账户 {missing} 不存在")
+            return False
+        return source.transfer_to(target, amount, description)
+    
+    def post_batch(self, transfers: Iterable) -> Dict[str, Any]:
+        """批量记账（整批原子生效）
+        
+        Args:
+            transfers (Iterable): Transfer 或 (转出账户, 转入账户, 金额[, 描述]) 元组
+        
+        Returns:
+            Dict[str, Any]: {'success', 'transfers', 'accounts', 'error'}
+        """
+        transfers = [t if isinstance(t, Transfer) else Transfer(*t) for t in transfers]
+        result = {'success': False, 'transfers': len(transfers), 'accounts': 0, 'error': None}
+        
+        # 1. 校验账户和金额，按顺序累计每个账户的余额变化并记录最低点
+        running: Dict[int, float] = {}
+        lowest: Dict[int, float] = {}
+        involved: Dict[int, BankAccount] = {}
+        for index, transfer in enumerate(transfers, 1):
+            source = self._accounts.get(transfer.source)
+            target = self._accounts.get(transfer.target)
+            if source is None or target is None:
+                missing = transfer.source if source is None else transfer.target
+                result['error'] = f"第{index}笔转账：账户 {missing} 不存在"
+                return result
+            if not isinstance(transfer.amount, (int, float)) or transfer.amount <= 0:
+                result['error'] = f"第{index}笔转账：金额必须是正数"
+                return result
+            
+            involved[id(source)] = source
+            involved[id(target)] = target
+            running[id(source)] = running.get(id(source), 0.0) - transfer.amount
+            lowest[id(source)] = min(lowest.get(id(source), 0.0), running[id(source)])
+            running[id(target)] = running.get(id(target), 0.0) + transfer.amount
+        
+        result['accounts'] = len(involved)
+        
+        with lock_accounts(involved.values()):
+            # 2. 检查账户状态和支付能力：余额最低点相当于一次取出 -lowest
+            for key, account in involved.items():
+                try:
+                    account._check_account_status()
+                except RuntimeError as e:
+                    result['error'] = f"账户 {account.account_number}：{e}"
+                    return result
+                shortfall = -lowest.get(key, 0.0)
+                if shortfall > 0 and not account._can_withdraw(shortfall):
+                    result['error'] = (f"账户 {account.account_number} 余额不足，"
+                                       f"批内累计最多需要转出 ¥{shortfall:.2f}")
+                    return result
+            
+            # 3. 按账户分组交易条目，保持每个账户内的原始顺序
+            entries: Dict[int, List[tuple]] = {key: [] for key in involved}
+            for transfer in transfers:
+                source = self._accounts[transfer.source]
+                target = self._accounts[transfer.target]
+                entries[id(source)].append((
+                    -transfer.amount, TransactionType.TRANSFER_OUT, 
+                    transfer.description or f"转账给 {target.account_holder}"
+                ))
+                entries[id(target)].append((
+                    transfer.amount, TransactionType.TRANSFER_IN, 
+                    f"来自 {source.account_holder} 的转账"
+                ))
+            
+            snapshot = {key: (account._balance, len(account.transactions)) 
+                        for key, account in involved.items()}
+            groups = [(involved[key], account_entries) for key, account_entries in entries.items()]
+            
+            # 4. 多线程写入，失败时整批回滚
+            try:
+                workers = min(self.max_workers, len(groups))
+                if workers > 1 and len(transfers) * 2 >= self.PARALLEL_THRESHOLD:
+                    shards = [groups[i::workers] for i in range(workers)]
+                    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='post-batch') as pool:
+                        list(pool.map(self._apply_entries, shards))
+                else:
+                    self._apply_entries(groups)
+                # 整批写成一条日志记录
+                _journal_updates((involved[key], len(entries[key])) for key in involved)
+            except Exception as e:
+                for key, (balance, length) in snapshot.items():
+                    involved[key]._balance = balance
+                    involved[key].transactions.truncate(length)
+                result['error'] = f"记账失败，已回滚：{e}"
+                return result
+        
+        result['success'] = True
+        return result
+    
+    @staticmethod
+    def _apply_entries(groups: List[tuple]) -> None:
+        """把交易条目写入账户（调用方已持有这些账户的锁）"""
+        for account, account_entries in groups:
+            balance = account._balance
+            records = []
+            for delta, transaction_type, description in account_entries:
+                balance += delta
+                records.append((transaction_type, abs(delta), description, balance))
+            account._balance = balance
+            account.transactions.extend(records)
+            account.last_transaction_date = datetime.now()
+
+
+class AccountSnapshot:
+    """账户状态快照（列式）
+    
+    一次遍历把账户的余额、状态、利率、信用额度等取出为并列的列，
+    之后的计算都在列上完成；安装了 NumPy 时各列为 ndarray，否则为 list。
+    """
+    
+    def __init__(self, accounts: Iterable[BankAccount]):
+        """生成快照
+        
+        Args:
+            accounts (Iterable[BankAccount]): 账户集合
+        """
+        self.accounts: List[BankAccount] = list(accounts)
+        accounts = self.accounts
+        size = len(accounts)
+        
+        # 账户类名按首次出现的顺序编码；每一列用一个推导式取出，比逐账户追加多列快
+        classes = [account.__class__ for account in accounts]
+        type_codes: Dict[type, int] = {}
+        for account_class in classes:
+            type_codes.setdefault(account_class, len(type_codes))
+        self.type_names: List[str] = [account_class.__name__ for account_class in type_codes]
+        
+        savings_classes = [c for c in type_codes if issubclass(c, SavingsAccount)]
+        credit_classes = [c for c in type_codes if issubclass(c, CreditAccount)]
+        savings_positions = [i for i, c in enumerate(classes) if c in savings_classes] if savings_classes else []
+        credit_positions = [i for i, c in enumerate(classes) if c in credit_classes] if credit_classes else []
+        
+        kinds = [type_codes[account_class] for account_class in classes]
+        balances = [account._balance for account in accounts]
+        active = [account.status is AccountStatus.ACTIVE for account in accounts]
+        rates = [accounts[i].interest_rate for i in savings_positions]
+        credit_limits = [accounts[i].credit_limit for i in credit_positions]
+        used_credit = [accounts[i].used_credit for i in credit_positions]
+        
+        self.balances = self._column(balances, float)
+        self.active = self._column(active, bool)
+        self.kinds = self._column(kinds, int)
+        self.is_savings = self._scatter(size, savings_positions, [True] * len(savings_positions), bool)
+        self.rates = self._scatter(size, savings_positions, rates, float)
+        self.is_credit = self._scatter(size, credit_positions, [True] * len(credit_positions), bool)
+        self.credit_limits = self._scatter(size, credit_positions, credit_limits, float)
+        self.used_credit = self._scatter(size, credit_positions, used_credit, float)
+    
+    @staticmethod
+    def _column(values: list, dtype):
+        """把一列数据转换为 ndarray（没有 NumPy 时保持 list）"""
+        return np.array(values, dtype=dtype) if HAS_NUMPY else values
+    
+    @staticmethod
+    def _scatter(size: int, positions: List[int], values: list, dtype):
+        """生成长度为 size 的列，positions 处为 values，其余为0"""
+        if HAS_NUMPY:
+            column = np.zeros(size, dtype=dtype)
+            column[positions] = values
+            return column
+        column = [dtype()] * size
+        for position, value in zip(positions, values):
+            column[position] = value
+        return column
+    
+    def __len__(self) -> int:
+        return len(self.accounts)
+    
+    def totals(self, balances=None) -> Dict[str, Any]:
+        """汇总全行存款和账户类型分布
+        
+        Args:
+            balances: 用于汇总的余额列，默认使用快照中的余额
+        
+        Returns:
+            Dict[str, Any]: {'total_deposits', 'account_types', 'balances_by_type'}
+        """
+        balances = self.balances if balances is None else balances
+        if HAS_NUMPY:
+            size = len(self.type_names)
+            counts = np.bincount(self.kinds, minlength=size)
+            sums = np.bincount(self.kinds, weights=balances, minlength=size)
+            total = float(balances.sum())
+        else:
+            counts = [0] * len(self.type_names)
+            sums = [0.0] * len(self.type_names)
+            for kind, balance in zip(self.kinds, balances):
+                counts[kind] += 1
+                sums[kind] += balance
+            total = sum(balances)
+        
+        return {
+            'total_deposits': total,
+            'account_types': {name: int(counts[i]) for i, name in enumerate(self.type_names)},
+            'balances_by_type': {name: float(sums[i]) for i, name in enumerate(self.type_names)}
+        }
+
+
+class EndOfDayBatch:
+    """日终批处理
+    
+    对全行账户的一次快照做向量化计算：
+    - 储蓄账户计提利息（与 SavingsAccount.calculate_interest 的公式相同）
+    - 信用账户的额度使用率，以及超过阈值的账户
+    - 计提利息后的全行汇总
+    计算完成后把利息逐账户写回余额，并在账本中记录利息交易。
+    """
+    
+    # 额度使用率不低于该值的信用账户会在报告中列出
+    HIGH_UTILIZATION = 0.8
+    
+    def __init__(self, accounts: Dict[str, BankAccount]):
+        """初始化日终批处理
+        
+        Args:
+            accounts (Dict[str, BankAccount]): 账户号码到账户的映射
+        """
+        self._accounts = accounts
+    
+    def run(self, days: int = 1) -> Dict[str, Any]:
+        """执行日终批处理
+        
+        Args:
+            days (int): 计息天数，默认1天
+        
+        Returns:
+            Dict[str, Any]: 批处理报告，包含 interest、credit、totals 等部分
+        
+        Raises:
+            ValueError: 当天数无效时
+        """
+        if not isinstance(days, int) or days <= 0:
+            raise ValueError("计息天数必须是正整数")
+        
+        start = time.perf_counter()
+        snapshot = AccountSnapshot(self._accounts.values())
+        
+        interest = self._compute_interest(snapshot, days)
+        posted_total = self._post_interest(snapshot, interest, days)
+        credit = self._credit_utilization(snapshot)
+        
+        if HAS_NUMPY:
+            balances_after = snapshot.balances + interest
+        else:
+            balances_after = [balance + amount for balance, amount in zip(snapshot.balances, interest)]
+        
+        return {
+            'date': datetime.now(),
+            'days': days,
+            'accounts': len(snapshot),
+            'interest': posted_total,
+            'credit': credit,
+            'totals': snapshot.totals(balances_after),
+            'vectorized': HAS_NUMPY,
+            'elapsed': time.perf_counter() - start
+        }
+    
+    @staticmethod
+    def _compute_interest(snapshot: AccountSnapshot, days: int):
+        """计算每个账户的利息（非活跃账户和非储蓄账户为0）"""
+        if HAS_NUMPY:
+            interest = np.round(snapshot.balances * (snapshot.rates / 365) * days, 2)
+            eligible = snapshot.is_savings & snapshot.active & (interest > 0)
+            return np.where(eligible, interest, 0.0)
+        
+        return [
+            round(balance * (rate / 365) * days, 2) if savings and active else 0.0
+            for balance, rate, savings, active in zip(
+                snapshot.balances, snapshot.rates, snapshot.is_savings, snapshot.active)
+        ]
+    
+    @staticmethod
+    def _post_interest(snapshot: AccountSnapshot, interest, days: int) -> Dict[str, Any]:
+        """把利息写回账户并记录利息交易
+        
+        按增量写回余额（而不是用快照余额覆盖），
+        快照之后发生的存取款不会丢失。
+        """
+        if HAS_NUMPY:
+            indexes = np.flatnonzero(interest > 0).tolist()
+            amounts = interest[indexes].tolist()
+        else:
+            indexes = [i for i, amount in enumerate(interest) if amount > 0]
+            amounts = [interest[i] for i in indexes]
+        
+        now = datetime.now()
+        descriptions: Dict[float, str] = {}
+        journals: Dict[int, AccountStore] = {}
+        posted, total = 0, 0.0
+        
+        for index, amount in zip(indexes, amounts):
+            account = snapshot.accounts[index]
+            description = descriptions.get(account.interest_rate)
+            if description is None:
+                description = f"{days}天利息，利率{account.interest_rate*100:.2f}%"
+                descriptions[account.interest_rate] = description
+            
+            with account._lock:
+                if account.status is not AccountStatus.ACTIVE:
+                    continue
+                account._balance += amount
+                account.transactions.append(TransactionType.INTEREST, amount, description, account._balance)
+                account.last_transaction_date = now
+                account.last_interest_date = now
+                if account._journal is not None:
+                    # 不逐笔等待落盘，最后统一 sync
+                    account._journal.log_update([(account, 1)], wait=False)
+                    journals[id(account._journal)] = account._journal
+            posted += 1
+            total += amount
+        
+        for journal in journals.values():
+            journal.sync()
+        
+        return {'accounts': posted, 'total': total}
+    
+    def _credit_utilization(self, snapshot: AccountSnapshot) -> Dict[str, Any]:
+        """统计信用账户的额度使用情况"""
+        if HAS_NUMPY:
+            positions = np.flatnonzero(snapshot.is_credit)
+            limits = snapshot.credit_limits[positions]
+            used = snapshot.used_credit[positions]
+            utilization = np.divide(used, limits, out=np.zeros_like(used), where=limits > 0)
+            high = positions[utilization >= self.HIGH_UTILIZATION].tolist()
+            count = len(positions)
+            total_limit, total_used = float(limits.sum()), float(used.sum())
+            average = float(utilization.mean()) if count else 0.0
+        else:
+            positions = [i for i, credit in enumerate(snapshot.is_credit) if credit]
+            utilization = {
+                i: snapshot.used_credit[i] / snapshot.credit_limits[i] if snapshot.credit_limits[i] > 0 else 0.0
+                for i in positions
+            }
+            high = [i for i in positions if utilization[i] >= self.HIGH_UTILIZATION]
+            count = len(positions)
+            total_limit = sum(snapshot.credit_limits[i] for i in positions)
+            total_used = sum(snapshot.used_credit[i] for i in positions)
+            average = sum(utilization.values()) / count if count else 0.0
+        
+        return {
+            'accounts': count,
+            'total_limit': total_limit,
+            'total_used': total_used,
+            'average_utilization': average,
+            'high_utilization': [snapshot.accounts[i].account_number for i in high]
+        }
+
+
+class AccountStore:
+    """账户持久化存储（预写日志 + 快照）
+    
+    - 每次账户变化（开户、交易、状态变更）都在持有账户锁时追加一条日志记录，
+      记录中包含新增的交易行和变化后的账户状态，回放时直接应用，不重新执行业务逻辑
+    - 多个账户的变化（转账、批量记账）合并成一条记录，恢复时原子生效
+    - 每 snapshot_interval 条记录在后台做一次快照：先切换日志段，再逐个账户（持有其锁）复制状态，
+      写完快照后删除旧日志段。快照中保存每个账户最后一条记录的 LSN，回放时跳过已包含的记录
+    - 启动时加载最新快照，再回放之后的日志
+    """
+    
+    SNAPSHOT_FILE = 'snapshot.json'
+    
+    def __init__(self, accounts: Dict[str, BankAccount], directory: str, 
+                 durability: str = 'group', snapshot_interval: int = 100_000, 
+                 commit_delay: Optional[float] = None):
+        """初始化存储（需要调用 recover() 后才能写入）
+        
+        Args:
+            accounts (Dict[str, BankAccount]): 账户号码到账户的映射（与 BankManager 共享）
+            directory (str): 数据目录
+            durability (str): 持久化模式，见 bank_storage.DURABILITY_MODES
+            snapshot_interval (int): 每多少条日志记录自动做一次快照，0表示不自动快照
+            commit_delay (float, optional): 组提交窗口 / 异步刷盘周期（秒）
+        """
+        self._accounts = accounts
+        self.directory = directory
+        self.wal = WriteAheadLog(directory, durability, commit_delay)
+        self.snapshot_interval = snapshot_interval
+        self._records_since_snapshot = 0
+        self._checkpoint_lock = threading.Lock()
+        self._checkpoint_thread: Optional[threading.Thread] = None
+    
+    @property
+    def durability(self) -> str:
+        """持久化模式"""
+        return self.wal.mode
+    
+    def recover(self) -> Dict[str, Any]:
+        """从快照和预写日志恢复账户
+        
+        Returns:
+            Dict[str, Any]: {'snapshot_accounts', 'replayed', 'accounts', 'elapsed'}
+        """
+        start = time.perf_counter()
+        snapshot = load_json(os.path.join(self.directory, self.SNAPSHOT_FILE))
+        replay_from, next_lsn, snapshot_accounts = 0, 1, 0
+        
+        if snapshot is not None:
+            self._load_snapshot(snapshot)
+            replay_from = snapshot['wal_segment']
+            next_lsn = snapshot['lsn'] + 1
+            snapshot_accounts = len(snapshot['accounts'])
+        
+        replayed = 0
+        for lsn, record in self.wal.replay(replay_from):
+            self._apply_record(lsn, record)
+            replayed += 1
+        
+        self.wal.open_segment(next_lsn)
+        self._records_since_snapshot = replayed
+        
+        # 新开户的账户号码不能和恢复的账户重复
+        for number in self._accounts:
+            if BankAccount.is_valid_account_number(number):
+                BankAccount.total_accounts = max(BankAccount.total_accounts, int(number[3:]))
+        
+        return {
+            'snapshot_accounts': snapshot_accounts,
+            'replayed': replayed,
+            'accounts': len(self._accounts),
+            'elapsed': time.perf_counter() - start
+        }
+    
+    def log_open(self, account: BankAccount) -> None:
+        """记录开户（包括开户时产生的交易），之后该账户的变化都会写入本存储"""
+        account._journal = self
+        record = {
+            'op': 'open',
+            'account': account._export_state(full=True),
+            'rows': account.transactions.rows()
+        }
+        account._lsn = self.wal.append(record)
+        self._after_append()
+    
+    def log_update(self, items: List[tuple], wait: bool = True) -> None:
+        """记录一个或多个账户的变化（调用方持有这些账户的锁）
+        
+        Args:
+            items (List[tuple]): (账户, 新增交易笔数) 列表
+            wait (bool): 是否等待落盘（async 模式下总是不等待）
+        """
+        record = {
+            'op': 'update',
+            'items': [
+                {
+                    'number': account.account_number,
+                    'rows': account.transactions.rows(len(account.transactions) - count) if count else [],
+                    'state': account._export_state()
+                }
+                for account, count in items
+            ]
+        }
+        lsn = self.wal.append(record, wait)
+        for account, _count in items:
+            account._lsn = lsn
+        self._after_append()
+    
+    def sync(self) -> None:
+        """等待此前所有日志记录落盘"""
+        self.wal.sync()
+    
+    def checkpoint(self) -> Dict[str, Any]:
+        """做一次快照并删除已被快照包含的日志段
+        
+        快照期间其他线程可以继续操作账户，每个账户只在复制状态时短暂加锁。
+        
+        Returns:
+            Dict[str, Any]: {'accounts', 'wal_segment', 'removed_segments', 'elapsed'}
+        """
+        with self._checkpoint_lock:
+            start = time.perf_counter()
+            # 切换日志段之前的记录都已在内存中生效，下面复制账户状态时一定会包含它们
+            segment = self.wal.rotate()
+            self._records_since_snapshot = 0
+            
+            states = []
+            for account in list(self._accounts.values()):
+                with account._lock:
+                    state = account._export_state(full=True)
+                    state['lsn'] = account._lsn
+                    state['ledger'] = account.transactions.to_state()
+                states.append(state)
+            
+            snapshot = {
+                'version': 1,
+                'created': datetime.now().isoformat(),
+                'wal_segment': segment,
+                'lsn': self.wal.last_lsn,
+                'byteorder': sys.byteorder,
+                # 字符串池只会增长，在复制账本之后读取可以覆盖所有用到的编号
+                'descriptions': list(TransactionLedger.shared_descriptions._texts),
+                'accounts': states
+            }
+            atomic_write_json(os.path.join(self.directory, self.SNAPSHOT_FILE), snapshot)
+            removed = self.wal.remove_segments_before(segment)
+            
+            return {
+                'accounts': len(states),
+                'wal_segment': segment,
+                'removed_segments': removed,
+                'elapsed': time.perf_counter() - start
+            }
+    
+    def close(self) -> None:
+        """等待后台快照完成，写入剩余日志并关闭"""
+        thread = self._checkpoint_thread
+        if thread is not None:
+            thread.join()
+        self.wal.close()
+    
+    def _after_append(self) -> None:
+        """记录数达到阈值时在后台线程做快照"""
+        self._records_since_snapshot += 1
+        if not self.snapshot_interval or self._records_since_snapshot < self.snapshot_interval:
+            return
+        if self._checkpoint_thread is not None and self._checkpoint_thread.is_alive():
+            return
+        self._records_since_snapshot = 0
+        self._checkpoint_thread = threading.Thread(target=self.checkpoint, name='bank-checkpoint', daemon=True)
+        self._checkpoint_thread.start()
+    
+    def _load_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        """从快照重建账户"""
+        pool = TransactionLedger.shared_descriptions
+        description_map = [pool.intern(text) for text in snapshot['descriptions']]
+        if description_map == list(range(len(description_map))):
+            description_map = None  # 编号未变化，不需要转换
+        byteswap = snapshot['byteorder'] != sys.byteorder
+        
+        for state in snapshot['accounts']:
+            account = ACCOUNT_TYPES[state['type']]._restore(state)
+            account.transactions.load_state(state['ledger'], description_map, byteswap)
+            account._lsn = state['lsn']
+            account._journal = self
+            self._accounts[account.account_number] = account
+    
+    def _apply_record(self, lsn: int, record: Dict[str, Any]) -> None:
+        """回放一条日志记录，已包含在快照中的部分会被跳过"""
+        if record['op'] == 'open':
+            state = record['account']
+            existing = self._accounts.get(state['number'])
+            if existing is not None and existing._lsn >= lsn:
+                return
+            account = ACCOUNT_TYPES[state['type']]._restore(state)
+            account.transactions.extend_rows(record['rows'])
+            account._lsn = lsn
+            account._journal = self
+            self._accounts[account.account_number] = account
+            return
+        
+        for item in record['items']:
+            account = self._accounts.get(item['number'])
+            if account is None or account._lsn >= lsn:
+                continue
+            account.transactions.extend_rows(item['rows'])
+            account._apply_state(item['state'])
+            account._lsn = lsn
+
+
 class BankManager:
     """银行管理器类 - 管理多个账户"""
     
-    def __init__(self, bank_name: str = "Python银行"):
+    def __init__(self, bank_name: str = "Python银行", storage_dir: Optional[str] = None, 
+                 durability: str = 'group', **storage_options):
         """初始化银行管理器
         
         Args:
             bank_name (str): 银行名称
+            storage_dir (str, optional): 数据目录；提供时启用持久化并从中恢复账户
+            durability (str): 持久化模式（'sync'、'group'、'async'），见 bank_storage.DURABILITY_MODES
+            **storage_options: 传给 AccountStore 的其他参数（snapshot_interval、commit_delay）
         """
         self.bank_name = bank_name
         self.accounts: Dict[str, BankAccount] = {}
         self.created_date = datetime.now()
+        self.transfer_engine = TransferEngine(self.accounts)
+        self.storage: Optional[AccountStore] = None
+        
+        if storage_dir is not None:
+            self.storage = AccountStore(self.accounts, storage_dir, durability, **storage_options)
+            stats = self.storage.recover()
+            if stats['accounts']:
+                print(f"已从 {storage_dir} 恢复 {stats['accounts']} 个账户"
+                      f"（回放 {stats['replayed']} 条日志，耗时 {stats['elapsed']:.3f}秒）")
     
     def create_account(self, account_type: str, account_holder: str, 
                       initial_balance: float = 0.0, **kwargs) -> Optional[BankAccount]:
@@ -730,6 +1853,8 @@ class BankManager:
                 print(f"不支持的账户类型：{account_type}")
                 return None
             
+            if self.storage is not None:
+                self.storage.log_open(account)
             self.accounts[account.account_number] = account
             print(f"账户创建成功：{account}")
             return account
@@ -749,6 +1874,32 @@ class BankManager:
         """
         return self.accounts.get(account_number)
     
+    def transfer(self, source_number: str, target_number: str, amount: float, 
+                 description: str = "") -> bool:
+        """按账户号码转账
+        
+        Args:
+            source_number (str): 转出账户号码
+            target_number (str): 转入账户号码
+            amount (float): 转账金额
+            description (str): 交易描述
+        
+        Returns:
+            bool: 转账是否成功
+        """
+        return self.transfer_engine.transfer(source_number, target_number, amount, description)
+    
+    def post_batch(self, transfers: Iterable) -> Dict[str, Any]:
+        """批量记账，整批要么全部成功要么全部不生效
+        
+        Args:
+            transfers (Iterable): Transfer 或 (转出账户, 转入账户, 金额[, 描述]) 元组
+        
+        Returns:
+            Dict[str, Any]: {'success', 'transfers', 'accounts', 'error'}
+        """
+        return self.transfer_engine.post_batch(transfers)
+    
     def list_accounts(self) -> List[BankAccount]:
         """列出所有账户
         
@@ -771,13 +1922,10 @@ class BankManager:
         Returns:
             str: 银行摘要信息
         """
+        totals = AccountSnapshot(self.accounts.values()).totals()
         total_accounts = len(self.accounts)
-        total_deposits = self.get_total_deposits()
-        
-        account_types = {}
-        for account in self.accounts.values():
-            account_type = account.__class__.__name__
-            account_types[account_type] = account_types.get(account_type, 0) + 1
+        total_deposits = totals['total_deposits']
+        account_types = totals['account_types']
         
         summary = [
             f"银行摘要 - {self.bank_name}",
@@ -793,6 +1941,26 @@ class BankManager:
         
         return "\n".join(summary)
     
+    def run_end_of_day(self, days: int = 1) -> Dict[str, Any]:
+        """执行日终批处理：计提利息、统计信用额度使用率和全行汇总
+        
+        Args:
+            days (int): 计息天数，默认1天
+        
+        Returns:
+            Dict[str, Any]: 批处理报告
+        """
+        return EndOfDayBatch(self.accounts).run(days)
+    
+    def checkpoint(self) -> Optional[Dict[str, Any]]:
+        """立即做一次快照（未启用持久化时返回None）"""
+        return self.storage.checkpoint() if self.storage is not None else None
+    
+    def close(self) -> None:
+        """关闭持久化存储，确保所有日志落盘"""
+        if self.storage is not None:
+            self.storage.close()
+    
     def print_all_accounts(self) -> None:
         """打印所有账户信息"""
         if not self.accounts:
@@ -811,6 +1979,10 @@ class BankManager:
                 print(f"信用额度：¥{account.credit_limit:.2f}，已使用：¥{account.used_credit:.2f}")
 
 
+# 账户类名 -> 账户类，恢复时按类名重建账户
+ACCOUNT_TYPES = {cls.__name__: cls for cls in (BankAccount, SavingsAccount, CreditAccount)}
+
+
 def demo_bank_system():
     """演示银行账户管理系统"""
     print("=== 银行账户管理系统演示 ===")
@@ -969,5 +2141,188 @@ def demo_bank_system():
     print("\n=== 演示完成 ===")
 
 
+def benchmark_transfers(num_accounts: int = 32, num_transfers: int = 100_000, 
+                        threads: int = 8, batch_size: int = 1000) -> Dict[str, float]:
+    """测试并发转账的吞吐量
+    
+    少量账户、多个线程同时转账，制造锁竞争。分别测试逐笔 transfer_to 和 post_batch，
+    并检查资金总额守恒。
+    
+    Args:
+        num_accounts (int): 账户数量（越少竞争越激烈）
+        num_transfers (int): 每种方式的转账总笔数
+        threads (int): 并发线程数
+        batch_size (int): post_batch 每批的转账笔数
+    
+    Returns:
+        Dict[str, float]: 每种方式的吞吐量（笔/秒）
+    """
+    rng = random.Random(42)
+    pairs = [tuple(rng.sample(range(num_accounts), 2)) for _ in range(num_transfers)]
+    per_thread = num_transfers // threads
+    throughput = {}
+    
+    def make_bank():
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                bank = BankManager("基准测试银行")
+                accounts = [bank.create_account("basic", f"用户{i}", 1_000_000.0) 
+                            for i in range(num_accounts)]
+            finally:
+                sys.stdout = stdout
+        return bank, accounts
+    
+    def run(name, worker):
+        bank, accounts = make_bank()
+        total_before = bank.get_total_deposits()
+        workers = [threading.Thread(target=worker, args=(bank, accounts, pairs[i * per_thread:(i + 1) * per_thread]))
+                   for i in range(threads)]
+        with open(os.devnull, 'w') as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            start = time.perf_counter()
+            try:
+                for thread in workers:
+                    thread.start()
+                for thread in workers:
+                    thread.join()
+            finally:
+                elapsed = time.perf_counter() - start
+                sys.stdout = stdout
+        
+        assert abs(bank.get_total_deposits() - total_before) < 0.01, "资金总额不守恒"
+        throughput[name] = per_thread * threads / elapsed
+        print(f"[基准] {name}: {throughput[name]:,.0f} 笔/秒（{threads}线程，{num_accounts}个账户）")
+    
+    def single(bank, accounts, chunk):
+        for source, target in chunk:
+            accounts[source].transfer_to(accounts[target], 1.0)
+    
+    def batched(bank, accounts, chunk):
+        for i in range(0, len(chunk), batch_size):
+            batch = [(accounts[source].account_number, accounts[target].account_number, 1.0)
+                     for source, target in chunk[i:i + batch_size]]
+            result = bank.post_batch(batch)
+            assert result['success'], result['error']
+    
+    run("逐笔转账", single)
+    run(f"批量记账（每批{batch_size}笔）", batched)
+    return throughput
+
+
+def benchmark_end_of_day(num_accounts: int = 200_000, days: int = 1) -> Dict[str, float]:
+    """对比逐账户计息与日终批处理的耗时
+    
+    Args:
+        num_accounts (int): 账户数量（储蓄、信用、基础账户各占约三分之一）
+        days (int): 计息天数
+    
+    Returns:
+        Dict[str, float]: 各方式的耗时（秒）
+    """
+    def make_bank():
+        rng = random.Random(7)
+        bank = BankManager("基准测试银行")
+        for i in range(num_accounts):
+            kind = i % 3
+            if kind == 0:
+                account = SavingsAccount(f"用户{i}", rng.uniform(0, 100_000), rng.choice([0.01, 0.02, 0.03]))
+            elif kind == 1:
+                account = CreditAccount(f"用户{i}", 0.0, 10_000.0)
+                account.used_credit = rng.uniform(0, 10_000)
+            else:
+                account = BankAccount(f"用户{i}", rng.uniform(0, 100_000))
+            bank.accounts[account.account_number] = account
+        return bank
+    
+    timings = {}
+    bank = make_bank()
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        start = time.perf_counter()
+        try:
+            total_interest = 0.0
+            for account in bank.accounts.values():
+                if isinstance(account, SavingsAccount):
+                    total_interest += account.add_interest(days)
+            total_deposits = bank.get_total_deposits()
+            bank.get_bank_summary()
+        finally:
+            timings['loop'] = time.perf_counter() - start
+            sys.stdout = stdout
+    
+    bank = make_bank()
+    start = time.perf_counter()
+    report = bank.run_end_of_day(days)
+    timings['batch'] = time.perf_counter() - start
+    
+    mode = "NumPy" if report['vectorized'] else "纯Python"
+    print(f"[基准] 逐账户计息+汇总: {timings['loop']:.3f}秒（利息合计 ¥{total_interest:,.2f}，存款 ¥{total_deposits:,.2f}）")
+    print(f"[基准] 日终批处理（{mode}）: {timings['batch']:.3f}秒（利息合计 ¥{report['interest']['total']:,.2f}，"
+          f"存款 ¥{report['totals']['total_deposits']:,.2f}），{num_accounts}个账户")
+    return timings
+
+
+def benchmark_storage(threads: int = 8, commits_per_thread: int = 500) -> Dict[str, float]:
+    """测试各持久化模式的提交吞吐量和恢复耗时
+    
+    每个线程在自己的账户上连续存款，每次存款是一次提交。
+    
+    Args:
+        threads (int): 并发线程数
+        commits_per_thread (int): 每个线程的提交次数
+    
+    Returns:
+        Dict[str, float]: 各模式的吞吐量（次/秒）
+    """
+    throughput = {}
+    
+    for mode in DURABILITY_MODES:
+        directory = tempfile.mkdtemp(prefix=f"bank-{mode}-")
+        try:
+            with open(os.devnull, 'w') as devnull:
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    bank = BankManager("基准测试银行", storage_dir=directory, durability=mode)
+                    accounts = [bank.create_account("basic", f"用户{i}", 100.0) for i in range(threads)]
+                    
+                    def worker(account):
+                        for _ in range(commits_per_thread):
+                            account.deposit(1.0)
+                    
+                    workers = [threading.Thread(target=worker, args=(account,)) for account in accounts]
+                    start = time.perf_counter()
+                    for thread in workers:
+                        thread.start()
+                    for thread in workers:
+                        thread.join()
+                    bank.storage.sync()
+                    elapsed = time.perf_counter() - start
+                    fsyncs = bank.storage.wal.fsync_count
+                    bank.close()
+                    
+                    start = time.perf_counter()
+                    recovered = BankManager("基准测试银行", storage_dir=directory, durability=mode)
+                    recovery = time.perf_counter() - start
+                    recovered.close()
+                finally:
+                    sys.stdout = stdout
+            
+            assert all(recovered.accounts[a.account_number].balance == a.balance for a in accounts), "恢复后余额不一致"
+            commits = threads * commits_per_thread
+            throughput[mode] = commits / elapsed
+            print(f"[基准] {mode}: {throughput[mode]:,.0f} 次提交/秒（{threads}线程，"
+                  f"{commits}次提交，fsync {fsyncs}次），恢复 {recovery:.3f}秒")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+    
+    return throughput
+
+
 if __name__ == "__main__":
-    demo_bank_system()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_transfers()
+        benchmark_end_of_day()
+        benchmark_storage()
+    else:
+        demo_bank_system()
\ No newline at end of file
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+银行系统的持久化组件
+
+- WriteAheadLog: 预写日志（WAL）。每条记录带序号（LSN）和CRC校验，
+  按段文件追加写入；支持组提交（多个并发提交共用一次 fsync）
+- atomic_write_json / load_json: 快照文件的原子写入和读取
+
+这个模块只处理"记录"和"文件"，不依赖账户类；
+账户状态的序列化和恢复由 bank_account_system.AccountStore 负责。
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# 持久化模式：持久性从高到低，吞吐量从低到高
+DURABILITY_MODES = {
+    'sync': "每次提交立即写盘并 fsync，提交返回时已落盘",
+    'group': "组提交：后台线程把一小段时间内的提交合并成一次 fsync，提交等待落盘后返回",
+    'async': "异步：提交写入内存缓冲立即返回，后台定期 fsync，崩溃时可能丢失最近一个周期的提交",
+}
+
+
+def atomic_write_json(file_path: str, data: Any) -> None:
+    """原子地写入JSON文件（先写临时文件并 fsync，再 os.replace）
+
+    Args:
+        file_path (str): 目标文件路径
+        data (Any): 要写入的数据
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def load_json(file_path: str) -> Optional[Any]:
+    """读取JSON文件，文件不存在时返回None"""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _fsync_directory(directory: str) -> None:
+    """fsync 目录，让文件的创建、改名和删除也持久化（Windows 不支持，忽略）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class WriteAheadLog:
+    """预写日志
+
+    日志由若干段文件 wal-00000001.log、wal-00000002.log ... 组成，每行一条记录：
+
+        <LSN> <CRC32> <JSON>\\n
+
+    CRC 覆盖 "<LSN> <JSON>"，恢复时遇到校验失败或不完整的行（写到一半崩溃）即停止，
+    并把该段文件截断到最后一条完整记录。
+
+    append() 在调用方线程中只做编码和分配 LSN，写盘由 flush() 完成：
+    - sync 模式：append 内直接 flush
+    - group 模式：后台线程统一 flush，上一次 fsync 期间到达的记录自然合并到下一次；
+      commit_delay > 0 时每次 flush 前再额外等待一个窗口。append 等待落盘
+    - async 模式：后台线程每 commit_delay 秒 flush 一次，append 不等待
+    """
+
+    SEGMENT_PREFIX = 'wal-'
+    SEGMENT_SUFFIX = '.log'
+
+    def __init__(self, directory: str, mode: str = 'group', commit_delay: Optional[float] = None):
+        """打开预写日志（不会自动回放，先调用 replay 再 open_segment）
+
+        Args:
+            directory (str): 日志目录
+            mode (str): 持久化模式，见 DURABILITY_MODES
+            commit_delay (float, optional): 组提交的收集窗口 / 异步模式的刷盘周期（秒）
+
+        Raises:
+            ValueError: 当模式无效时
+        """
+        if mode not in DURABILITY_MODES:
+            raise ValueError(f"不支持的持久化模式：{mode}，可选：{', '.join(DURABILITY_MODES)}")
+
+        self.directory = directory
+        self.mode = mode
+        self.commit_delay = commit_delay if commit_delay is not None else (0.05 if mode == 'async' else 0.0)
+        os.makedirs(directory, exist_ok=True)
+
+        # _io_lock 保证同一时间只有一个线程写文件；_lock 保护缓冲区和LSN。加锁顺序：先 _io_lock 后 _lock
+        self._io_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._buffer: List[bytes] = []
+        self._next_lsn = 1
+        self._durable_lsn = 0
+        self._segment = 0
+        self._file = None
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._flusher: Optional[threading.Thread] = None
+
+        self.fsync_count = 0
+
+    @property
+    def last_lsn(self) -> int:
+        """最后分配的LSN"""
+        return self._next_lsn - 1
+
+    @property
+    def durable_lsn(self) -> int:
+        """已经落盘的最大LSN"""
+        return self._durable_lsn
+
+    @property
+    def segment(self) -> int:
+        """当前写入的段号"""
+        return self._segment
+
+    def segments(self) -> List[int]:
+        """目录中所有日志段的段号（升序）"""
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith(self.SEGMENT_PREFIX) and name.endswith(self.SEGMENT_SUFFIX):
+                number = name[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]
+                if number.isdigit():
+                    numbers.append(int(number))
+        return sorted(numbers)
+
+    def replay(self, from_segment: int = 0) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """按顺序读取日志记录
+
+        Args:
+            from_segment (int): 从该段号开始读取（更早的段已包含在快照中）
+
+        Yields:
+            Tuple[int, Dict[str, Any]]: (LSN, 记录)
+        """
+        for number in self.segments():
+            if number < from_segment:
+                continue
+            path = self._segment_path(number)
+            valid_size = 0
+            with open(path, 'rb') as f:
+                for line in f:
+                    parsed = self._decode(line)
+                    if parsed is None:
+                        break
+                    valid_size += len(line)
+                    self._next_lsn = max(self._next_lsn, parsed[0] + 1)
+                    yield parsed
+
+            if valid_size < os.path.getsize(path):
+                # 末尾是写到一半的记录：截断，后面的段（如果有）不再可信
+                print(f"警告：日志段 {os.path.basename(path)} 在 {valid_size} 字节处损坏，已截断")
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_size)
+                    f.flush()
+                    os.fsync(f.fileno())
+                return
+
+    def open_segment(self, next_lsn: int = 1) -> None:
+        """开始写入一个新的日志段并启动后台刷盘线程
+
+        Args:
+            next_lsn (int): 下一条记录的最小LSN（来自快照或回放结果）
+        """
+        with self._io_lock, self._lock:
+            self._next_lsn = max(self._next_lsn, next_lsn)
+            self._durable_lsn = self._next_lsn - 1
+            existing = self.segments()
+            self._open_next_segment_locked(existing[-1] if existing else 0)
+
+        if self.mode != 'sync' and self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='wal-flusher', daemon=True)
+            self._flusher.start()
+
+    def append(self, record: Dict[str, Any], wait: bool = True) -> int:
+        """追加一条记录
+
+        Args:
+            record (Dict[str, Any]): 可JSON序列化的记录
+            wait (bool): sync/group 模式下是否等待落盘；批量写入时可以最后统一 sync()
+
+        Returns:
+            int: 记录的LSN
+        """
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+        with self._lock:
+            if self._error is not None:
+                raise IOError(f"预写日志不可用：{self._error}")
+            if self._file is None:
+                raise RuntimeError("预写日志尚未打开")
+            lsn = self._next_lsn
+            self._next_lsn += 1
+            self._buffer.append(self._encode(lsn, payload))
+            if self.mode != 'sync':
+                self._cond.notify_all()
+
+        if wait and self.mode == 'sync':
+            self.flush()
+        elif wait and self.mode == 'group':
+            self.wait_durable(lsn)
+        return lsn
+
+    def flush(self) -> int:
+        """把缓冲区中的记录写盘并 fsync
+
+        Returns:
+            int: 已落盘的最大LSN
+        """
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                last = self._next_lsn - 1
+
+            if lines:
+                try:
+                    self._file.write(b''.join(lines))
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    self.fsync_count += 1
+                except OSError as e:
+                    with self._lock:
+                        self._error = e
+                        self._cond.notify_all()
+                    raise
+
+            with self._lock:
+                if last > self._durable_lsn:
+                    self._durable_lsn = last
+                self._cond.notify_all()
+            return last
+
+    def sync(self) -> None:
+        """等待此前所有记录落盘"""
+        self.flush()
+
+    def wait_durable(self, lsn: int) -> None:
+        """等待指定LSN落盘
+
+        Raises:
+            IOError: 当写盘失败时
+        """
+        with self._lock:
+            while self._durable_lsn < lsn:
+                if self._error is not None:
+                    raise IOError(f"预写日志写入失败：{self._error}")
+                self._cond.wait()
+
+    def rotate(self) -> int:
+        """把缓冲区写入当前段后切换到新段
+
+        Returns:
+            int: 新段的段号，段号更小的日志可以在快照完成后删除
+        """
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+                last = self._next_lsn - 1
+            if lines:
+                self._file.write(b''.join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+
+            with self._lock:
+                self._durable_lsn = max(self._durable_lsn, last)
+                self._cond.notify_all()
+                self._open_next_segment_locked(self._segment)
+                return self._segment
+
+    def remove_segments_before(self, segment: int) -> int:
+        """删除段号小于 segment 的日志段，返回删除的数量"""
+        removed = 0
+        for number in self.segments():
+            if number < segment:
+                os.remove(self._segment_path(number))
+                removed += 1
+        if removed:
+            _fsync_directory(self.directory)
+        return removed
+
+    def close(self) -> None:
+        """写入剩余记录并关闭日志"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def _flush_loop(self) -> None:
+        """后台刷盘线程"""
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+            # 等待一个提交窗口，让更多并发提交合并到同一次 fsync
+            if self.commit_delay > 0:
+                time.sleep(self.commit_delay)
+            try:
+                self.flush()
+            except OSError:
+                return
+
+    def _open_next_segment_locked(self, after: int) -> None:
+        """打开段号为 after+1 的新段（调用方持有两把锁）"""
+        if self._file is not None:
+            self._file.close()
+        self._segment = after + 1
+        self._file = open(self._segment_path(self._segment), 'ab')
+        _fsync_directory(self.directory)
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{self.SEGMENT_PREFIX}{number:08d}{self.SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _encode(lsn: int, payload: str) -> bytes:
+        body = f"{lsn} {payload}".encode('utf-8')
+        crc = zlib.crc32(body)
+        return f"{lsn} {crc:08x} {payload}\n".encode('utf-8')
+
+    @staticmethod
+    def _decode(line: bytes) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """解析一行记录，不完整或校验失败时返回None"""
+        if not line.endswith(b'\n'):
+            return None
+        try:
+            lsn_text, crc_text, payload = line[:-1].decode('utf-8').split(' ', 2)
+            if zlib.crc32(f"{lsn_text} {payload}".encode('utf-8')) != int(crc_text, 16):
+                return None
+            return int(lsn_text), json.loads(payload)
+        except (ValueError, UnicodeDecodeError):
+            return None
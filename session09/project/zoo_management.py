@@ -17,17 +17,34 @@ Session09 项目: 动物园管理系统
 4. 游客管理
 5. 喂食和护理系统
 6. 事件通知系统
+7. 动物索引和喂食调度（大规模动物园的快速查询）
+8. 大规模模拟引擎（结构数组存储，多天快进）
 
 作者: Python教程团队
 创建日期: 2024-01-09
 """
 
 from abc import ABC, abstractmethod
+from array import array
+from collections import deque
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Set
+from typing import Iterable, Iterator, List, Dict, Optional, Set
 from enum import Enum
+import heapq
+import itertools
 import random
 import json
+import math
+import re
+import sys
+import threading
+import time
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
 # ============================================================================
 # 枚举定义
@@ -65,6 +82,13 @@ class HealthStatus(Enum):
     CRITICAL = "危急"
 
 
+class NotificationSeverity(Enum):
+    """通知严重程度枚举"""
+    INFO = 0
+    WARNING = 1
+    CRITICAL = 2
+
+
 class StaffRole(Enum):
     """员工角色枚举"""
     KEEPER = "饲养员"
@@ -87,10 +111,15 @@ class Observer(ABC):
 
 
 class EventPublisher:
-    """事件发布者"""
+    """事件发布者
     
-    def __init__(self):
+    默认在 notify() 中同步调用观察者；设置了 dispatcher 时把事件交给
+    EventDispatcher 的后台线程分发，notify() 立即返回。
+    """
+    
+    def __init__(self, dispatcher: Optional['EventDispatcher'] = None):
         self._observers: Dict[str, List[Observer]] = {}
+        self.dispatcher = dispatcher
     
     def subscribe(self, event_type: str, observer: Observer):
         """订阅事件"""
@@ -106,9 +135,157 @@ class EventPublisher:
     
     def notify(self, event_type: str, data: dict):
         """通知观察者"""
-        if event_type in self._observers:
-            for observer in self._observers[event_type]:
-                observer.update(event_type, data)
+        observers = self._observers.get(event_type)
+        if not observers:
+            return
+        if self.dispatcher is not None:
+            self.dispatcher.submit(self, event_type, data, list(observers))
+            return
+        for observer in observers:
+            observer.update(event_type, data)
+
+
+class EventDispatcher:
+    """异步事件分发器 - 后台线程把事件交给观察者
+    
+    多个 EventPublisher 可以共用一个分发器（例如整个动物园共用一个线程）。
+    
+    合并：coalesce 中的事件类型，如果同一发布者、同一动物的事件还在队列里没有分发，
+    新事件会合并进去：以 old_ 开头的字段保留最早的值，其余字段取最新的值，
+    coalesced 字段记录合并的事件数。例如 优秀→良好→一般 只分发一次 优秀→一般。
+    
+    new_status 属于 urgent_statuses（较差、危急）的事件从不合并，之后的事件也不会
+    合并到它之前的事件里，因此 一般→危急→良好 仍会分发 一般→危急 和 危急→良好。
+    合并后状态没有变化（如 良好→一般→良好）的事件直接丢弃。
+    
+    队列中最多 max_pending 个事件，已满时 submit() 阻塞等待（背压）。
+    """
+    
+    def __init__(self, coalesce: Iterable[str] = ("health_changed",), max_pending: int = 10000,
+                 urgent_statuses: Iterable[str] = (HealthStatus.POOR.value, HealthStatus.CRITICAL.value)):
+        """
+        初始化并启动分发线程
+        
+        Args:
+            coalesce: 可以合并的事件类型
+            max_pending: 队列中最多等待分发的事件数
+            urgent_statuses: new_status 为这些值的事件不参与合并
+        """
+        self.coalesce_types = set(coalesce)
+        self.urgent_statuses = set(urgent_statuses)
+        self.max_pending = max_pending
+        
+        self._pending: Dict[int, tuple] = {}  # 事件序号 -> (观察者列表, 事件类型, 数据)，保持提交顺序
+        self._open: Dict[tuple, int] = {}  # 合并键 -> 仍可以合并新事件的待分发事件序号
+        self._keys = itertools.count()
+        self._in_flight = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        
+        # 统计信息
+        self.submitted = 0
+        self.coalesced = 0
+        self.dropped = 0  # 合并后状态没有变化而丢弃的事件
+        self.dispatched = 0
+        
+        self._thread = threading.Thread(target=self._run, name="zoo-event-dispatcher", daemon=True)
+        self._thread.start()
+    
+    @property
+    def pending(self) -> int:
+        """等待分发和正在分发的事件数"""
+        with self._cond:
+            return len(self._pending) + self._in_flight
+    
+    def submit(self, publisher: EventPublisher, event_type: str, data: dict, 
+               observers: List[Observer]):
+        """提交一个事件（由 EventPublisher.notify 调用）"""
+        merge_key = None
+        if event_type in self.coalesce_types:
+            merge_key = (id(publisher), event_type, data.get("animal_id"))
+        urgent = data.get("new_status") in self.urgent_statuses
+        
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("事件分发器已关闭")
+            self.submitted += 1
+            
+            if merge_key is not None:
+                if urgent:
+                    # 紧急事件单独分发，之后的事件也不能越过它合并到更早的事件里
+                    self._open.pop(merge_key, None)
+                elif merge_key in self._open:
+                    self._merge(self._open[merge_key], merge_key, observers, event_type, data)
+                    return
+            
+            while len(self._pending) >= self.max_pending and not self._closed:
+                self._cond.wait()
+            key = next(self._keys)
+            self._pending[key] = (observers, event_type, data)
+            if merge_key is not None and not urgent:
+                self._open[merge_key] = key
+            if len(self._pending) == 1:
+                self._cond.notify_all()  # 分发线程只在队列为空时等待
+    
+    def _merge(self, key: int, merge_key: tuple, observers: List[Observer], 
+               event_type: str, data: dict):
+        """把新事件合并进仍在队列中的事件（调用方已持有锁）"""
+        previous = self._pending[key][2]
+        merged = dict(data)
+        for field, value in previous.items():
+            if field.startswith("old_"):
+                merged[field] = value
+        merged["coalesced"] = previous.get("coalesced", 1) + 1
+        self.coalesced += 1
+        
+        changes = [(value, merged.get("new_" + field[4:])) 
+                   for field, value in merged.items() if field.startswith("old_")]
+        if changes and all(old == new for old, new in changes):
+            # 状态绕了一圈又回到原值，不必分发
+            del self._pending[key]
+            del self._open[merge_key]
+            self.dropped += 1
+            self._cond.notify_all()  # 腾出了队列位置
+            return
+        # 覆盖已有的键不改变它在字典中的位置，合并后的事件按最早一次的顺序分发
+        self._pending[key] = (observers, event_type, merged)
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """等待已提交的事件全部分发完，返回是否在超时前完成"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+    
+    def close(self):
+        """分发剩余事件后停止后台线程"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+    
+    def _run(self):
+        """后台分发线程：每次取走整个队列再逐个分发"""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, {}
+                self._open = {}
+                self._in_flight = len(batch)
+                self._cond.notify_all()  # 唤醒因队列已满而等待的提交者
+            
+            for observers, event_type, data in batch.values():
+                for observer in observers:
+                    try:
+                        observer.update(event_type, data)
+                    except Exception as e:
+                        print(f"⚠️ 事件处理失败: {event_type} - {e}")
+            
+            with self._cond:
+                self._in_flight = 0
+                self.dispatched += len(batch)
+                self._cond.notify_all()
 
 
 # ============================================================================
@@ -140,6 +317,9 @@ class Animal(ABC):
         
         # 事件发布者
         self._event_publisher = EventPublisher()
+        
+        # 所属动物园的索引（由 Zoo.add_animal 注册），健康状态和喂食时间变化时同步更新
+        self._indexes: List['AnimalIndex'] = []
     
     @property
     def health_status(self) -> HealthStatus:
@@ -153,6 +333,8 @@ class Animal(ABC):
         self._health_status = status
         
         if old_status != status:
+            for index in self._indexes:
+                index.health_changed(self, old_status)
             self._event_publisher.notify("health_changed", {
                 "animal_id": self.animal_id,
                 "animal_name": self.name,
@@ -185,6 +367,13 @@ class Animal(ABC):
         """是否需要喂食"""
         return self.days_since_last_fed >= self.get_feeding_interval()
     
+    @property
+    def next_feeding_time(self) -> datetime:
+        """下次需要喂食的时间（从未喂食时为 datetime.min，即现在就需要喂食）"""
+        if self._last_fed is None:
+            return datetime.min
+        return self._last_fed + timedelta(days=self.get_feeding_interval())
+    
     @abstractmethod
     def make_sound(self) -> str:
         """发出声音 - 抽象方法"""
@@ -206,6 +395,8 @@ class Animal(ABC):
             raise ValueError(f"{food_type} 不适合 {self.species}")
         
         self._last_fed = datetime.now()
+        for index in self._indexes:
+            index.feeding_changed(self)
         self._event_publisher.notify("animal_fed", {
             "animal_id": self.animal_id,
             "animal_name": self.name,
@@ -768,19 +959,73 @@ class Veterinarian(Staff):
 # ============================================================================
 
 class NotificationSystem(Observer):
-    """通知系统"""
+    """通知系统
     
-    def __init__(self):
-        self._notifications = []
+    通知保存在固定容量的环形缓冲区中，超过容量时覆盖最早的通知，内存占用有上限。
+    每条通知有递增的序号，序号为 seq 的通知位于 ring[seq % capacity]。
+    
+    - 时间分桶：记录每个时间桶（bucket_seconds 秒）第一条通知的序号，
+      查询最近 N 小时的通知时直接定位到起始序号
+    - 严重程度索引：每个严重程度一个序号队列，查询紧急通知不必扫描其他通知
+    """
+    
+    # 健康状态变为这些状态时的严重程度
+    HEALTH_SEVERITY = {
+        HealthStatus.POOR.value: NotificationSeverity.WARNING,
+        HealthStatus.CRITICAL.value: NotificationSeverity.CRITICAL,
+    }
+    
+    def __init__(self, capacity: int = 10000, bucket_seconds: int = 60):
+        """
+        初始化通知系统
+        
+        Args:
+            capacity: 最多保留的通知数量
+            bucket_seconds: 时间桶的长度（秒）
+        """
+        if capacity <= 0:
+            raise ValueError("通知容量必须大于0")
+        
+        self.capacity = capacity
+        self.bucket_seconds = bucket_seconds
+        self._ring: List[Optional[dict]] = [None] * capacity
+        self._next_seq = 0
+        self._buckets = deque()  # (时间桶编号, 桶内第一条通知的序号)
+        self._by_severity: Dict[NotificationSeverity, deque] = {
+            severity: deque() for severity in NotificationSeverity
+        }
+        self._lock = threading.Lock()  # 异步分发时 update 在分发线程中调用
+    
+    def __len__(self) -> int:
+        """当前保留的通知数量"""
+        return self._next_seq - self._oldest_seq
+    
+    @property
+    def _oldest_seq(self) -> int:
+        """仍在缓冲区中的最早序号"""
+        return max(0, self._next_seq - self.capacity)
     
     def update(self, event_type: str, data: dict):
         """接收事件通知"""
+        timestamp = datetime.now()
+        severity = self._classify(event_type, data)
         notification = {
-            "timestamp": datetime.now(),
+            "timestamp": timestamp,
             "event_type": event_type,
+            "severity": severity,
             "data": data
         }
-        self._notifications.append(notification)
+        
+        with self._lock:
+            seq = self._next_seq
+            self._ring[seq % self.capacity] = notification
+            self._next_seq += 1
+            
+            bucket = int(timestamp.timestamp()) // self.bucket_seconds
+            if not self._buckets or self._buckets[-1][0] != bucket:
+                self._buckets.append((bucket, seq))
+            self._by_severity[severity].append(seq)
+            self._evict()
         
         # 打印重要通知
         if event_type == "health_changed":
@@ -790,16 +1035,192 @@ class NotificationSystem(Observer):
             print(f"🍽️ {data['animal_name']} 已进食 {data['food_type']}")
     
     def get_recent_notifications(self, hours: int = 24) -> List[dict]:
-        """获取最近的通知"""
+        """获取最近的通知（按时间先后）"""
         cutoff_time = datetime.now() - timedelta(hours=hours)
-        return [n for n in self._notifications if n["timestamp"] >= cutoff_time]
+        cutoff_bucket = int(cutoff_time.timestamp()) // self.bucket_seconds
+        
+        with self._lock:
+            oldest = self._oldest_seq
+            # 从最新的桶往前找到第一个可能包含截止时间之后通知的桶
+            start = self._next_seq
+            for bucket, first_seq in reversed(self._buckets):
+                start = first_seq
+                if bucket <= cutoff_bucket:
+                    break
+            
+            result = []
+            for seq in range(max(start, oldest), self._next_seq):
+                notification = self._ring[seq % self.capacity]
+                # 只有截止时间所在的桶需要逐条比较
+                if result or notification["timestamp"] >= cutoff_time:
+                    result.append(notification)
+            return result
+    
+    def get_notifications_by_severity(self, min_severity: NotificationSeverity) -> List[dict]:
+        """获取不低于指定严重程度的通知（按时间先后）"""
+        with self._lock:
+            streams = [self._by_severity[severity] for severity in NotificationSeverity
+                       if severity.value >= min_severity.value]
+            return [self._ring[seq % self.capacity] for seq in heapq.merge(*streams)]
     
     def get_critical_notifications(self) -> List[dict]:
-        """获取紧急通知"""
-        critical_events = ["health_changed"]
-        return [n for n in self._notifications 
-                if n["event_type"] in critical_events 
-                and n["data"].get("new_status") in ["较差", "危急"]]
+        """获取紧急通知（健康状态变为较差或危急）"""
+        return self.get_notifications_by_severity(NotificationSeverity.WARNING)
+    
+    def _classify(self, event_type: str, data: dict) -> NotificationSeverity:
+        """判断通知的严重程度"""
+        if event_type == "health_changed":
+            return self.HEALTH_SEVERITY.get(data.get("new_status"), NotificationSeverity.INFO)
+        return NotificationSeverity.INFO
+    
+    def _evict(self):
+        """清理已被覆盖的通知在时间桶和严重程度索引中的条目（调用方持有锁）"""
+        oldest = self._oldest_seq
+        if not oldest:
+            return
+        # 下一个桶的起始序号已被覆盖，说明整个桶都被覆盖了
+        while len(self._buckets) > 1 and self._buckets[1][1] <= oldest:
+            self._buckets.popleft()
+        for seqs in self._by_severity.values():
+            while seqs and seqs[0] < oldest:
+                seqs.popleft()
+
+
+# ============================================================================
+# 动物索引与喂食调度
+# ============================================================================
+
+class FeedingScheduler:
+    """喂食调度器 - 按下次喂食时间排列的优先队列
+    
+    堆中的条目为 (下次喂食时间, 序号, 动物ID)。动物被喂食后压入新条目，
+    旧条目不立即删除，而是在到达堆顶时丢弃（延迟删除）。
+    """
+    
+    def __init__(self):
+        self._heap: List[tuple] = []
+        self._entries: Dict[str, tuple] = {}  # 动物ID -> 当前有效的条目
+        self._counter = itertools.count()  # 同一时间的条目按加入顺序排列
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def schedule(self, animal: Animal):
+        """按动物当前的下次喂食时间（重新）排期"""
+        entry = (animal.next_feeding_time, next(self._counter), animal.animal_id)
+        self._entries[animal.animal_id] = entry
+        heapq.heappush(self._heap, entry)
+        
+        # 过期条目太多时重建堆，避免频繁喂食让堆无限增长
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = list(self._entries.values())
+            heapq.heapify(self._heap)
+    
+    def cancel(self, animal_id: str):
+        """取消动物的排期（动物移出动物园时）"""
+        self._entries.pop(animal_id, None)
+    
+    def due(self, now: Optional[datetime] = None) -> List[str]:
+        """获取到期需要喂食的动物ID，最早到期的在前
+        
+        堆中不晚于 now 的条目构成从堆顶开始的一棵子树，只遍历这棵子树而不弹出条目，
+        复杂度为 O(k log k)，k 为到期数量（含尚未清理的过期条目）。
+        """
+        due_entries = self._due_entries(now or datetime.now())
+        due_entries.sort()
+        return [entry[2] for entry in due_entries]
+    
+    def due_count(self, now: Optional[datetime] = None) -> int:
+        """到期需要喂食的动物数量（不排序，O(k)）"""
+        return len(self._due_entries(now or datetime.now()))
+    
+    def _due_entries(self, now: datetime) -> List[tuple]:
+        """遍历堆顶子树，收集不晚于 now 的有效条目"""
+        heap = self._heap
+        due_entries = []
+        stack = [0] if heap and heap[0][0] <= now else []
+        while stack:
+            position = stack.pop()
+            entry = heap[position]
+            if self._entries.get(entry[2]) is entry:
+                due_entries.append(entry)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(heap) and heap[child][0] <= now:
+                    stack.append(child)
+        return due_entries
+    
+    def next_due(self) -> Optional[tuple]:
+        """最早需要喂食的 (时间, 动物ID)，没有动物时返回None"""
+        while self._heap:
+            entry = self._heap[0]
+            if self._entries.get(entry[2]) is entry:
+                return entry[0], entry[2]
+            heapq.heappop(self._heap)
+        return None
+
+
+class AnimalIndex:
+    """动物索引 - 按健康状态和类型分组，并维护喂食调度
+    
+    由 Zoo 持有，动物的 health_status 设置器和 feed() 会同步通知索引，
+    查询只需访问结果本身，不再扫描所有动物。
+    """
+    
+    def __init__(self):
+        self._by_health: Dict[HealthStatus, Dict[str, Animal]] = {status: {} for status in HealthStatus}
+        self._by_type: Dict[AnimalType, Dict[str, Animal]] = {animal_type: {} for animal_type in AnimalType}
+        self._animals: Dict[str, Animal] = {}
+        self.feeding = FeedingScheduler()
+    
+    def __len__(self) -> int:
+        return len(self._animals)
+    
+    def add(self, animal: Animal):
+        """把动物加入索引"""
+        self._animals[animal.animal_id] = animal
+        self._by_health[animal.health_status][animal.animal_id] = animal
+        self._by_type[animal.animal_type][animal.animal_id] = animal
+        self.feeding.schedule(animal)
+        animal._indexes.append(self)
+    
+    def remove(self, animal: Animal):
+        """把动物移出索引"""
+        if self._animals.pop(animal.animal_id, None) is None:
+            return
+        self._by_health[animal.health_status].pop(animal.animal_id, None)
+        self._by_type[animal.animal_type].pop(animal.animal_id, None)
+        self.feeding.cancel(animal.animal_id)
+        if self in animal._indexes:
+            animal._indexes.remove(self)
+    
+    def health_changed(self, animal: Animal, old_status: HealthStatus):
+        """健康状态变化（由 Animal.health_status 设置器调用）"""
+        self._by_health[old_status].pop(animal.animal_id, None)
+        self._by_health[animal.health_status][animal.animal_id] = animal
+    
+    def feeding_changed(self, animal: Animal):
+        """动物被喂食（由 Animal.feed 调用）"""
+        self.feeding.schedule(animal)
+    
+    def by_health(self, status: HealthStatus) -> List[Animal]:
+        """指定健康状态的动物（按进入该状态的先后顺序）"""
+        return list(self._by_health[status].values())
+    
+    def by_type(self, animal_type: AnimalType) -> List[Animal]:
+        """指定类型的动物"""
+        return list(self._by_type[animal_type].values())
+    
+    def health_counts(self) -> Dict[HealthStatus, int]:
+        """各健康状态的动物数量"""
+        return {status: len(animals) for status, animals in self._by_health.items()}
+    
+    def type_counts(self) -> Dict[AnimalType, int]:
+        """各类型的动物数量"""
+        return {animal_type: len(animals) for animal_type, animals in self._by_type.items()}
+    
+    def needing_feeding(self, now: Optional[datetime] = None) -> List[Animal]:
+        """需要喂食的动物，最早到期的在前"""
+        return [self._animals[animal_id] for animal_id in self.feeding.due(now)]
 
 
 # ============================================================================
@@ -809,7 +1230,17 @@ class NotificationSystem(Observer):
 class Zoo:
     """动物园管理系统"""
     
-    def __init__(self, name: str, location: str):
+    def __init__(self, name: str, location: str, async_events: bool = False,
+                 notification_capacity: int = 10000):
+        """
+        初始化动物园
+        
+        Args:
+            name: 名称
+            location: 位置
+            async_events: 是否在后台线程分发动物事件（健康状态变化等设置器不再等待观察者）
+            notification_capacity: 通知系统最多保留的通知数量
+        """
         self.name = name
         self.location = location
         self.established_date = datetime.now()
@@ -819,8 +1250,12 @@ class Zoo:
         self._habitats: Dict[str, Habitat] = {}
         self._staff: Dict[str, Staff] = {}
         
+        # 健康状态、类型索引和喂食调度
+        self._index = AnimalIndex()
+        
         # 通知系统
-        self._notification_system = NotificationSystem()
+        self._notification_system = NotificationSystem(notification_capacity)
+        self._event_dispatcher = EventDispatcher() if async_events else None
         
         # 统计信息
         self._visitor_count = 0
@@ -831,6 +1266,9 @@ class Zoo:
         """添加动物"""
         if animal.animal_id not in self._animals:
             self._animals[animal.animal_id] = animal
+            self._index.add(animal)
+            if self._event_dispatcher is not None:
+                animal._event_publisher.dispatcher = self._event_dispatcher
             # 订阅动物事件
             animal.subscribe_to_events("health_changed", self._notification_system)
             animal.subscribe_to_events("animal_fed", self._notification_system)
@@ -844,6 +1282,8 @@ class Zoo:
             # 从栖息地移除
             for habitat in self._habitats.values():
                 habitat.remove_animal(animal)
+            self._index.remove(animal)
+            animal._event_publisher.dispatcher = None
             del self._animals[animal_id]
             return True
         return False
@@ -858,17 +1298,35 @@ class Zoo:
     
     def get_animals_by_type(self, animal_type: AnimalType) -> List[Animal]:
         """按类型获取动物"""
-        return [animal for animal in self._animals.values() 
-                if animal.animal_type == animal_type]
+        return self._index.by_type(animal_type)
+    
+    def get_animals_needing_feeding(self, now: Optional[datetime] = None) -> List[Animal]:
+        """获取需要喂食的动物（最早到期的在前）"""
+        return self._index.needing_feeding(now)
     
-    def get_animals_needing_feeding(self) -> List[Animal]:
-        """获取需要喂食的动物"""
-        return [animal for animal in self._animals.values() if animal.needs_feeding]
+    def get_next_feeding(self) -> Optional[tuple]:
+        """获取下一个需要喂食的 (时间, 动物)，没有动物时返回None"""
+        next_due = self._index.feeding.next_due()
+        if next_due is None:
+            return None
+        feeding_time, animal_id = next_due
+        return feeding_time, self._animals[animal_id]
     
     def get_animals_by_health_status(self, status: HealthStatus) -> List[Animal]:
         """按健康状态获取动物"""
-        return [animal for animal in self._animals.values() 
-                if animal.health_status == status]
+        return self._index.by_health(status)
+    
+    # 事件管理
+    def flush_events(self, timeout: Optional[float] = None) -> bool:
+        """等待异步分发的事件全部处理完（同步分发时直接返回True）"""
+        if self._event_dispatcher is None:
+            return True
+        return self._event_dispatcher.flush(timeout)
+    
+    def close(self):
+        """停止事件分发线程"""
+        if self._event_dispatcher is not None:
+            self._event_dispatcher.close()
     
     # 栖息地管理
     def add_habitat(self, habitat: Habitat) -> bool:
@@ -948,16 +1406,15 @@ class Zoo:
     
     def generate_daily_report(self) -> dict:
         """生成每日报告"""
+        self.flush_events()
         total_animals = len(self._animals)
         total_habitats = len(self._habitats)
         total_staff = len(self._staff)
         
-        animals_by_health = {}
-        for status in HealthStatus:
-            count = len(self.get_animals_by_health_status(status))
-            animals_by_health[status.value] = count
+        animals_by_health = {status.value: count 
+                             for status, count in self._index.health_counts().items()}
         
-        animals_needing_feeding = len(self.get_animals_needing_feeding())
+        animals_needing_feeding = self._index.feeding.due_count()
         
         habitat_occupancy = []
         for habitat in self._habitats.values():
@@ -982,10 +1439,8 @@ class Zoo:
     
     def get_zoo_statistics(self) -> dict:
         """获取动物园统计信息"""
-        animals_by_type = {}
-        for animal_type in AnimalType:
-            count = len(self.get_animals_by_type(animal_type))
-            animals_by_type[animal_type.value] = count
+        animals_by_type = {animal_type.value: count 
+                           for animal_type, count in self._index.type_counts().items()}
         
         staff_by_role = {}
         for role in StaffRole:
@@ -1008,10 +1463,611 @@ class Zoo:
             "员工分布": staff_by_role
         }
     
+    def simulate(self, days: int, seed: Optional[int] = None, **options) -> dict:
+        """
+        用模拟引擎快进多天并把结果写回动物、栖息地
+        
+        Args:
+            days: 天数
+            seed: 随机数种子
+            **options: 传给 SimulationEngine.fast_forward 的其他参数
+        
+        Returns:
+            dict: 模拟报告
+        """
+        engine = SimulationEngine.from_zoo(self, seed)
+        report = engine.fast_forward(days, **options)
+        engine.write_back()
+        return report
+    
     def __str__(self):
         return f"{self.name} 动物园 (位于 {self.location})"
 
 
+# ============================================================================
+# 大规模模拟引擎
+# ============================================================================
+
+# 健康状态编码：按 HealthStatus 的定义顺序，0=优秀 ... 4=危急
+HEALTH_CODES = list(HealthStatus)
+
+
+def _species_profile(animal_cls) -> tuple:
+    """物种的 (喂食间隔, 适宜温度下限, 适宜温度上限)
+    
+    这些值只取决于物种，不需要构造实例。温度要求无法解析时视为任何温度都适宜。
+    """
+    prototype = animal_cls.__new__(animal_cls)
+    interval = prototype.get_feeding_interval()
+    temperature = prototype.get_habitat_requirements().get("温度", "")
+    match = re.match(r"\s*(-?\d+(?:\.\d+)?)\s*-\s*(-?\d+(?:\.\d+)?)", temperature)
+    if match is None:
+        return interval, -math.inf, math.inf
+    return interval, float(match.group(1)), float(match.group(2))
+
+
+class AnimalView:
+    """模拟引擎中一只动物的只读视图（不复制数据，只保存引擎和下标）"""
+    
+    __slots__ = ("_engine", "_index")
+    
+    def __init__(self, engine: 'SimulationEngine', index: int):
+        self._engine = engine
+        self._index = index
+    
+    @property
+    def animal_id(self) -> str:
+        return self._engine.animal_id(self._index)
+    
+    @property
+    def species(self) -> str:
+        return self._engine.species_name(self._index)
+    
+    @property
+    def weight(self) -> float:
+        return float(self._engine.weights[self._index])
+    
+    @property
+    def health_status(self) -> HealthStatus:
+        return HEALTH_CODES[int(self._engine.health[self._index])]
+    
+    @property
+    def days_since_last_fed(self) -> int:
+        return self._engine.day - int(self._engine.last_fed[self._index])
+    
+    @property
+    def needs_feeding(self) -> bool:
+        engine = self._engine
+        return self.days_since_last_fed >= int(engine.feeding_intervals[self._index])
+    
+    @property
+    def habitat(self) -> Optional['HabitatView']:
+        index = int(self._engine.habitats[self._index])
+        return None if index == self._engine.habitat_count else HabitatView(self._engine, index)
+    
+    def __repr__(self):
+        return f"AnimalView(id='{self.animal_id}', species='{self.species}', health='{self.health_status.value}')"
+
+
+class HabitatView:
+    """模拟引擎中一个栖息地的只读视图"""
+    
+    __slots__ = ("_engine", "_index")
+    
+    def __init__(self, engine: 'SimulationEngine', index: int):
+        self._engine = engine
+        self._index = index
+    
+    @property
+    def habitat_id(self) -> str:
+        return self._engine.habitat_id(self._index)
+    
+    @property
+    def cleanliness(self) -> float:
+        return float(self._engine.cleanliness[self._index])
+    
+    @property
+    def temperature(self) -> float:
+        return float(self._engine.temperature[self._index])
+    
+    def __repr__(self):
+        return f"HabitatView(id='{self.habitat_id}', cleanliness={self.cleanliness:.1f})"
+
+
+class SimulationEngine:
+    """大规模模拟引擎
+    
+    动物和栖息地的核心状态按列存放（结构数组），每一列是一个数组，第 i 个元素属于第 i 只动物：
+    体重、最后喂食日、健康状态编码、物种编码、所在栖息地；栖息地有清洁度和温度两列。
+    一只动物只占几十个字节，需要逐个访问时使用 AnimalView / HabitatView。
+    
+    fast_forward() 一次推进多天，每天对整列做向量化更新（安装了 NumPy 时），
+    结束后只产生最终结果对应的事件：健康状态的净变化和仍需清洁的栖息地。
+    
+    每天的模型：
+    1. 栖息地清洁度按 Habitat.daily_degradation 的规则下降
+    2. 到喂食间隔的动物被喂食；超过间隔仍未进食的动物体重下降，其余动物体重逐渐恢复
+    3. 健康状态随机变化：饥饿、栖息地脏（清洁度低于30）和温度不适宜都会提高恶化概率，
+       较差和危急的动物接受治疗后有更高的好转概率
+    4. 清洁度低于 clean_threshold 的栖息地被清洁
+    """
+    
+    NEVER_FED = -999  # 与 Animal.days_since_last_fed 的"从未喂食"一致
+    BASE_RISK = 0.002  # 每天恶化一级的基础概率
+    HUNGRY_FACTOR = 5.0
+    DIRTY_FACTOR = 3.0
+    STRESS_FACTOR = 3.0
+    DIRTY_THRESHOLD = 30.0
+    RECOVERY = (0.0, 0.01, 0.01, 0.05, 0.05)  # 各健康状态每天好转一级的概率
+    WEIGHT_LOSS = 0.005  # 饥饿时每天体重下降比例
+    WEIGHT_GAIN = 0.001  # 体重低于初始体重时每天恢复比例
+    # generate() 使用的物种及其平均体重（kg，与各动物类构造时的随机范围中点一致）
+    GENERATED_SPECIES = ((Lion, 155.0), (Elephant, 3250.0), (Eagle, 4.5), (Penguin, 17.5), (Snake, 6.0))
+    
+    def __init__(self, species_classes: List[type], seed: Optional[int] = None):
+        """
+        初始化空的模拟引擎（通常使用 from_zoo() 或 generate() 创建）
+        
+        Args:
+            species_classes: 物种编码对应的动物类
+            seed: 随机数种子
+        """
+        self.species_classes = list(species_classes)
+        profiles = [_species_profile(cls) for cls in self.species_classes]
+        self._species_names = [cls.__name__ for cls in self.species_classes]
+        self._interval_table = [profile[0] for profile in profiles]
+        self._comfort_low = [profile[1] for profile in profiles]
+        self._comfort_high = [profile[2] for profile in profiles]
+        
+        self.day = 0
+        self._rng = np.random.default_rng(seed) if HAS_NUMPY else random.Random(seed)
+        
+        # 动物列
+        self.species = self._column('b', 0)
+        # 体重使用双精度，写回 Animal 对象时不引入舍入误差
+        self.weights = self._column('d', 0)
+        self.ideal_weights = self._column('d', 0)
+        self.last_fed = self._column('i', 0)
+        self.feeding_intervals = self._column('h', 0)
+        self.health = self._column('b', 0)
+        self.habitats = self._column('i', 0)
+        # 栖息地列（最后一个是虚拟的"未分配栖息地"，不会变脏，温度为NaN即总是适宜）
+        self.cleanliness = self._column('f', 1, 100.0)
+        self.temperature = self._column('f', 1, math.nan)
+        
+        self._animal_ids: Optional[List[str]] = None
+        self._habitat_ids: Optional[List[str]] = None
+        self._animal_objects: Optional[List[Animal]] = None
+        self._habitat_objects: Optional[List[Habitat]] = None
+        self._changes: tuple = ((), ())
+        self._dirty_habitats: List[int] = []
+    
+    # 创建
+    @classmethod
+    def from_zoo(cls, zoo: 'Zoo', seed: Optional[int] = None) -> 'SimulationEngine':
+        """从动物园的 Animal / Habitat 对象创建引擎，模拟后可用 write_back() 写回"""
+        animals = zoo.get_all_animals()
+        habitats = zoo.get_all_habitats()
+        species_classes = list(dict.fromkeys(type(animal) for animal in animals))
+        species_codes = {animal_cls: code for code, animal_cls in enumerate(species_classes)}
+        
+        habitat_of = {}
+        for index, habitat in enumerate(habitats):
+            for animal in habitat.get_animals():
+                habitat_of[id(animal)] = index
+        
+        engine = cls(species_classes, seed)
+        engine._load(
+            species=[species_codes[type(animal)] for animal in animals],
+            weights=[animal.weight for animal in animals],
+            last_fed=[-min(animal.days_since_last_fed, -cls.NEVER_FED) for animal in animals],
+            health=[HEALTH_CODES.index(animal.health_status) for animal in animals],
+            habitats=[habitat_of.get(id(animal), len(habitats)) for animal in animals],
+            cleanliness=[habitat.cleanliness for habitat in habitats],
+            temperature=[habitat.temperature for habitat in habitats]
+        )
+        engine._animal_ids = [animal.animal_id for animal in animals]
+        engine._habitat_ids = [habitat.habitat_id for habitat in habitats]
+        engine._animal_objects = animals
+        engine._habitat_objects = habitats
+        return engine
+    
+    @classmethod
+    def generate(cls, animal_count: int, habitat_count: Optional[int] = None, 
+                 seed: Optional[int] = None) -> 'SimulationEngine':
+        """
+        随机生成一个大型动物园（不创建 Animal 对象）
+        
+        Args:
+            animal_count: 动物数量
+            habitat_count: 栖息地数量，默认平均每个栖息地8只动物
+            seed: 随机数种子
+        """
+        species_classes = [species_cls for species_cls, _ in cls.GENERATED_SPECIES]
+        mean_weights = [weight for _, weight in cls.GENERATED_SPECIES]
+        habitat_count = habitat_count or max(1, animal_count // 8)
+        generator = random.Random(seed)
+        
+        engine = cls(species_classes, seed)
+        if HAS_NUMPY:
+            rng = np.random.default_rng(seed)
+            species = rng.integers(0, len(species_classes), animal_count, dtype=np.int8)
+            base_weights = np.array(mean_weights)
+            intervals = np.array(engine._interval_table, dtype=np.int32)
+            health_weights = np.array([0.4, 0.3, 0.2, 0.08, 0.02])  # 与 medical_checkup 的分布一致
+            engine._load(
+                species=species,
+                weights=base_weights[species] * rng.uniform(0.85, 1.15, animal_count),
+                last_fed=-rng.integers(0, intervals[species] + 1),
+                health=rng.choice(len(HEALTH_CODES), animal_count, p=health_weights).astype(np.int8),
+                habitats=rng.integers(0, habitat_count, animal_count, dtype=np.int32),
+                cleanliness=rng.uniform(60.0, 100.0, habitat_count),
+                temperature=rng.uniform(-5.0, 35.0, habitat_count)
+            )
+        else:
+            species = [generator.randrange(len(species_classes)) for _ in range(animal_count)]
+            engine._load(
+                species=species,
+                weights=[mean_weights[code] * generator.uniform(0.85, 1.15) for code in species],
+                last_fed=[-generator.randint(0, engine._interval_table[code]) for code in species],
+                health=generator.choices(range(len(HEALTH_CODES)), [0.4, 0.3, 0.2, 0.08, 0.02], k=animal_count),
+                habitats=[generator.randrange(habitat_count) for _ in range(animal_count)],
+                cleanliness=[generator.uniform(60.0, 100.0) for _ in range(habitat_count)],
+                temperature=[generator.uniform(-5.0, 35.0) for _ in range(habitat_count)]
+            )
+        return engine
+    
+    # 访问
+    @property
+    def animal_count(self) -> int:
+        return len(self.weights)
+    
+    @property
+    def habitat_count(self) -> int:
+        return len(self.cleanliness) - 1
+    
+    def animal_id(self, index: int) -> str:
+        """第 index 只动物的ID（生成的动物园没有ID时按下标命名）"""
+        return self._animal_ids[index] if self._animal_ids is not None else f"SIM{index:07d}"
+    
+    def habitat_id(self, index: int) -> str:
+        """第 index 个栖息地的ID"""
+        return self._habitat_ids[index] if self._habitat_ids is not None else f"SIMH{index:06d}"
+    
+    def species_name(self, index: int) -> str:
+        """第 index 只动物的物种类名"""
+        return self._species_names[int(self.species[index])]
+    
+    def animal(self, index: int) -> AnimalView:
+        """第 index 只动物的视图"""
+        return AnimalView(self, index)
+    
+    def animals(self) -> Iterator[AnimalView]:
+        """遍历所有动物的视图"""
+        for index in range(self.animal_count):
+            yield AnimalView(self, index)
+    
+    def habitat(self, index: int) -> HabitatView:
+        """第 index 个栖息地的视图"""
+        return HabitatView(self, index)
+    
+    def health_counts(self) -> Dict[str, int]:
+        """各健康状态的动物数量"""
+        if HAS_NUMPY:
+            counts = np.bincount(self.health, minlength=len(HEALTH_CODES))
+        else:
+            counts = [0] * len(HEALTH_CODES)
+            for code in self.health:
+                counts[code] += 1
+        return {status.value: int(counts[code]) for code, status in enumerate(HEALTH_CODES)}
+    
+    def memory_usage(self) -> int:
+        """状态列占用的字节数"""
+        columns = (self.species, self.weights, self.ideal_weights, self.last_fed, self.feeding_intervals,
+                   self.health, self.habitats, self.cleanliness, self.temperature)
+        if HAS_NUMPY:
+            return sum(column.nbytes for column in columns)
+        return sum(column.itemsize * len(column) for column in columns)
+    
+    # 模拟
+    def fast_forward(self, days: int, auto_feed: bool = True, clean_threshold: Optional[float] = 50.0,
+                     publisher: Optional[EventPublisher] = None) -> dict:
+        """
+        推进多天
+        
+        Args:
+            days: 天数
+            auto_feed: 是否每天按喂食间隔自动喂食
+            clean_threshold: 清洁度低于该值的栖息地当天被清洁，None 表示不清洁
+            publisher: 提供时把结果事件通过它发布（见 iter_events()）
+        
+        Returns:
+            dict: 模拟报告
+        """
+        started = time.perf_counter()
+        start_day = self.day
+        initial_health = self.health.copy() if HAS_NUMPY else array('b', self.health)
+        
+        if HAS_NUMPY:
+            stats = self._run_vectorized(days, auto_feed, clean_threshold)
+        else:
+            stats = self._run_python(days, auto_feed, clean_threshold)
+        
+        # 只保留最终结果：健康状态的净变化，以及结束时仍需清洁的栖息地
+        if HAS_NUMPY:
+            changed = np.flatnonzero(self.health != initial_health)
+            self._changes = (changed, initial_health[changed])
+            self._dirty_habitats = np.flatnonzero(self.cleanliness[:-1] < 50.0).tolist()
+        else:
+            changed = [i for i in range(self.animal_count) if self.health[i] != initial_health[i]]
+            self._changes = (changed, [initial_health[i] for i in changed])
+            self._dirty_habitats = [h for h in range(self.habitat_count) if self.cleanliness[h] < 50.0]
+        
+        event_count = len(changed) + len(self._dirty_habitats)
+        if publisher is not None:
+            for event_type, data in self.iter_events():
+                publisher.notify(event_type, data)
+        
+        return {
+            "start_day": start_day,
+            "end_day": self.day,
+            "days": days,
+            "animals": self.animal_count,
+            "habitats": self.habitat_count,
+            "feedings": stats["feedings"],
+            "cleanings": stats["cleanings"],
+            "critical_episodes": stats["critical_episodes"],
+            "health_changes": len(changed),
+            "habitats_need_cleaning": len(self._dirty_habitats),
+            "events": event_count,
+            "health_counts": self.health_counts(),
+            "vectorized": HAS_NUMPY,
+            "elapsed": time.perf_counter() - started
+        }
+    
+    def iter_events(self) -> Iterator[tuple]:
+        """最近一次 fast_forward() 的结果事件，格式与 Animal 发布的事件一致
+        
+        Yields:
+            tuple: (事件类型, 数据)
+        """
+        timestamp = datetime.now()
+        changed, old_codes = self._changes
+        for index, old_code in zip(changed, old_codes):
+            index = int(index)
+            name = self._animal_objects[index].name if self._animal_objects is not None else self.animal_id(index)
+            yield "health_changed", {
+                "animal_id": self.animal_id(index),
+                "animal_name": name,
+                "old_status": HEALTH_CODES[int(old_code)].value,
+                "new_status": HEALTH_CODES[int(self.health[index])].value,
+                "timestamp": timestamp,
+                "simulated_day": self.day
+            }
+        for index in self._dirty_habitats:
+            yield "habitat_needs_cleaning", {
+                "habitat_id": self.habitat_id(index),
+                "cleanliness": float(self.cleanliness[index]),
+                "timestamp": timestamp,
+                "simulated_day": self.day
+            }
+    
+    def write_back(self):
+        """把模拟结果写回 from_zoo() 的 Animal / Habitat 对象
+        
+        健康状态通过 health_status 设置器写回，会更新动物园索引并发布 health_changed 事件；
+        模拟的最后一天对应当前时间。
+        
+        Raises:
+            ValueError: 引擎不是由 from_zoo() 创建时
+        """
+        if self._animal_objects is None:
+            raise ValueError("只有 from_zoo() 创建的引擎可以写回")
+        
+        now = datetime.now()
+        for index, animal in enumerate(self._animal_objects):
+            animal.weight = float(self.weights[index])
+            last_fed = int(self.last_fed[index])
+            if last_fed <= self.NEVER_FED:
+                animal._last_fed = None
+            else:
+                animal._last_fed = now - timedelta(days=self.day - last_fed)
+            for animal_index in animal._indexes:
+                animal_index.feeding_changed(animal)
+            animal.health_status = HEALTH_CODES[int(self.health[index])]
+        
+        for index, habitat in enumerate(self._habitat_objects):
+            habitat._cleanliness = float(self.cleanliness[index])
+    
+    def _run_vectorized(self, days: int, auto_feed: bool, clean_threshold: Optional[float]) -> dict:
+        """NumPy 实现
+        
+        - 自动喂食时，第一天之后不会再有饥饿的动物，喂食和体重恢复按周期直接算出最终结果
+        - 健康状态每天只处理抽到的少数候选动物：按最大可能概率用几何分布的间隔抽取候选，
+          候选的随机数在 [0, 最大概率) 上均匀分布，再按每只动物的实际概率判定
+        """
+        rng = self._rng
+        habitat_count = self.habitat_count
+        weights, ideal, last_fed, health, habitats = (
+            self.weights, self.ideal_weights, self.last_fed, self.health, self.habitats)
+        intervals = self.feeding_intervals
+        cleanliness = self.cleanliness
+        
+        # 模拟期间动物不换栖息地，入住数和温度是否适宜只需计算一次
+        decay = np.bincount(habitats, minlength=habitat_count + 1)[:habitat_count].astype(np.float32) * 5
+        animal_temperature = self.temperature[habitats]
+        stress = ((animal_temperature < np.array(self._comfort_low, dtype=np.float32)[self.species]) |
+                  (animal_temperature > np.array(self._comfort_high, dtype=np.float32)[self.species]))
+        any_stress = bool(stress.any())
+        recovery = np.array(self.RECOVERY, dtype=np.float32)
+        max_recovery = max(self.RECOVERY)
+        critical = len(HEALTH_CODES) - 1
+        reached_critical = health == critical
+        feedings = cleanings = 0
+        track_feeding = True
+        hungry, any_hungry = None, False
+        
+        for _ in range(days):
+            self.day += 1
+            day = self.day
+            
+            # 1. 栖息地退化
+            cleanliness[:habitat_count] -= decay
+            np.maximum(cleanliness, 0.0, out=cleanliness)
+            dirty = cleanliness < self.DIRTY_THRESHOLD
+            
+            # 2. 喂食和体重（自动喂食时只需逐日计算第一天）
+            if track_feeding:
+                since_fed = day - last_fed
+                hungry = since_fed > intervals
+                any_hungry = bool(hungry.any())
+                if auto_feed:
+                    due = since_fed >= intervals
+                    feedings += int(np.count_nonzero(due))
+                    last_fed[due] = day
+                    track_feeding = False
+                if any_hungry:
+                    weights[hungry] *= 1 - self.WEIGHT_LOSS
+                recovering = weights < ideal
+                if any_hungry:
+                    recovering &= ~hungry
+                if recovering.any():
+                    weights[recovering] = np.minimum(weights[recovering] * (1 + self.WEIGHT_GAIN), ideal[recovering])
+            elif any_hungry:
+                hungry, any_hungry = None, False
+            
+            # 3. 健康状态：先用最大可能概率抽出候选，再按每只动物的实际概率判定
+            bound = min(1.0, self.BASE_RISK * (self.HUNGRY_FACTOR if any_hungry else 1.0)
+                        * (self.DIRTY_FACTOR if dirty.any() else 1.0)
+                        * (self.STRESS_FACTOR if any_stress else 1.0) + max_recovery)
+            candidates = self._sample_candidates(len(health), bound)
+            if candidates.size:
+                draw = rng.random(candidates.size, dtype=np.float32) * np.float32(bound)
+                codes = health[candidates]
+                risk = np.full(candidates.size, self.BASE_RISK, dtype=np.float32)
+                if any_hungry:
+                    risk[hungry[candidates]] *= self.HUNGRY_FACTOR
+                risk[dirty[habitats[candidates]]] *= self.DIRTY_FACTOR
+                if any_stress:
+                    risk[stress[candidates]] *= self.STRESS_FACTOR
+                worse = (draw < risk) & (codes < critical)
+                better = (draw >= risk) & (draw < risk + recovery[codes])
+                codes = codes + worse.astype(np.int8) - better.astype(np.int8)
+                health[candidates] = codes
+                reached_critical[candidates[codes == critical]] = True
+            
+            # 4. 清洁
+            if clean_threshold is not None:
+                needs_cleaning = cleanliness[:habitat_count] < clean_threshold
+                cleanings += int(np.count_nonzero(needs_cleaning))
+                cleanliness[:habitat_count][needs_cleaning] = 100.0
+        
+        if auto_feed and days > 1:
+            # 第一天之后每只动物都按自己的间隔准时进食：直接算出之后的喂食次数和最后喂食日
+            remaining = self.day - last_fed
+            times = remaining // intervals
+            feedings += int(times.sum())
+            last_fed += (times * intervals).astype(np.int32)
+            # 不再饥饿，体重按天数连续恢复（不超过初始体重）
+            np.minimum(weights * (1 + self.WEIGHT_GAIN) ** (days - 1), ideal, out=weights)
+        
+        return {"feedings": feedings, "cleanings": cleanings,
+                "critical_episodes": int(np.count_nonzero(reached_critical))}
+    
+    def _sample_candidates(self, count: int, probability: float):
+        """以 probability 的概率独立抽取 [0, count) 中的下标（几何分布间隔，O(抽中数量)）"""
+        if probability >= 1.0:
+            return np.arange(count)
+        expected = count * probability
+        positions = np.cumsum(self._rng.geometric(probability, int(expected + 6 * math.sqrt(expected) + 16))) - 1
+        while positions.size and positions[-1] < count:
+            more = np.cumsum(self._rng.geometric(probability, int(expected // 10 + 16))) + positions[-1]
+            positions = np.concatenate((positions, more))
+        return positions[positions < count]
+    
+    def _run_python(self, days: int, auto_feed: bool, clean_threshold: Optional[float]) -> dict:
+        """纯 Python 实现（没有 NumPy 时使用），模型与向量化实现相同"""
+        rng = self._rng
+        habitat_count = self.habitat_count
+        decay = [0.0] * (habitat_count + 1)
+        for habitat in self.habitats:
+            decay[habitat] += 5
+        stress = [not (self._comfort_low[species] <= self.temperature[habitat] <= self._comfort_high[species])
+                  and not math.isnan(self.temperature[habitat])
+                  for species, habitat in zip(self.species, self.habitats)]
+        critical = len(HEALTH_CODES) - 1
+        reached_critical = {i for i, code in enumerate(self.health) if code == critical}
+        feedings = cleanings = 0
+        
+        for _ in range(days):
+            self.day += 1
+            day = self.day
+            
+            for h in range(habitat_count):
+                self.cleanliness[h] = max(0.0, self.cleanliness[h] - decay[h])
+            
+            for i in range(self.animal_count):
+                since_fed = day - self.last_fed[i]
+                hungry = since_fed > self.feeding_intervals[i]
+                if auto_feed and since_fed >= self.feeding_intervals[i]:
+                    self.last_fed[i] = day
+                    feedings += 1
+                if hungry:
+                    self.weights[i] *= 1 - self.WEIGHT_LOSS
+                elif self.weights[i] < self.ideal_weights[i]:
+                    self.weights[i] = min(self.weights[i] * (1 + self.WEIGHT_GAIN), self.ideal_weights[i])
+                
+                risk = self.BASE_RISK
+                if hungry:
+                    risk *= self.HUNGRY_FACTOR
+                if self.cleanliness[self.habitats[i]] < self.DIRTY_THRESHOLD:
+                    risk *= self.DIRTY_FACTOR
+                if stress[i]:
+                    risk *= self.STRESS_FACTOR
+                code = self.health[i]
+                draw = rng.random()
+                if draw < risk:
+                    if code < critical:
+                        self.health[i] = code + 1
+                        if code + 1 == critical:
+                            reached_critical.add(i)
+                elif draw < risk + self.RECOVERY[code]:
+                    self.health[i] = code - 1
+            
+            if clean_threshold is not None:
+                for h in range(habitat_count):
+                    if self.cleanliness[h] < clean_threshold:
+                        self.cleanliness[h] = 100.0
+                        cleanings += 1
+        
+        return {"feedings": feedings, "cleanings": cleanings, "critical_episodes": len(reached_critical)}
+    
+    def _load(self, species, weights, last_fed, health, habitats, cleanliness, temperature):
+        """填充各列（habitats 中等于栖息地数量的值表示未分配栖息地）"""
+        self.species = self._column('b', values=species)
+        self.weights = self._column('d', values=weights)
+        self.ideal_weights = self._column('d', values=weights)
+        self.last_fed = self._column('i', values=last_fed)
+        self.feeding_intervals = self._column('h', values=[self._interval_table[code] for code in species]
+                                              if not HAS_NUMPY else np.array(self._interval_table)[self.species])
+        self.health = self._column('b', values=health)
+        self.habitats = self._column('i', values=habitats)
+        self.cleanliness = self._column('f', values=list(cleanliness) + [100.0])
+        self.temperature = self._column('f', values=list(temperature) + [math.nan])
+    
+    @staticmethod
+    def _column(typecode: str, length: int = 0, fill: float = 0, values=None):
+        """创建一列：有 NumPy 时为 ndarray，否则为 array.array"""
+        if HAS_NUMPY:
+            dtype = {'b': np.int8, 'h': np.int16, 'i': np.int32, 'f': np.float32, 'd': np.float64}[typecode]
+            if values is not None:
+                return np.array(values, dtype=dtype)
+            return np.full(length, fill, dtype=dtype)
+        if values is not None:
+            return array(typecode, values)
+        return array(typecode, [fill] * length)
+
+
 # ============================================================================
 # 演示函数
 # ============================================================================
@@ -1235,6 +2291,32 @@ def demonstrate_event_system(zoo: Zoo):
             print(f"  [{timestamp}] {data['animal_name']} 健康状态: {data['new_status']}")
 
 
+def benchmark_simulation(animal_count: int = 1_000_000, days: int = 365, seed: int = 42) -> dict:
+    """测试模拟引擎快进的耗时
+    
+    Args:
+        animal_count: 动物数量
+        days: 快进天数
+        seed: 随机数种子
+    
+    Returns:
+        dict: 模拟报告
+    """
+    start = time.perf_counter()
+    engine = SimulationEngine.generate(animal_count, seed=seed)
+    created = time.perf_counter() - start
+    
+    report = engine.fast_forward(days)
+    print(f"[基准] {animal_count:,} 只动物、{engine.habitat_count:,} 个栖息地"
+          f"（生成 {created:.2f}秒，状态 {engine.memory_usage() / animal_count:.0f} 字节/只）")
+    print(f"[基准] 快进 {days} 天: {report['elapsed']:.2f}秒"
+          f"（{'NumPy向量化' if report['vectorized'] else '纯Python'}），"
+          f"喂食 {report['feedings']:,} 次，清洁 {report['cleanings']:,} 次，"
+          f"{report['health_changes']:,} 只动物健康状态变化，{report['critical_episodes']:,} 只曾陷入危急")
+    print(f"[基准] 健康状态分布: {report['health_counts']}")
+    return report
+
+
 def main():
     """主函数"""
     print("Session09 项目: 动物园管理系统")
@@ -1283,4 +2365,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_simulation()
+    else:
+        main()
\ No newline at end of file
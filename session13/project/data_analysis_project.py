@@ -23,7 +23,19 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
+import hashlib
+import operator
 import os
+import pickle
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+# 可选依赖：有 pyarrow 时用 Parquet 作为二进制列式缓存，否则退回 pickle
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
 
 # 设置
 warnings.filterwarnings('ignore')
@@ -47,11 +59,210 @@ class Config:
     
     # 随机种子
     RANDOM_SEED = 42
-    
+
+    # 向量化订单生成：每批处理的用户数（分块写盘时使用）
+    ORDER_CHUNK_USERS = 100000
+
+    # 内存外分析：每块读取的行数和并行进程数
+    ANALYSIS_CHUNK_ROWS = 500000
+    ANALYSIS_WORKERS = os.cpu_count() or 1
+
+    # 图表渲染：后台渲染进程数，散点图最多绘制的客户数
+    RENDER_WORKERS = min(4, os.cpu_count() or 1)
+    SCATTER_SAMPLE = 20000
+
     # 文件路径
     DATA_DIR = 'data'
     OUTPUT_DIR = 'output'
     PLOTS_DIR = 'plots'
+    CACHE_DIR = os.path.join(DATA_DIR, 'cache')
+
+
+# 数据表结构：显式指定列类型，字符串枚举列用 category，数值列用 int32/float32
+# 金额类列（价格、成本、单价、订单金额、小计等）保留 float64，
+# 以免累计误差，也避免 float32 在展示时出现 39.310001 这样的尾数
+DATA_SCHEMA = {
+    'users': {
+        'dtypes': {
+            '用户ID': 'int32',
+            '年龄': 'int32',
+            '性别': 'category',
+            '城市': 'category',
+            '会员等级': 'category',
+            '职业': 'category',
+            '月收入': 'int32'
+        },
+        'parse_dates': ['注册日期']
+    },
+    'products': {
+        'dtypes': {
+            '产品ID': 'int32',
+            '类别': 'category',
+            '子类别': 'category',
+            '价格': 'float64',
+            '成本': 'float64',
+            '库存': 'int32',
+            '品牌': 'category',
+            '评分': 'float32',
+            '评价数': 'int32'
+        },
+        'parse_dates': ['上架日期']
+    },
+    'orders': {
+        'dtypes': {
+            '订单ID': 'int32',
+            '用户ID': 'int32',
+            '订单金额': 'float64',
+            '实付金额': 'float64',
+            '折扣金额': 'float64',
+            '订单状态': 'category',
+            '支付方式': 'category',
+            '配送方式': 'category',
+            '配送地址': 'category'
+        },
+        'parse_dates': ['订单日期']
+    },
+    'order_details': {
+        'dtypes': {
+            '详情ID': 'int32',
+            '订单ID': 'int32',
+            '产品ID': 'int32',
+            '数量': 'int32',
+            '单价': 'float64',
+            '小计': 'float64'
+        },
+        'parse_dates': []
+    },
+    'reviews': {
+        'dtypes': {
+            '评价ID': 'int32',
+            '订单ID': 'int32',
+            '用户ID': 'int32',
+            '评分': 'int32',
+            '评价内容': 'category',
+            '情感倾向': 'category',
+            '是否匿名': 'bool'
+        },
+        'parse_dates': ['评价日期']
+    }
+}
+
+# 客户分层规则：按顺序匹配，第一条满足的规则决定分层
+# 每个条件是 (列名, 比较符, 阈值)，阈值写成 'q0.8' 表示该列的 80% 分位数
+CUSTOMER_SEGMENT_RULES = [
+    ('高价值客户', [('总消费', '>=', 'q0.8'), ('购买频次', '>=', 3)]),
+    ('中价值客户', [('总消费', '>=', 'q0.6')]),
+    ('活跃客户', [('购买频次', '>=', 2)]),
+    ('新客户', [('最近购买天数', '<=', 90)]),
+]
+
+
+class RFMSegmenter:
+    """
+    向量化RFM客户分层引擎
+
+    所有分位数阈值在分层前只计算一次，打分用 np.searchsorted，
+    分层用 np.select，整个过程没有逐行的 Python 调用，
+    千万级客户也只需几秒。
+    """
+
+    OPERATORS = {
+        '>=': operator.ge,
+        '>': operator.gt,
+        '<=': operator.le,
+        '<': operator.lt,
+        '==': operator.eq,
+    }
+
+    def __init__(self, rules=None, default='其他', n_bins=5):
+        """
+        Args:
+            rules: 分层规则列表 [(分层名, [(列名, 比较符, 阈值), ...]), ...]
+            default: 所有规则都不满足时的分层名
+            n_bins: RFM打分的分箱数，默认5（五分位）
+        """
+        self.rules = rules if rules is not None else CUSTOMER_SEGMENT_RULES
+        self.default = default
+        self.n_bins = n_bins
+
+    def score(self, values, reverse=False, by_rank=False):
+        """
+        按等频分箱给一列打分（1 到 n_bins），与 pd.qcut 的分箱结果一致
+
+        Args:
+            values: 要打分的数值序列
+            reverse: True 表示数值越小得分越高（如最近购买天数）
+            by_rank: True 表示先按出现顺序排名再分箱，可避免大量重复值导致分箱失败
+
+        Returns:
+            np.ndarray: int8 类型的得分数组
+        """
+        values = pd.Series(values)
+        if by_rank:
+            values = values.rank(method='first')
+        values = values.to_numpy(dtype='float64')
+
+        # 只算一次分位数阈值，再用二分查找定位每个值所在的箱
+        thresholds = np.quantile(values, np.linspace(0, 1, self.n_bins + 1)[1:-1])
+        scores = np.searchsorted(thresholds, values, side='left').astype('int8') + 1
+
+        if reverse:
+            scores = (self.n_bins + 1 - scores).astype('int8')
+        return scores
+
+    def score_rfm(self, recency, frequency, monetary):
+        """
+        计算 R/F/M 三项得分及综合得分
+
+        Args:
+            recency: 最近购买天数（越小越好）
+            frequency: 购买频次
+            monetary: 消费金额
+
+        Returns:
+            pd.DataFrame: 包含 R_Score、F_Score、M_Score、RFM_Score 四列
+        """
+        scores = pd.DataFrame({
+            'R_Score': self.score(recency, reverse=True),
+            'F_Score': self.score(frequency, by_rank=True),
+            'M_Score': self.score(monetary),
+        }, index=getattr(recency, 'index', None))
+        scores['RFM_Score'] = scores.sum(axis=1).astype('int8')
+        return scores
+
+    def _resolve_threshold(self, df, column, threshold):
+        """把 'q0.8' 这样的分位数阈值换算成具体数值"""
+        if isinstance(threshold, str) and threshold.startswith('q'):
+            return df[column].quantile(float(threshold[1:]))
+        return threshold
+
+    def segment(self, df):
+        """
+        按规则给每个客户分层
+
+        Args:
+            df: 包含规则中所有列的客户数据
+
+        Returns:
+            pd.Series: 分层结果（category 类型），索引与 df 一致
+        """
+        labels = [label for label, _ in self.rules]
+        conditions = []
+
+        for _, rule_conditions in self.rules:
+            mask = np.ones(len(df), dtype=bool)
+            for column, op, threshold in rule_conditions:
+                value = self._resolve_threshold(df, column, threshold)
+                mask &= self.OPERATORS[op](df[column].to_numpy(), value)
+            conditions.append(mask)
+
+        # 用整数编码做 np.select，再转成分类类型，避免生成大量字符串
+        codes = np.select(conditions, np.arange(len(labels)), default=len(labels))
+        categories = labels + [self.default]
+        return pd.Series(
+            pd.Categorical.from_codes(codes, categories=categories),
+            index=df.index
+        )
 
 
 class DataGenerator:
@@ -251,7 +462,155 @@ class DataGenerator:
                 order_id += 1
         
         return pd.DataFrame(orders), pd.DataFrame(order_details)
-    
+
+    def _generate_order_chunk(self, users, products, order_id_start=1, detail_id_start=1):
+        """
+        向量化生成一批用户的订单（不使用逐行循环）
+
+        所有随机量（订单数、日期、状态、支付方式、商品、数量）都一次性按数组抽取，
+        商品通过整数下标数组选取，金额用数组运算和 np.bincount 汇总。
+
+        Args:
+            users: 本批用户数据
+            products: 全部产品数据
+            order_id_start: 本批第一个订单ID
+            detail_id_start: 本批第一个详情ID
+
+        Returns:
+            tuple: (订单DataFrame, 订单详情DataFrame)
+        """
+        n_products = len(products)
+        member_levels = ['普通', '银牌', '金牌', '钻石']
+        item_lambdas = np.array([1.0, 1.5, 2.0, 3.0])
+        discount_rates = np.array([0.0, 0.05, 0.10, 0.15])
+
+        # 1. 每个用户的订单数，展开成"每个订单属于哪个用户"的下标数组
+        user_order_counts = np.random.poisson(5, len(users))
+        order_user_idx = np.repeat(np.arange(len(users)), user_order_counts)
+        n_orders = len(order_user_idx)
+
+        # 会员等级转成整数编码，后续按编码查表得到商品数参数和折扣率
+        level_codes = pd.Categorical(users['会员等级'], categories=member_levels).codes
+        order_levels = np.asarray(level_codes)[order_user_idx]
+        order_levels[order_levels < 0] = 0  # 未知等级按普通会员处理
+
+        # 2. 订单日期、状态、支付方式、配送方式一次性抽取
+        order_dates = pd.Timestamp(self.config.START_DATE) + pd.to_timedelta(
+            np.random.randint(0, 730, n_orders), unit='D'
+        )
+        order_status = np.random.choice(
+            ['已完成', '已取消', '退款', '争议'], n_orders, p=[0.85, 0.10, 0.03, 0.02]
+        )
+        payment_methods = np.random.choice(
+            ['支付宝', '微信支付', '信用卡', '银行卡'], n_orders, p=[0.4, 0.35, 0.15, 0.1]
+        )
+        delivery_methods = np.random.choice(
+            ['标准配送', '快速配送', '次日达'], n_orders, p=[0.6, 0.3, 0.1]
+        )
+
+        # 3. 每个订单的商品数，再展开成"每条明细属于哪个订单"的下标数组
+        n_items = np.minimum(np.random.poisson(item_lambdas[order_levels]) + 1, n_products)
+        item_order_idx = np.repeat(np.arange(n_orders), n_items)
+
+        # 用整数下标选商品；同一订单内出现重复商品时只重抽重复的那几条
+        product_idx = np.random.randint(0, n_products, len(item_order_idx))
+        while True:
+            duplicated = pd.DataFrame({
+                'order': item_order_idx, 'product': product_idx
+            }).duplicated().to_numpy()
+            if not duplicated.any():
+                break
+            product_idx[duplicated] = np.random.randint(0, n_products, duplicated.sum())
+
+        # 4. 金额计算全部用数组运算
+        quantities = np.random.randint(1, 4, len(item_order_idx))
+        unit_prices = products['价格'].to_numpy()[product_idx]
+        item_totals = quantities * unit_prices
+        total_amounts = np.bincount(item_order_idx, weights=item_totals, minlength=n_orders)
+        discounted_amounts = total_amounts * (1 - discount_rates[order_levels])
+
+        order_ids = np.arange(order_id_start, order_id_start + n_orders)
+
+        orders = pd.DataFrame({
+            '订单ID': order_ids,
+            '用户ID': users['用户ID'].to_numpy()[order_user_idx],
+            '订单日期': order_dates,
+            '订单金额': total_amounts.round(2),
+            '实付金额': discounted_amounts.round(2),
+            '折扣金额': (total_amounts - discounted_amounts).round(2),
+            '订单状态': order_status,
+            '支付方式': payment_methods,
+            '配送方式': delivery_methods,
+            '配送地址': users['城市'].to_numpy()[order_user_idx]
+        })
+
+        order_details = pd.DataFrame({
+            '详情ID': np.arange(detail_id_start, detail_id_start + len(item_order_idx)),
+            '订单ID': order_ids[item_order_idx],
+            '产品ID': products['产品ID'].to_numpy()[product_idx],
+            '数量': quantities,
+            '单价': unit_prices,
+            '小计': item_totals
+        })
+
+        return orders, order_details
+
+    def generate_orders_vectorized(self, users, products):
+        """
+        生成订单数据（向量化版本）
+
+        与 generate_orders 生成的数据分布相同，但不逐行循环，
+        百万级订单只需几秒。
+        """
+        print("生成订单数据（向量化）...")
+        return self._generate_order_chunk(users, products)
+
+    def generate_orders_to_disk(self, users, products, chunk_size=None):
+        """
+        分块生成订单数据并直接追加写入CSV
+
+        每次只处理 chunk_size 个用户，生成的订单写盘后即释放，
+        内存占用与总订单数无关，可用于生成上亿行的测试数据。
+
+        Args:
+            users: 用户数据
+            products: 产品数据
+            chunk_size: 每批用户数，默认使用 Config.ORDER_CHUNK_USERS
+
+        Returns:
+            tuple: (订单总数, 订单详情总数)
+        """
+        chunk_size = chunk_size or self.config.ORDER_CHUNK_USERS
+        orders_path = f'{self.config.DATA_DIR}/orders.csv'
+        details_path = f'{self.config.DATA_DIR}/order_details.csv'
+
+        print(f"分块生成订单数据（每批 {chunk_size:,} 个用户）...")
+
+        total_orders = 0
+        total_details = 0
+
+        for start in range(0, len(users), chunk_size):
+            users_chunk = users.iloc[start:start + chunk_size]
+            orders, order_details = self._generate_order_chunk(
+                users_chunk, products,
+                order_id_start=total_orders + 1,
+                detail_id_start=total_details + 1
+            )
+
+            # 第一批覆盖写入并带表头，之后的批次追加
+            mode = 'w' if start == 0 else 'a'
+            orders.to_csv(orders_path, mode=mode, header=(start == 0),
+                          index=False, encoding='utf-8')
+            order_details.to_csv(details_path, mode=mode, header=(start == 0),
+                                 index=False, encoding='utf-8')
+
+            total_orders += len(orders)
+            total_details += len(order_details)
+            print(f"  已处理用户 {min(start + chunk_size, len(users)):,}/{len(users):,}，"
+                  f"累计订单 {total_orders:,} 条")
+
+        return total_orders, total_details
+
     def generate_reviews(self, orders, products):
         """生成评价数据"""
         print("生成评价数据...")
@@ -318,7 +677,7 @@ class DataGenerator:
         # 生成各类数据
         users = self.generate_users()
         products = self.generate_products()
-        orders, order_details = self.generate_orders(users, products)
+        orders, order_details = self.generate_orders_vectorized(users, products)
         reviews = self.generate_reviews(orders, products)
         
         # 保存数据
@@ -338,6 +697,226 @@ class DataGenerator:
         return users, products, orders, order_details, reviews
 
 
+def _histogram(series, bins):
+    """预先算好直方图（计数和分箱边界），只把这两个小数组交给渲染进程"""
+    counts, edges = np.histogram(series.dropna().to_numpy(), bins=bins)
+    return {'counts': counts, 'edges': edges}
+
+
+def _plot_histogram(ax, hist):
+    """用预先算好的直方图数据绘图，效果与 Series.hist 相同"""
+    ax.hist(hist['edges'][:-1], bins=hist['edges'], weights=hist['counts'], alpha=0.7)
+    ax.grid(True)
+
+
+def render_user_analysis(data):
+    """根据聚合结果绘制用户分析图表"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    fig.suptitle('用户分析', fontsize=16)
+
+    # 年龄分布
+    _plot_histogram(axes[0, 0], data['age_hist'])
+    axes[0, 0].set_title('年龄分布')
+    axes[0, 0].set_xlabel('年龄')
+    axes[0, 0].set_ylabel('人数')
+
+    # 城市分布
+    data['city_distribution'].plot(kind='bar', ax=axes[0, 1])
+    axes[0, 1].set_title('城市分布TOP10')
+    axes[0, 1].set_xlabel('城市')
+    axes[0, 1].set_ylabel('用户数')
+    axes[0, 1].tick_params(axis='x', rotation=45)
+
+    # 会员等级分布
+    data['member_distribution'].plot(kind='pie', ax=axes[1, 0], autopct='%1.1f%%')
+    axes[1, 0].set_title('会员等级分布')
+
+    # 注册趋势
+    data['registration_trend'].plot(ax=axes[1, 1])
+    axes[1, 1].set_title('注册趋势')
+    axes[1, 1].set_xlabel('时间')
+    axes[1, 1].set_ylabel('注册用户数')
+
+    plt.tight_layout()
+    return fig
+
+
+def render_product_analysis(data):
+    """根据聚合结果绘制产品分析图表"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    fig.suptitle('产品分析', fontsize=16)
+
+    # 价格分布
+    _plot_histogram(axes[0, 0], data['price_hist'])
+    axes[0, 0].set_title('价格分布')
+    axes[0, 0].set_xlabel('价格')
+    axes[0, 0].set_ylabel('产品数')
+
+    # 类别分布
+    data['category_distribution'].plot(kind='bar', ax=axes[0, 1])
+    axes[0, 1].set_title('产品类别分布')
+    axes[0, 1].set_xlabel('类别')
+    axes[0, 1].set_ylabel('产品数')
+    axes[0, 1].tick_params(axis='x', rotation=45)
+
+    # 各类别平均价格
+    data['mean_price_by_category'].plot(kind='bar', ax=axes[1, 0])
+    axes[1, 0].set_title('各类别平均价格')
+    axes[1, 0].set_xlabel('类别')
+    axes[1, 0].set_ylabel('平均价格')
+    axes[1, 0].tick_params(axis='x', rotation=45)
+
+    # 库存分布
+    _plot_histogram(axes[1, 1], data['stock_hist'])
+    axes[1, 1].set_title('库存分布')
+    axes[1, 1].set_xlabel('库存数量')
+    axes[1, 1].set_ylabel('产品数')
+
+    plt.tight_layout()
+    return fig
+
+
+def render_sales_analysis(data):
+    """根据聚合结果绘制销售分析图表"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    fig.suptitle('销售分析', fontsize=16)
+
+    # 订单金额分布
+    _plot_histogram(axes[0, 0], data['amount_hist'])
+    axes[0, 0].set_title('订单金额分布')
+    axes[0, 0].set_xlabel('订单金额')
+    axes[0, 0].set_ylabel('订单数')
+
+    # 订单状态分布
+    data['status_distribution'].plot(kind='pie', ax=axes[0, 1], autopct='%1.1f%%')
+    axes[0, 1].set_title('订单状态分布')
+
+    # 月度销售趋势
+    data['monthly_revenue'].plot(ax=axes[1, 0])
+    axes[1, 0].set_title('月度销售趋势')
+    axes[1, 0].set_xlabel('时间')
+    axes[1, 0].set_ylabel('销售额')
+
+    # 支付方式分布
+    data['payment_distribution'].plot(kind='bar', ax=axes[1, 1])
+    axes[1, 1].set_title('支付方式分布')
+    axes[1, 1].set_xlabel('支付方式')
+    axes[1, 1].set_ylabel('订单数')
+    axes[1, 1].tick_params(axis='x', rotation=45)
+
+    plt.tight_layout()
+    return fig
+
+
+def render_customer_segmentation(data):
+    """根据聚合结果绘制客户细分图表"""
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    fig.suptitle('客户细分分析', fontsize=16)
+
+    # 客户分层分布
+    data['segment_distribution'].plot(kind='pie', ax=axes[0, 0], autopct='%1.1f%%')
+    axes[0, 0].set_title('客户分层分布')
+
+    # RFM散点图
+    points = data['scatter_points']
+    scatter = axes[0, 1].scatter(
+        points['购买频次'],
+        points['总消费'],
+        c=points['最近购买天数'],
+        cmap='viridis',
+        alpha=0.6
+    )
+    axes[0, 1].set_xlabel('购买频次')
+    axes[0, 1].set_ylabel('总消费')
+    axes[0, 1].set_title('客户价值分布（颜色=最近购买天数）')
+    fig.colorbar(scatter, ax=axes[0, 1])
+
+    # 各分层平均消费
+    data['segment_avg_spend'].plot(kind='bar', ax=axes[1, 0])
+    axes[1, 0].set_title('各分层平均消费')
+    axes[1, 0].set_xlabel('客户分层')
+    axes[1, 0].set_ylabel('平均消费')
+    axes[1, 0].tick_params(axis='x', rotation=45)
+
+    # 消费分布
+    _plot_histogram(axes[1, 1], data['spend_hist'])
+    axes[1, 1].set_title('客户消费分布')
+    axes[1, 1].set_xlabel('总消费')
+    axes[1, 1].set_ylabel('客户数')
+
+    plt.tight_layout()
+    return fig
+
+
+def _render_chart_file(render_func, chart_data, cache_path, output_path):
+    """在渲染进程中绘图并保存（先写缓存文件，再复制到图表目录）"""
+    plt.switch_backend('Agg')
+    fig = render_func(chart_data)
+    tmp_path = cache_path + '.tmp.png'
+    fig.savefig(tmp_path, dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    os.replace(tmp_path, cache_path)
+    shutil.copyfile(cache_path, output_path)
+    return output_path
+
+
+class ChartRenderer:
+    """
+    后台图表渲染器
+
+    分析方法只提交聚合后的绘图数据，由进程池在后台绘图，
+    数值分析和报告不必等待图表。绘图数据相同（按内容哈希判断）时
+    直接复用缓存的图片，不再重新绘制。
+    """
+
+    def __init__(self, plots_dir, max_workers=None):
+        self.plots_dir = plots_dir
+        self.cache_dir = os.path.join(plots_dir, 'cache')
+        self.max_workers = max_workers
+        self.executor = None
+        self.futures = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _data_hash(self, render_func, chart_data):
+        """绘图函数名 + 绘图数据的内容哈希，作为缓存键"""
+        payload = pickle.dumps((render_func.__name__, chart_data))
+        return hashlib.md5(payload).hexdigest()[:16]
+
+    def submit(self, name, render_func, chart_data):
+        """
+        提交一张图表的渲染任务
+
+        Returns:
+            Future: 完成后结果为图片路径
+        """
+        cache_path = os.path.join(
+            self.cache_dir, f'{name}_{self._data_hash(render_func, chart_data)}.png'
+        )
+        output_path = os.path.join(self.plots_dir, f'{name}.png')
+
+        if os.path.exists(cache_path):
+            shutil.copyfile(cache_path, output_path)
+            future = Future()
+            future.set_result(output_path)
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            future = self.executor.submit(
+                _render_chart_file, render_func, chart_data, cache_path, output_path
+            )
+
+        self.futures[name] = future
+        return future
+
+    def wait(self):
+        """等待所有图表渲染完成，返回 {图表名: 图片路径}"""
+        results = {name: future.result() for name, future in self.futures.items()}
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+        return results
+
+
 class DataAnalyzer:
     """数据分析器类"""
     
@@ -349,23 +928,104 @@ class DataAnalyzer:
         self.order_details = None
         self.reviews = None
         self.merged_data = None
+        self.renderer = None
     
+    def _cache_path(self, name):
+        """缓存文件路径"""
+        extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+        return os.path.join(self.config.CACHE_DIR, f'{name}.{extension}')
+
+    def _is_cache_fresh(self, cache_path, source_paths):
+        """缓存存在且比所有源CSV都新时才可用"""
+        if not os.path.exists(cache_path):
+            return False
+        cache_mtime = os.path.getmtime(cache_path)
+        return all(os.path.getmtime(path) <= cache_mtime for path in source_paths)
+
+    def _read_cache(self, cache_path):
+        """读取二进制缓存"""
+        if CACHE_FORMAT == 'parquet':
+            return pd.read_parquet(cache_path)
+        return pd.read_pickle(cache_path)
+
+    def _write_cache(self, df, cache_path):
+        """写入二进制缓存（先写临时文件再替换，避免留下半个文件）"""
+        os.makedirs(self.config.CACHE_DIR, exist_ok=True)
+        tmp_path = cache_path + '.tmp'
+        if CACHE_FORMAT == 'parquet':
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_pickle(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    def _load_table(self, name):
+        """
+        按 DATA_SCHEMA 加载一张表
+
+        首次加载时按显式类型解析CSV并写入二进制缓存，
+        之后只要CSV没有更新就直接读缓存，跳过文本解析。
+        """
+        csv_path = f'{self.config.DATA_DIR}/{name}.csv'
+        cache_path = self._cache_path(name)
+
+        schema = DATA_SCHEMA[name]
+        if self._is_cache_fresh(cache_path, [csv_path]):
+            df = self._read_cache(cache_path)
+            # 列类型与当前结构不一致（旧版本写入的缓存）时重新解析CSV
+            if all(str(df[column].dtype) == dtype for column, dtype in schema['dtypes'].items()):
+                return df
+
+        df = pd.read_csv(
+            csv_path,
+            encoding='utf-8',
+            dtype=schema['dtypes'],
+            parse_dates=schema['parse_dates']
+        )
+        self._write_cache(df, cache_path)
+        return df
+
+    @staticmethod
+    def _fact_dtypes_match(df, source_names):
+        """检查事实表缓存的列类型是否与 DATA_SCHEMA 一致（同名列按合并后的列名对应）"""
+        expected = {}
+        for name in source_names:
+            for column, dtype in DATA_SCHEMA[name]['dtypes'].items():
+                expected.setdefault(column, set()).add(dtype)
+        for column, dtypes in expected.items():
+            # 多张表都有的非连接列在合并后带 _x/_y 后缀，这里只校验未改名的列
+            if column not in df.columns or len(dtypes) > 1:
+                continue
+            (dtype,) = dtypes
+            actual = str(df[column].dtype)
+            if actual != dtype and not (dtype.startswith('int') and actual == 'float64'):
+                return False
+        return True
+
+    def _render_charts(self, name, render_func, chart_data):
+        """
+        渲染一组图表
+
+        设置了后台渲染器时提交到进程池后立即返回；
+        否则在当前进程中绘制、保存并显示（与单独调用分析方法时的行为一致）。
+        """
+        if self.renderer is not None:
+            return self.renderer.submit(name, render_func, chart_data)
+
+        fig = render_func(chart_data)
+        fig.savefig(f'{self.config.PLOTS_DIR}/{name}.png', dpi=300, bbox_inches='tight')
+        plt.show()
+        return None
+
     def load_data(self):
         """加载数据"""
         print("加载数据...")
         
         try:
-            self.users = pd.read_csv(f'{self.config.DATA_DIR}/users.csv', encoding='utf-8')
-            self.products = pd.read_csv(f'{self.config.DATA_DIR}/products.csv', encoding='utf-8')
-            self.orders = pd.read_csv(f'{self.config.DATA_DIR}/orders.csv', encoding='utf-8')
-            self.order_details = pd.read_csv(f'{self.config.DATA_DIR}/order_details.csv', encoding='utf-8')
-            self.reviews = pd.read_csv(f'{self.config.DATA_DIR}/reviews.csv', encoding='utf-8')
-            
-            # 转换日期列
-            self.users['注册日期'] = pd.to_datetime(self.users['注册日期'])
-            self.products['上架日期'] = pd.to_datetime(self.products['上架日期'])
-            self.orders['订单日期'] = pd.to_datetime(self.orders['订单日期'])
-            self.reviews['评价日期'] = pd.to_datetime(self.reviews['评价日期'])
+            self.users = self._load_table('users')
+            self.products = self._load_table('products')
+            self.orders = self._load_table('orders')
+            self.order_details = self._load_table('order_details')
+            self.reviews = self._load_table('reviews')
             
             print("数据加载完成！")
             
@@ -433,8 +1093,30 @@ class DataAnalyzer:
         return quality_df
     
     def merge_data(self):
-        """合并数据"""
+        """
+        合并数据
+
+        合并结果（事实表：每行一条订单明细，带订单、产品、用户信息）保存在
+        self.merged_data 中，供需要跨表明细的自定义分析使用；内置的各项分析
+        直接使用各张表，不依赖它。
+
+        事实表会写入缓存，源数据不变且列类型与 DATA_SCHEMA 一致时直接读取，
+        不再重复三表合并。
+        """
         print("\n=== 数据合并 ===")
+
+        source_names = ['orders', 'order_details', 'products', 'users']
+        cache_path = self._cache_path('fact_table')
+        source_paths = [f'{self.config.DATA_DIR}/{name}.csv' for name in source_names]
+
+        if self._is_cache_fresh(cache_path, source_paths):
+            merged = self._read_cache(cache_path)
+            # 与各表缓存相同的校验：来自源表的列类型必须与当前结构一致
+            # （左连接可能让缺失匹配的整数列变为 float64，这些列也接受 float64）
+            if self._fact_dtypes_match(merged, source_names):
+                self.merged_data = merged
+                print(f"从缓存加载事实表: {self.merged_data.shape}")
+                return self.merged_data
         
         # 合并订单和订单详情
         order_with_details = self.orders.merge(
@@ -452,6 +1134,8 @@ class DataAnalyzer:
         )
         
         print(f"合并后数据形状: {self.merged_data.shape}")
+
+        self._write_cache(self.merged_data, cache_path)
         
         return self.merged_data
     
@@ -482,36 +1166,14 @@ class DataAnalyzer:
         registration_trend = self.users.groupby('注册年月').size()
         print(f"月均注册用户: {registration_trend.mean():.0f}")
         
-        # 可视化
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        fig.suptitle('用户分析', fontsize=16)
-        
-        # 年龄分布
-        self.users['年龄'].hist(bins=20, ax=axes[0, 0], alpha=0.7)
-        axes[0, 0].set_title('年龄分布')
-        axes[0, 0].set_xlabel('年龄')
-        axes[0, 0].set_ylabel('人数')
-        
-        # 城市分布
-        city_dist.head(10).plot(kind='bar', ax=axes[0, 1])
-        axes[0, 1].set_title('城市分布TOP10')
-        axes[0, 1].set_xlabel('城市')
-        axes[0, 1].set_ylabel('用户数')
-        axes[0, 1].tick_params(axis='x', rotation=45)
-        
-        # 会员等级分布
-        member_dist.plot(kind='pie', ax=axes[1, 0], autopct='%1.1f%%')
-        axes[1, 0].set_title('会员等级分布')
-        
-        # 注册趋势
-        registration_trend.plot(ax=axes[1, 1])
-        axes[1, 1].set_title('注册趋势')
-        axes[1, 1].set_xlabel('时间')
-        axes[1, 1].set_ylabel('注册用户数')
-        
-        plt.tight_layout()
-        plt.savefig(f'{self.config.PLOTS_DIR}/user_analysis.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        # 可视化（只准备绘图所需的聚合数据，渲染交给 _render_charts）
+        chart_data = {
+            'age_hist': _histogram(self.users['年龄'], bins=20),
+            'city_distribution': city_dist.head(10),
+            'member_distribution': member_dist,
+            'registration_trend': registration_trend
+        }
+        self._render_charts('user_analysis', render_user_analysis, chart_data)
         
         return {
             'city_distribution': city_dist,
@@ -544,44 +1206,30 @@ class DataAnalyzer:
         print(f"总库存: {self.products['库存'].sum():,}")
         print(f"平均库存: {self.products['库存'].mean():.0f}")
         print(f"缺货产品数: {(self.products['库存'] == 0).sum()}")
-        
-        # 可视化
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        fig.suptitle('产品分析', fontsize=16)
-        
-        # 价格分布
-        self.products['价格'].hist(bins=30, ax=axes[0, 0], alpha=0.7)
-        axes[0, 0].set_title('价格分布')
-        axes[0, 0].set_xlabel('价格')
-        axes[0, 0].set_ylabel('产品数')
-        
-        # 类别分布
-        category_dist.plot(kind='bar', ax=axes[0, 1])
-        axes[0, 1].set_title('产品类别分布')
-        axes[0, 1].set_xlabel('类别')
-        axes[0, 1].set_ylabel('产品数')
-        axes[0, 1].tick_params(axis='x', rotation=45)
-        
-        # 各类别平均价格
-        price_by_category['mean'].plot(kind='bar', ax=axes[1, 0])
-        axes[1, 0].set_title('各类别平均价格')
-        axes[1, 0].set_xlabel('类别')
-        axes[1, 0].set_ylabel('平均价格')
-        axes[1, 0].tick_params(axis='x', rotation=45)
-        
-        # 库存分布
-        self.products['库存'].hist(bins=30, ax=axes[1, 1], alpha=0.7)
-        axes[1, 1].set_title('库存分布')
-        axes[1, 1].set_xlabel('库存数量')
-        axes[1, 1].set_ylabel('产品数')
-        
-        plt.tight_layout()
-        plt.savefig(f'{self.config.PLOTS_DIR}/product_analysis.png', dpi=300, bbox_inches='tight')
-        plt.show()
+
+        # 各类别销售情况（来自订单详情）
+        print("\n5. 各类别销售情况：")
+        sales_by_category = self.order_details.merge(
+            self.products[['产品ID', '类别']], on='产品ID', how='left'
+        ).groupby('类别', observed=True).agg({
+            '数量': 'sum',
+            '小计': 'sum'
+        }).rename(columns={'数量': '销量', '小计': '销售额'}).round(2)
+        print(sales_by_category)
+        
+        # 可视化（只准备绘图所需的聚合数据，渲染交给 _render_charts）
+        chart_data = {
+            'price_hist': _histogram(self.products['价格'], bins=30),
+            'category_distribution': category_dist,
+            'mean_price_by_category': price_by_category['mean'],
+            'stock_hist': _histogram(self.products['库存'], bins=30)
+        }
+        self._render_charts('product_analysis', render_product_analysis, chart_data)
         
         return {
             'category_distribution': category_dist,
-            'price_by_category': price_by_category
+            'price_by_category': price_by_category,
+            'sales_by_category': sales_by_category
         }
     
     def sales_analysis(self):
@@ -622,37 +1270,14 @@ class DataAnalyzer:
         }).round(2)
         print(payment_analysis)
         
-        # 可视化
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        fig.suptitle('销售分析', fontsize=16)
-        
-        # 订单金额分布
-        self.orders['实付金额'].hist(bins=30, ax=axes[0, 0], alpha=0.7)
-        axes[0, 0].set_title('订单金额分布')
-        axes[0, 0].set_xlabel('订单金额')
-        axes[0, 0].set_ylabel('订单数')
-        
-        # 订单状态分布
-        status_dist.plot(kind='pie', ax=axes[0, 1], autopct='%1.1f%%')
-        axes[0, 1].set_title('订单状态分布')
-        
-        # 月度销售趋势
-        monthly_sales['销售额'].plot(ax=axes[1, 0])
-        axes[1, 0].set_title('月度销售趋势')
-        axes[1, 0].set_xlabel('时间')
-        axes[1, 0].set_ylabel('销售额')
-        
-        # 支付方式分布
-        payment_dist = self.orders['支付方式'].value_counts()
-        payment_dist.plot(kind='bar', ax=axes[1, 1])
-        axes[1, 1].set_title('支付方式分布')
-        axes[1, 1].set_xlabel('支付方式')
-        axes[1, 1].set_ylabel('订单数')
-        axes[1, 1].tick_params(axis='x', rotation=45)
-        
-        plt.tight_layout()
-        plt.savefig(f'{self.config.PLOTS_DIR}/sales_analysis.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        # 可视化（只准备绘图所需的聚合数据，渲染交给 _render_charts）
+        chart_data = {
+            'amount_hist': _histogram(self.orders['实付金额'], bins=30),
+            'status_distribution': status_dist,
+            'monthly_revenue': monthly_sales['销售额'],
+            'payment_distribution': self.orders['支付方式'].value_counts()
+        }
+        self._render_charts('sales_analysis', render_sales_analysis, chart_data)
         
         return {
             'monthly_sales': monthly_sales,
@@ -684,24 +1309,21 @@ class DataAnalyzer:
             how='left'
         )
         
-        # 客户分层
-        def classify_customer(row):
-            if row['总消费'] >= customer_metrics['总消费'].quantile(0.8) and row['购买频次'] >= 3:
-                return '高价值客户'
-            elif row['总消费'] >= customer_metrics['总消费'].quantile(0.6):
-                return '中价值客户'
-            elif row['购买频次'] >= 2:
-                return '活跃客户'
-            elif row['最近购买天数'] <= 90:
-                return '新客户'
-            else:
-                return '低价值客户'
-        
-        customer_analysis['客户分层'] = customer_analysis.apply(classify_customer, axis=1)
+        # 客户分层（向量化：阈值只算一次，用 np.select 一次完成分层）
+        segmenter = RFMSegmenter(rules=CUSTOMER_SEGMENT_RULES, default='低价值客户')
+        customer_analysis['客户分层'] = segmenter.segment(customer_analysis)
+
+        # RFM五分位得分，便于后续精细化运营
+        rfm_scores = segmenter.score_rfm(
+            recency=customer_analysis['最近购买天数'],
+            frequency=customer_analysis['购买频次'],
+            monetary=customer_analysis['总消费']
+        )
+        customer_analysis = customer_analysis.join(rfm_scores)
         
         # 分层统计
         print("\n客户分层结果：")
-        segment_stats = customer_analysis.groupby('客户分层').agg({
+        segment_stats = customer_analysis.groupby('客户分层', observed=True).agg({
             '用户ID': 'count',
             '总消费': ['mean', 'sum'],
             '购买频次': 'mean',
@@ -710,53 +1332,38 @@ class DataAnalyzer:
         
         print(segment_stats)
         
-        # 可视化
-        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-        fig.suptitle('客户细分分析', fontsize=16)
-        
-        # 客户分层分布
-        segment_dist = customer_analysis['客户分层'].value_counts()
-        segment_dist.plot(kind='pie', ax=axes[0, 0], autopct='%1.1f%%')
-        axes[0, 0].set_title('客户分层分布')
-        
-        # RFM散点图
-        scatter = axes[0, 1].scatter(
-            customer_analysis['购买频次'], 
-            customer_analysis['总消费'],
-            c=customer_analysis['最近购买天数'], 
-            cmap='viridis', 
-            alpha=0.6
-        )
-        axes[0, 1].set_xlabel('购买频次')
-        axes[0, 1].set_ylabel('总消费')
-        axes[0, 1].set_title('客户价值分布（颜色=最近购买天数）')
-        plt.colorbar(scatter, ax=axes[0, 1])
-        
-        # 各分层平均消费
-        segment_avg_spend = customer_analysis.groupby('客户分层')['总消费'].mean()
-        segment_avg_spend.plot(kind='bar', ax=axes[1, 0])
-        axes[1, 0].set_title('各分层平均消费')
-        axes[1, 0].set_xlabel('客户分层')
-        axes[1, 0].set_ylabel('平均消费')
-        axes[1, 0].tick_params(axis='x', rotation=45)
-        
-        # 消费分布
-        customer_analysis['总消费'].hist(bins=30, ax=axes[1, 1], alpha=0.7)
-        axes[1, 1].set_title('客户消费分布')
-        axes[1, 1].set_xlabel('总消费')
-        axes[1, 1].set_ylabel('客户数')
-        
-        plt.tight_layout()
-        plt.savefig(f'{self.config.PLOTS_DIR}/customer_segmentation.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        # 可视化（只准备绘图所需的聚合数据，渲染交给 _render_charts）
+        # 散点图最多取 Config.SCATTER_SAMPLE 个客户，避免序列化整张客户表
+        scatter_points = customer_analysis[['购买频次', '总消费', '最近购买天数']]
+        if len(scatter_points) > self.config.SCATTER_SAMPLE:
+            scatter_points = scatter_points.sample(
+                n=self.config.SCATTER_SAMPLE, random_state=self.config.RANDOM_SEED
+            )
+        chart_data = {
+            'segment_distribution': customer_analysis['客户分层'].value_counts(),
+            'scatter_points': scatter_points,
+            'segment_avg_spend': customer_analysis.groupby('客户分层', observed=True)['总消费'].mean(),
+            'spend_hist': _histogram(customer_analysis['总消费'], bins=30)
+        }
+        self._render_charts('customer_segmentation', render_customer_segmentation, chart_data)
         
         return customer_analysis, segment_stats
     
-    def generate_report(self):
-        """生成分析报告"""
+    def generate_report(self, wait_for_charts=True):
+        """
+        生成分析报告
+
+        图表在后台进程池中渲染，数值报告写完即可查看，不必等图表。
+
+        Args:
+            wait_for_charts: 是否等待全部图表渲染完成后再返回；
+                为 False 时可稍后调用 self.renderer.wait()
+        """
         print("\n=== 生成分析报告 ===")
+
+        self.renderer = ChartRenderer(self.config.PLOTS_DIR, self.config.RENDER_WORKERS)
         
-        # 执行所有分析
+        # 执行所有分析（只做数值计算，图表提交到后台渲染）
         quality_report = self.data_quality_check()
         self.merge_data()
         user_results = self.user_analysis()
@@ -823,11 +1430,399 @@ class DataAnalyzer:
         
         print("分析报告已生成！")
         print(f"报告文件: {self.config.OUTPUT_DIR}/analysis_report.md")
-        print(f"图表文件: {self.config.PLOTS_DIR}/")
+
+        if wait_for_charts:
+            print("等待图表渲染完成...")
+            self.renderer.wait()
+            print(f"图表文件: {self.config.PLOTS_DIR}/")
+        else:
+            print(f"图表正在后台渲染，完成后保存在: {self.config.PLOTS_DIR}/")
         
         return report
 
 
+# 分位数草图的相对精度：估计值与真实分位数的相对误差不超过 1%
+SKETCH_ACCURACY = 0.01
+_SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_SKETCH_LOG_GAMMA = np.log(_SKETCH_GAMMA)
+# 值的个数不超过该数量的组保留原始值，分位数按精确值插值计算
+EXACT_QUANTILE_LIMIT = 10000
+
+
+class GroupStats:
+    """
+    可合并的分组聚合状态
+
+    每块数据各自算出一个 GroupStats，再两两 merge 得到全量结果。
+    保存计数、求和、均值、平方差和（用于标准差）、最小值、最大值，
+    以及一个按对数分桶的分位数草图（用于近似中位数等分位数）。
+    不超过 EXACT_QUANTILE_LIMIT 个值的组同时保留原始值，分位数是精确的。
+    """
+
+    def __init__(self, stats, sketch=None, exact=None):
+        self.stats = stats
+        self.sketch = sketch
+        self.exact = exact
+
+    @classmethod
+    def build(cls, keys=None, values=None, with_sketch=False):
+        """
+        从一块数据构建聚合状态
+
+        Args:
+            keys: 分组键序列，None 表示不分组（整体统计）
+            values: 数值序列，None 表示只计数
+            with_sketch: 是否同时构建分位数草图
+        """
+        if keys is None:
+            keys = pd.Series('全部', index=(values.index if values is not None else None))
+
+        if values is None:
+            stats = keys.value_counts().to_frame('count')
+            stats.index.name = keys.name
+            return cls(stats)
+
+        frame = pd.DataFrame({'key': keys.to_numpy(), 'value': values.to_numpy(dtype='float64')})
+        grouped = frame.groupby('key', observed=True)['value']
+        stats = grouped.agg(['count', 'sum', 'mean', 'min', 'max'])
+        stats['m2'] = grouped.var(ddof=0).fillna(0) * stats['count']
+        stats.index.name = keys.name
+
+        sketch = None
+        exact = None
+        if with_sketch:
+            buckets = np.ceil(
+                np.log(np.maximum(frame['value'].to_numpy(), 1e-9)) / _SKETCH_LOG_GAMMA
+            ).astype('int32')
+            sketch = frame.assign(bucket=buckets).groupby(['key', 'bucket'], observed=True).size()
+            exact = {
+                key: group.to_numpy()
+                for key, group in grouped
+                if len(group) <= EXACT_QUANTILE_LIMIT
+            }
+
+        return cls(stats, sketch, exact)
+
+    def merge(self, other):
+        """合并两个聚合状态（满足交换律和结合律，块的处理顺序不影响结果）"""
+        index = self.stats.index.union(other.stats.index)
+        a = self.stats.reindex(index)
+        b = other.stats.reindex(index)
+
+        merged = pd.DataFrame(index=index)
+        na = a['count'].fillna(0)
+        nb = b['count'].fillna(0)
+        merged['count'] = na + nb
+
+        if 'sum' in a.columns:
+            n = merged['count']
+            delta = b['mean'].fillna(0) - a['mean'].fillna(0)
+            merged['sum'] = a['sum'].fillna(0) + b['sum'].fillna(0)
+            merged['mean'] = merged['sum'] / n
+            merged['min'] = np.fmin(a['min'], b['min'])
+            merged['max'] = np.fmax(a['max'], b['max'])
+            # Chan 并行方差合并公式
+            merged['m2'] = a['m2'].fillna(0) + b['m2'].fillna(0) + delta ** 2 * na * nb / n
+
+        sketch = None
+        exact = None
+        if self.sketch is not None and other.sketch is not None:
+            sketch = self.sketch.add(other.sketch, fill_value=0)
+            exact = {}
+            for key in index:
+                # 只有两边出现过该组的部分都保留了原始值、合并后仍不超过上限时才继续保留
+                parts = [part.exact.get(key) for part in (self, other) if key in part.stats.index]
+                if all(values is not None for values in parts) and \
+                        sum(len(values) for values in parts) <= EXACT_QUANTILE_LIMIT:
+                    exact[key] = np.concatenate(parts)
+
+        merged['count'] = merged['count'].astype('int64')
+        return GroupStats(merged, sketch, exact)
+
+    def result(self):
+        """返回 count/sum/mean/min/max/std 结果表（std 为样本标准差）"""
+        result = self.stats.drop(columns='m2', errors='ignore').copy()
+        if 'm2' in self.stats.columns:
+            result['std'] = np.sqrt(self.stats['m2'] / (self.stats['count'] - 1))
+        return result
+
+    def quantile(self, q):
+        """
+        计算每组的 q 分位数
+
+        保留了原始值的组按线性插值精确计算（与 pandas 的 quantile 一致），
+        其余组根据分位数草图估计：结果与排在该位置的真实值相对误差不超过 SKETCH_ACCURACY，
+        但不在相邻两个值之间插值。
+        """
+        values = {}
+        for key, counts in self.sketch.groupby(level=0):
+            if key in self.exact:
+                values[key] = float(np.quantile(self.exact[key], q))
+                continue
+            counts = counts.droplevel(0).sort_index()
+            rank = q * (counts.sum() - 1)
+            bucket = counts.index[np.searchsorted(counts.cumsum().to_numpy(), rank, side='right')]
+            values[key] = 2 * _SKETCH_GAMMA ** bucket / (_SKETCH_GAMMA + 1)
+        quantiles = pd.Series(values)
+        quantiles.index.name = self.stats.index.name
+        return quantiles.reindex(self.stats.index)
+
+
+def merge_partials(left, right):
+    """按名字逐项合并两组部分聚合结果"""
+    merged = dict(left)
+    for name, stats in right.items():
+        merged[name] = merged[name].merge(stats) if name in merged else stats
+    return merged
+
+
+def _user_chunk_stats(chunk):
+    """用户表单块的部分聚合"""
+    return {
+        'age': GroupStats.build(values=chunk['年龄']),
+        'age_distribution': GroupStats.build(chunk['年龄']),
+        'gender': GroupStats.build(chunk['性别']),
+        'city': GroupStats.build(chunk['城市']),
+        'member': GroupStats.build(chunk['会员等级']),
+        'registration': GroupStats.build(chunk['注册日期'].dt.to_period('M').rename('注册年月'))
+    }
+
+
+def _product_chunk_stats(chunk):
+    """产品表单块的部分聚合"""
+    return {
+        'price': GroupStats.build(values=chunk['价格']),
+        'stock': GroupStats.build(values=chunk['库存']),
+        'out_of_stock': GroupStats.build(values=(chunk['库存'] == 0).astype(int)),
+        'category_price': GroupStats.build(chunk['类别'], chunk['价格'], with_sketch=True)
+    }
+
+
+def _detail_chunk_stats(chunk, product_categories):
+    """订单详情表单块的部分聚合（按产品类别汇总销量和销售额）"""
+    categories = chunk['产品ID'].map(product_categories).rename('类别')
+    return {
+        'category_quantity': GroupStats.build(categories, chunk['数量']),
+        'category_sales': GroupStats.build(categories, chunk['小计'])
+    }
+
+
+def _order_chunk_stats(chunk):
+    """订单表单块的部分聚合"""
+    return {
+        'amount': GroupStats.build(values=chunk['实付金额'], with_sketch=True),
+        'status': GroupStats.build(chunk['订单状态']),
+        'monthly': GroupStats.build(
+            chunk['订单日期'].dt.to_period('M').rename('订单年月'), chunk['实付金额']
+        ),
+        'payment': GroupStats.build(chunk['支付方式'], chunk['实付金额'])
+    }
+
+
+class ChunkedAnalyzer:
+    """
+    内存外（分块）分析器
+
+    按块流式读取CSV，每块在进程池中算出可合并的部分聚合状态，
+    再合并成与 DataAnalyzer 相同结构的结果，内存占用只与块大小有关。
+    均值、求和、计数、极值、标准差与内存版一致；每组不超过 EXACT_QUANTILE_LIMIT 个值时
+    中位数也与内存版一致，更大的组为草图估计的近似值（见 GroupStats.quantile）。
+    """
+
+    def __init__(self, config, chunk_size=None, n_workers=None):
+        self.config = config
+        self.chunk_size = chunk_size or config.ANALYSIS_CHUNK_ROWS
+        self.n_workers = n_workers or config.ANALYSIS_WORKERS
+
+    def _read_chunks(self, name):
+        """按 DATA_SCHEMA 分块读取CSV（枚举列按字符串读取，避免每块重复建分类）"""
+        schema = DATA_SCHEMA[name]
+        dtypes = {
+            column: ('str' if dtype == 'category' else dtype)
+            for column, dtype in schema['dtypes'].items()
+        }
+        return pd.read_csv(
+            f'{self.config.DATA_DIR}/{name}.csv',
+            encoding='utf-8',
+            dtype=dtypes,
+            parse_dates=schema['parse_dates'],
+            chunksize=self.chunk_size
+        )
+
+    def _aggregate(self, name, chunk_func, *args):
+        """
+        对一个数据文件做分块聚合
+
+        n_workers > 1 时各块并行处理；同时在途的块数有上限，
+        读取速度超过处理速度时会等待，内存不会无限增长。
+        """
+        result = {}
+
+        if self.n_workers <= 1:
+            for chunk in self._read_chunks(name):
+                result = merge_partials(result, chunk_func(chunk, *args))
+            return result
+
+        with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+            pending = set()
+            for chunk in self._read_chunks(name):
+                pending.add(executor.submit(chunk_func, chunk, *args))
+                if len(pending) >= self.n_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        result = merge_partials(result, future.result())
+
+            for future in wait(pending).done:
+                result = merge_partials(result, future.result())
+
+        return result
+
+    @staticmethod
+    def _value_counts(stats):
+        """把计数状态转换成与 value_counts 相同格式的 Series"""
+        # 先按键排序再稳定排序，计数相同时与分类列 value_counts 的顺序一致
+        counts = stats.stats['count'].sort_index().sort_values(ascending=False, kind='stable')
+        counts.name = 'count'
+        return counts
+
+    def user_analysis(self):
+        """用户分析（分块版）"""
+        print("\n=== 用户分析（分块） ===")
+        partials = self._aggregate('users', _user_chunk_stats)
+
+        age = partials['age'].result().iloc[0]
+        city_dist = self._value_counts(partials['city']).head(10)
+        member_dist = self._value_counts(partials['member'])
+        registration_trend = partials['registration'].stats['count'].sort_index()
+        registration_trend.name = None
+
+        print("\n1. 用户基本统计：")
+        print(f"总用户数: {int(age['count']):,}")
+        print(f"平均年龄: {age['mean']:.1f}岁")
+        print(f"性别分布:")
+        print(self._value_counts(partials['gender']))
+
+        print("\n2. 地域分布TOP10：")
+        print(city_dist)
+
+        print("\n3. 会员等级分布：")
+        print(member_dist)
+
+        print("\n4. 注册趋势分析：")
+        print(f"月均注册用户: {registration_trend.mean():.0f}")
+
+        return {
+            'city_distribution': city_dist,
+            'member_distribution': member_dist,
+            'registration_trend': registration_trend,
+            'age_distribution': partials['age_distribution'].stats['count'].sort_index()
+        }
+
+    def product_analysis(self):
+        """产品分析（分块版）"""
+        print("\n=== 产品分析（分块） ===")
+        partials = self._aggregate('products', _product_chunk_stats)
+
+        price = partials['price'].result().iloc[0]
+        stock = partials['stock'].result().iloc[0]
+        category_price = partials['category_price']
+        category_dist = self._value_counts(category_price)
+
+        price_by_category = category_price.result()[['mean']].copy()
+        price_by_category['median'] = category_price.quantile(0.5)
+        price_by_category['std'] = category_price.result()['std']
+        price_by_category = price_by_category.sort_index().round(2)
+
+        # 产品ID到类别的映射很小，随每块详情一起发给工作进程
+        product_categories = self._product_categories()
+        detail_partials = self._aggregate('order_details', _detail_chunk_stats, product_categories)
+        sales_by_category = pd.DataFrame({
+            '销量': detail_partials['category_quantity'].stats['sum'],
+            '销售额': detail_partials['category_sales'].stats['sum']
+        }).sort_index().round(2)
+
+        print("\n1. 产品基本统计：")
+        print(f"总产品数: {int(price['count']):,}")
+        print(f"平均价格: ¥{price['mean']:.2f}")
+        print(f"价格范围: ¥{price['min']:.2f} - ¥{price['max']:.2f}")
+
+        print("\n2. 产品类别分布：")
+        print(category_dist)
+
+        print("\n3. 各类别价格分析：")
+        print(price_by_category)
+
+        print("\n4. 库存分析：")
+        print(f"总库存: {int(stock['sum']):,}")
+        print(f"平均库存: {stock['mean']:.0f}")
+        print(f"缺货产品数: {int(partials['out_of_stock'].result().iloc[0]['sum'])}")
+
+        print("\n5. 各类别销售情况：")
+        print(sales_by_category)
+
+        return {
+            'category_distribution': category_dist,
+            'price_by_category': price_by_category,
+            'sales_by_category': sales_by_category
+        }
+
+    def _product_categories(self):
+        """分块读取产品表，构建 产品ID -> 类别 映射"""
+        mappings = [
+            chunk.set_index('产品ID')['类别']
+            for chunk in self._read_chunks('products')
+        ]
+        return pd.concat(mappings)
+
+    def sales_analysis(self):
+        """销售分析（分块版）"""
+        print("\n=== 销售分析（分块） ===")
+        partials = self._aggregate('orders', _order_chunk_stats)
+
+        amount = partials['amount'].result().iloc[0]
+        status_dist = self._value_counts(partials['status'])
+
+        monthly = partials['monthly'].result().sort_index()
+        monthly_sales = pd.DataFrame({'订单数': monthly['count'], '销售额': monthly['sum']})
+
+        payment = partials['payment'].result().sort_index()
+        payment_analysis = pd.DataFrame({
+            ('订单ID', 'count'): payment['count'],
+            ('实付金额', 'sum'): payment['sum'],
+            ('实付金额', 'mean'): payment['mean']
+        }).round(2)
+
+        print("\n1. 销售基本统计：")
+        print(f"总订单数: {int(amount['count']):,}")
+        print(f"总销售额: ¥{amount['sum']:,.2f}")
+        print(f"平均订单金额: ¥{amount['mean']:.2f}")
+        print(f"订单金额中位数（近似）: ¥{partials['amount'].quantile(0.5).iloc[0]:.2f}")
+
+        print("\n2. 订单状态分析：")
+        print(status_dist)
+
+        print("\n3. 销售趋势分析：")
+        print(f"月均订单数: {monthly_sales['订单数'].mean():.0f}")
+        print(f"月均销售额: ¥{monthly_sales['销售额'].mean():,.2f}")
+
+        print("\n4. 支付方式分析：")
+        print(payment_analysis)
+
+        return {
+            'monthly_sales': monthly_sales,
+            'status_distribution': status_dist,
+            'payment_analysis': payment_analysis
+        }
+
+    def run(self):
+        """依次执行三项分块分析"""
+        return {
+            'user': self.user_analysis(),
+            'product': self.product_analysis(),
+            'sales': self.sales_analysis()
+        }
+
+
 def main():
     """主函数"""
     print("电商平台数据分析项目")
@@ -841,8 +1836,9 @@ def main():
     print("1. 生成数据")
     print("2. 分析现有数据")
     print("3. 生成数据并分析")
+    print("4. 分块分析超大数据（内存外模式）")
     
-    choice = input("请输入选择 (1/2/3): ").strip()
+    choice = input("请输入选择 (1/2/3/4): ").strip()
     
     if choice in ['1', '3']:
         # 生成数据
@@ -858,6 +1854,12 @@ def main():
             print("\n分析完成！")
         else:
             print("数据加载失败，请先生成数据！")
+
+    if choice == '4':
+        # 数据量超过内存时，分块流式分析
+        analyzer = ChunkedAnalyzer(config)
+        analyzer.run()
+        print("\n分块分析完成！")
     
     print("\n" + "=" * 60)
     print("项目完成！")
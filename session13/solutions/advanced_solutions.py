@@ -640,24 +640,18 @@ rfm_data['RFM_Score'] = (rfm_data['R_Score'].astype(int) +
                         rfm_data['F_Score'].astype(int) + 
                         rfm_data['M_Score'].astype(int))
 
-# 客户分层
-def classify_customer_rfm(row):
-    if row['RFM_Score'] >= 13:
-        return '冠军客户'
-    elif row['RFM_Score'] >= 11:
-        return '忠诚客户'
-    elif row['RFM_Score'] >= 9:
-        return '潜力客户'
-    elif row['RFM_Score'] >= 7:
-        return '新客户'
-    elif row['RFM_Score'] >= 5:
-        return '风险客户'
-    else:
-        return '流失客户'
-
-rfm_data['客户分层'] = rfm_data.apply(classify_customer_rfm, axis=1)
-
-rfm_summary = rfm_data.groupby('客户分层').agg({
+# 客户分层：按RFM综合得分从高到低匹配
+def classify_customer_rfm(df):
+    """向量化客户分层，一次处理整张表而不是逐行 apply"""
+    score = df['RFM_Score']
+    conditions = [score >= 13, score >= 11, score >= 9, score >= 7, score >= 5]
+    segments = ['冠军客户', '忠诚客户', '潜力客户', '新客户', '风险客户']
+    return pd.Categorical(np.select(conditions, segments, default='流失客户'),
+                          categories=segments + ['流失客户'])
+
+rfm_data['客户分层'] = classify_customer_rfm(rfm_data)
+
+rfm_summary = rfm_data.groupby('客户分层', observed=True).agg({
     '客户ID': 'count',
     '总消费金额': 'mean',
     '平均消费频率': 'mean',